@@ -2,17 +2,142 @@
 # এই file টি backend/api/ folder এ থাকবে
 # পুরনো admin.py file এর content replace করে এটা দিন
 
-from django.contrib import admin
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import ChangeList
+from django.core.paginator import Paginator
+from django.db import connections, DatabaseError
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.functional import cached_property
+
 from .models import (
     Post, Comment, Like, Bookmark, Follow,
-    UserProfile, Category, Tag
+    UserProfile, Category, Tag, Job
 )
 
+# ==================== Admin Performance Mode ====================
+# ADMIN_PERFORMANCE_MODE = True in settings switches every changelist below to
+# estimated counts and keyset ("Next »") pagination, so large tables never run
+# COUNT(*) or OFFSET scans.
+
+def performance_mode():
+    return getattr(settings, 'ADMIN_PERFORMANCE_MODE', False)
+
+def admin_exact_count_limit():
+    return getattr(settings, 'ADMIN_EXACT_COUNT_LIMIT', 1000)
+
+def table_row_estimate(model, using):
+    """Planner statistics row count, falling back to MAX(pk) (an index lookup)."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+                row = cursor.fetchone()
+                if row and row[0] > 0:
+                    return row[0]
+            elif connection.vendor == 'sqlite':
+                cursor.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+                )
+                if cursor.fetchone():
+                    cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+                    row = cursor.fetchone()
+                    if row:
+                        return int(row[0].split()[0])
+    except DatabaseError:
+        pass
+    return model._default_manager.using(using).aggregate(n=Max('pk'))['n'] or 0
+
+def estimated_count(queryset):
+    limit = admin_exact_count_limit()
+    if not queryset.query.has_filters():
+        estimate = table_row_estimate(queryset.model, queryset.db)
+        if estimate > limit:
+            return estimate
+    # Filtered: exact up to the limit, then stop counting
+    return queryset.order_by()[:limit + 1].count()
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return estimated_count(self.object_list)
+
+class KeysetChangeList(ChangeList):
+    cursor_var = 'after'
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = None
+        if self.cursor_var in request.GET:
+            # Not a field lookup - take it out before ChangeList validates the params
+            params = request.GET.copy()
+            value = params.pop(self.cursor_var)[-1]
+            request.GET = params
+            try:
+                self.cursor = int(value)
+            except ValueError:
+                pass
+        super().__init__(request, *args, **kwargs)
+
+    def get_results(self, request):
+        queryset = self.queryset.order_by('-pk')
+        if self.cursor is not None:
+            queryset = queryset.filter(pk__lt=self.cursor)
+        rows = list(queryset[:self.list_per_page + 1])
+        has_next = len(rows) > self.list_per_page
+
+        self.keyset = True
+        self.result_list = rows[:self.list_per_page]
+        self.next_cursor = self.result_list[-1].pk if has_next else None
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.can_show_all = False
+        self.multi_page = has_next or self.cursor is not None
+
+    @property
+    def next_page_url(self):
+        return self.get_query_string({self.cursor_var: self.next_cursor})
+
+    @property
+    def first_page_url(self):
+        return self.get_query_string(remove=[self.cursor_var])
+
+class PerformanceModelAdmin(admin.ModelAdmin):
+    # Bulk deletes use Django's delete_selected: it checks delete permission on
+    # every cascaded model and shows a confirmation page
+    change_list_template = 'admin/api/keyset_change_list.html'
+    show_full_result_count = False
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        if performance_mode():
+            return EstimatedCountPaginator(queryset, per_page, orphans, allow_empty_first_page)
+        return super().get_paginator(request, queryset, per_page, orphans, allow_empty_first_page)
+
+    def get_changelist(self, request, **kwargs):
+        if performance_mode():
+            return KeysetChangeList
+        return super().get_changelist(request, **kwargs)
+
+    def get_sortable_by(self, request):
+        # Keyset pages are always newest first
+        if performance_mode():
+            return ()
+        return super().get_sortable_by(request)
+
+# ==================== Model Admins ====================
+
 @admin.register(UserProfile)
-class UserProfileAdmin(admin.ModelAdmin):
+class UserProfileAdmin(PerformanceModelAdmin):
     list_display = ['user', 'location', 'created_at']
-    search_fields = ['user__username', 'location']
+    list_select_related = ['user']
+    search_fields = ['=user__username', 'location']
     list_filter = ['created_at']
+    autocomplete_fields = ['user']
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -27,42 +152,77 @@ class TagAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
 
 @admin.register(Post)
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(PerformanceModelAdmin):
     list_display = ['title', 'author', 'category', 'status', 'views_count', 'created_at']
-    list_filter = ['status', 'category', 'created_at']
-    search_fields = ['title', 'content', 'author__username']
+    list_select_related = ['author', 'category']
+    # No category filter / date_hierarchy: both scan the whole table to build the sidebar
+    list_filter = ['status', 'created_at']
+    search_fields = ['title', '=author__username']
     prepopulated_fields = {}
-    filter_horizontal = ['tags']
-    date_hierarchy = 'created_at'
-    
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.select_related('author', 'category').prefetch_related('tags')
+    autocomplete_fields = ['author', 'category', 'tags']
+    actions = ['make_published', 'make_draft']
+
+    def set_status(self, queryset, new_status):
+        # Archive stubs have no content to publish; updated_at moves so delta sync sees the change
+        return queryset.exclude(status='archived').update(status=new_status, updated_at=timezone.now())
+
+    @admin.action(description='Mark selected posts as published', permissions=['change'])
+    def make_published(self, request, queryset):
+        updated = self.set_status(queryset, 'published')
+        self.message_user(request, f'{updated} post(s) published.', messages.SUCCESS)
+
+    @admin.action(description='Mark selected posts as draft', permissions=['change'])
+    def make_draft(self, request, queryset):
+        updated = self.set_status(queryset, 'draft')
+        self.message_user(request, f'{updated} post(s) moved to draft.', messages.SUCCESS)
 
 @admin.register(Comment)
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(PerformanceModelAdmin):
     list_display = ['author', 'post', 'content_preview', 'created_at']
+    list_select_related = ['author', 'post']
     list_filter = ['created_at']
-    search_fields = ['content', 'author__username', 'post__title']
-    
+    search_fields = ['content', '=author__username']
+    autocomplete_fields = ['post', 'author', 'parent']
+
     def content_preview(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     content_preview.short_description = 'Content'
 
 @admin.register(Like)
-class LikeAdmin(admin.ModelAdmin):
+class LikeAdmin(PerformanceModelAdmin):
     list_display = ['user', 'post', 'created_at']
+    list_select_related = ['user', 'post']
     list_filter = ['created_at']
-    search_fields = ['user__username', 'post__title']
+    search_fields = ['=user__username']
+    autocomplete_fields = ['user', 'post']
 
 @admin.register(Bookmark)
-class BookmarkAdmin(admin.ModelAdmin):
+class BookmarkAdmin(PerformanceModelAdmin):
     list_display = ['user', 'post', 'created_at']
+    list_select_related = ['user', 'post']
     list_filter = ['created_at']
-    search_fields = ['user__username', 'post__title']
+    search_fields = ['=user__username']
+    autocomplete_fields = ['user', 'post']
 
 @admin.register(Follow)
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(PerformanceModelAdmin):
     list_display = ['follower', 'following', 'created_at']
+    list_select_related = ['follower', 'following']
     list_filter = ['created_at']
-    search_fields = ['follower__username', 'following__username']
\ No newline at end of file
+    search_fields = ['=follower__username', '=following__username']
+    autocomplete_fields = ['follower', 'following']
+
+@admin.register(Job)
+class JobAdmin(PerformanceModelAdmin):
+    list_display = ['kind', 'status', 'priority', 'attempts', 'run_after', 'finished_at']
+    list_filter = ['status', 'kind']
+    search_fields = ['=idempotency_key']
+    readonly_fields = ['locked_by', 'locked_at', 'last_error', 'created_at', 'finished_at']
+    actions = ['retry_now']
+
+    @admin.action(description='Retry selected jobs now', permissions=['change'])
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status='running').update(
+            status='queued', run_after=timezone.now(), attempts=0, locked_by='', locked_at=None
+        )
+        self.message_user(request, f'{updated} job(s) queued.', messages.SUCCESS)
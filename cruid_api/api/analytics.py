@@ -0,0 +1,208 @@
+# backend/api/analytics.py
+# Author analytics - দিনভিত্তিক rollup table থেকে dashboard
+#
+# Likes, comments, bookmarks and views append one EngagementEvent row each
+# (views arrive already batched by the increment_views job). The
+# compact_engagement job folds events into DailyPostStats, one row per
+# (post, day), and deletes them, so the events table stays small. Dashboards
+# read DailyPostStats through its (author, day) index plus the not yet
+# compacted events, so their cost follows the date range, not lifetime activity.
+
+import time
+from collections import defaultdict
+from datetime import date, datetime, time as dt_time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+
+from .models import DailyPostStats, EngagementEvent, Post
+
+ANALYTICS_DEFAULTS = {
+    'COMPACT_BATCH': 2000,    # events folded per transaction
+    'COMPACT_DELAY': 60,      # seconds an event may wait before compaction is queued
+    'COMPACT_INTERVAL': 300,  # workers also compact on this schedule, whatever was queued
+    'DEFAULT_DAYS': 30,       # range when ?from= is missing
+    'MAX_RANGE': 366,         # days per dashboard request
+}
+
+METRICS = ('views', 'likes', 'comments', 'bookmarks')
+GRANULARITIES = {
+    'day': F('day'),
+    'week': TruncWeek('day'),
+    'month': TruncMonth('day'),
+}
+
+
+def analytics_setting(name):
+    return getattr(settings, 'ANALYTICS', {}).get(name, ANALYTICS_DEFAULTS[name])
+
+
+# ==================== Recording ====================
+
+_scheduled_bucket = None
+
+
+def schedule_compaction():
+    # One job per COMPACT_DELAY window; the idempotency key dedupes across processes
+    delay = analytics_setting('COMPACT_DELAY')
+    bucket = int(time.time() // delay)
+    if bucket == _scheduled_bucket:
+        return
+
+    def apply():
+        # Marked only once queued, so a rolled-back write does not skip the window
+        global _scheduled_bucket
+        from .jobs import enqueue
+        enqueue('compact_engagement', delay=delay, idempotency_key=f'compact_engagement:{bucket}')
+        _scheduled_bucket = bucket
+    transaction.on_commit(apply)
+
+
+def record_events(counts):
+    """Append ``{(post_id, metric): delta}`` as engagement events."""
+    events = [
+        EngagementEvent(post_id=post_id, metric=metric, delta=delta)
+        for (post_id, metric), delta in counts.items() if delta
+    ]
+    if events:
+        EngagementEvent.objects.bulk_create(events)
+        schedule_compaction()
+
+
+def record_event(post_id, metric, delta=1):
+    record_events({(post_id, metric): delta})
+
+
+# ==================== Compaction ====================
+
+def _fold(events):
+    totals = defaultdict(lambda: dict.fromkeys(METRICS, 0))
+    for post_id, metric, delta, created_at in events:
+        totals[(post_id, timezone.localdate(created_at))][metric] += delta
+
+    # Events of deleted posts are dropped with them
+    authors = dict(Post.objects.filter(id__in={post_id for post_id, _ in totals}).values_list('id', 'author_id'))
+    totals = {key: value for key, value in totals.items() if key[0] in authors}
+    if not totals:
+        return
+    existing = {
+        (row.post_id, row.day): row
+        for row in DailyPostStats.objects.select_for_update().filter(
+            post_id__in={post_id for post_id, _ in totals}, day__in={day for _, day in totals}
+        )
+    }
+    created, updated = [], []
+    for (post_id, day), deltas in totals.items():
+        row = existing.get((post_id, day))
+        if row is None:
+            created.append(DailyPostStats(post_id=post_id, author_id=authors[post_id], day=day, **deltas))
+            continue
+        for metric, delta in deltas.items():
+            setattr(row, metric, getattr(row, metric) + delta)
+        updated.append(row)
+    # A concurrent compactor creating the same (post, day) row fails the unique
+    # constraint; the whole batch rolls back and the job retries it
+    DailyPostStats.objects.bulk_create(created)
+    DailyPostStats.objects.bulk_update(updated, METRICS)
+
+
+def compact_engagement(batch_size=None):
+    """Fold pending events into DailyPostStats; returns the number of events compacted."""
+    batch_size = batch_size or analytics_setting('COMPACT_BATCH')
+    total = 0
+    while True:
+        with transaction.atomic():
+            events = list(
+                EngagementEvent.objects.select_for_update(skip_locked=True).order_by('id')
+                .values_list('id', 'post_id', 'metric', 'delta', 'created_at')[:batch_size]
+            )
+            if not events:
+                return total
+            _fold([event[1:] for event in events])
+            EngagementEvent.objects.filter(id__in=[event[0] for event in events]).delete()
+        total += len(events)
+        if len(events) < batch_size:
+            return total
+
+
+# ==================== Dashboard ====================
+
+def period_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def _periods(start, end, granularity):
+    current = period_start(start, granularity)
+    while current <= end:
+        yield current
+        if granularity == 'month':
+            current = (current + timedelta(days=32)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == 'week' else 1)
+
+
+def parse_range(params):
+    """Return (start, end, granularity) from ?from=&to=&granularity=; raises ValueError."""
+    granularity = params.get('granularity') or 'day'
+    if granularity not in GRANULARITIES:
+        raise ValueError(f'granularity must be one of {", ".join(GRANULARITIES)}')
+    try:
+        end = date.fromisoformat(params['to']) if params.get('to') else timezone.localdate()
+        start = (
+            date.fromisoformat(params['from']) if params.get('from')
+            else end - timedelta(days=analytics_setting('DEFAULT_DAYS') - 1)
+        )
+    except ValueError:
+        raise ValueError('from and to must be dates (YYYY-MM-DD)')
+    if start > end:
+        raise ValueError('from must not be after to')
+    if (end - start).days + 1 > analytics_setting('MAX_RANGE'):
+        raise ValueError(f'Range is limited to {analytics_setting("MAX_RANGE")} days')
+    return start, end, granularity
+
+
+def author_stats(author_id, start, end, granularity='day'):
+    series = {period: dict.fromkeys(METRICS, 0) for period in _periods(start, end, granularity)}
+
+    rows = (
+        DailyPostStats.objects.filter(author_id=author_id, day__gte=start, day__lte=end)
+        .annotate(period=GRANULARITIES[granularity])
+        .values('period')
+        .annotate(**{metric: Sum(metric) for metric in METRICS})
+        .order_by()
+    )
+    for row in rows:
+        period = row['period']
+        if hasattr(period, 'date'):
+            period = period.date()
+        for metric in METRICS:
+            series[period][metric] += row[metric]
+
+    # Not yet compacted; bounded by COMPACT_DELAY worth of activity
+    pending = EngagementEvent.objects.filter(
+        post_id__in=Post.objects.filter(author_id=author_id).values('id'),
+        created_at__gte=timezone.make_aware(datetime.combine(start, dt_time.min)),
+    ).values_list('metric', 'delta', 'created_at')
+    for metric, delta, created_at in pending:
+        day = timezone.localdate(created_at)
+        if start <= day <= end:
+            series[period_start(day, granularity)][metric] += delta
+
+    totals = dict.fromkeys(METRICS, 0)
+    for values in series.values():
+        for metric in METRICS:
+            totals[metric] += values[metric]
+    return {
+        'from': start,
+        'to': end,
+        'granularity': granularity,
+        'totals': totals,
+        'series': [{'period': period, **values} for period, values in series.items()],
+    }
@@ -0,0 +1,200 @@
+# backend/api/archive.py
+# Cold storage - পুরনো post এর content, comment আর like archive table এ
+#
+# archive_posts(before) moves published posts created before a date out of
+# the hot tables in batches: content, comments and likes are copied into the
+# Archived* tables and deleted from Post / Comment / Like. Drafts are left
+# alone, since stubs are publicly readable. The Post row stays as a
+# lightweight read-only stub (status 'archived', empty content, excerpt
+# kept) so ids, URLs, bookmarks and rollups keep working while list queries
+# skip it. PostDetailView reads the archive for stubs; restore_posts() moves
+# them back with their original status. ArchiveRouter sends the
+# Archived* models to ARCHIVE['DATABASE'], so they can live in a separate
+# SQLite file; they use plain id columns and never join the hot tables.
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+from django.utils import timezone
+
+from .models import ArchivedComment, ArchivedLike, ArchivedPost, Comment, Like, Post
+from .singleflight import response_cache_key, single_flight_setting
+
+ARCHIVE_DEFAULTS = {
+    'DATABASE': 'default',   # alias in DATABASES holding the Archived* tables
+    'BATCH_SIZE': 500,       # posts per batch
+}
+
+ARCHIVED = 'archived'
+ARCHIVE_MODELS = {'archivedpost', 'archivedcomment', 'archivedlike'}
+
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'parent_id', 'content', 'created_at', 'updated_at')
+LIKE_FIELDS = ('id', 'post_id', 'user_id', 'created_at')
+
+
+def archive_setting(name):
+    return getattr(settings, 'ARCHIVE', {}).get(name, ARCHIVE_DEFAULTS[name])
+
+
+class ArchiveRouter:
+    """Route the Archived* models to ARCHIVE['DATABASE'] and nothing else there."""
+
+    def _is_archive(self, app_label, model_name):
+        return app_label == 'api' and model_name in ARCHIVE_MODELS
+
+    def db_for_read(self, model, **hints):
+        if self._is_archive(model._meta.app_label, model._meta.model_name):
+            return archive_setting('DATABASE')
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        archive_db = archive_setting('DATABASE')
+        if self._is_archive(app_label, model_name):
+            return db == archive_db
+        if db == archive_db and archive_db != 'default':
+            return False
+        return None
+
+
+# ==================== Archiving ====================
+
+def _copy_batch(post_ids):
+    # Copies are keyed by the original ids, so a re-run after a crash is a no-op
+    using = archive_setting('DATABASE')
+    posts = [
+        ArchivedPost(post_id=pk, content=content, status=post_status)
+        for pk, content, post_status in Post.objects.filter(id__in=post_ids).values_list('id', 'content', 'status')
+    ]
+    comments = [
+        ArchivedComment(**dict(zip(COMMENT_FIELDS, row)))
+        for row in Comment.objects.filter(post_id__in=post_ids).values_list(*COMMENT_FIELDS).iterator()
+    ]
+    likes = [
+        ArchivedLike(**dict(zip(LIKE_FIELDS, row)))
+        for row in Like.objects.filter(post_id__in=post_ids).values_list(*LIKE_FIELDS).iterator()
+    ]
+    with transaction.atomic(using=using):
+        ArchivedPost.objects.bulk_create(posts, batch_size=500, ignore_conflicts=True)
+        ArchivedComment.objects.bulk_create(comments, batch_size=500, ignore_conflicts=True)
+        ArchivedLike.objects.bulk_create(likes, batch_size=500, ignore_conflicts=True)
+    return len(comments), len(likes)
+
+
+def _strip_batch(post_ids):
+    # Raw deletes: archiving is not an unlike / comment delete, so no signals
+    # (engagement events, SSE, tombstones) fire
+    with transaction.atomic():
+        for model in (Like, Comment):
+            rows = model.objects.filter(post_id__in=post_ids)
+            rows._raw_delete(rows.db)
+        # updated_at moves so delta sync drops the post and list fragments re-render
+        Post.objects.filter(id__in=post_ids).update(status=ARCHIVED, content='', updated_at=timezone.now())
+        cache = caches[single_flight_setting('CACHE')]
+        transaction.on_commit(
+            lambda: cache.delete_many([response_cache_key('post-detail', pk) for pk in post_ids])
+        )
+
+
+def archive_posts(before, batch_size=None, dry_run=False):
+    """Archive posts created before ``before``; returns (posts, comments, likes) moved."""
+    batch_size = batch_size or archive_setting('BATCH_SIZE')
+    pending = Post.objects.filter(created_at__lt=before, status='published')
+    if dry_run:
+        post_ids = pending.values('id')
+        return (
+            pending.count(),
+            Comment.objects.filter(post_id__in=post_ids).count(),
+            Like.objects.filter(post_id__in=post_ids).count(),
+        )
+    totals = [0, 0, 0]
+    while True:
+        post_ids = list(pending.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not post_ids:
+            return tuple(totals)
+        comments, likes = _copy_batch(post_ids)
+        _strip_batch(post_ids)
+        totals[0] += len(post_ids)
+        totals[1] += comments
+        totals[2] += likes
+
+
+def delete_archived(post_id):
+    using = archive_setting('DATABASE')
+    with transaction.atomic(using=using):
+        ArchivedLike.objects.filter(post_id=post_id).delete()
+        ArchivedComment.objects.filter(post_id=post_id).delete()
+        ArchivedPost.objects.filter(post_id=post_id).delete()
+
+
+# ==================== Restoring ====================
+
+def _restore_rows(model, fields, archived):
+    rows = [model(**{field: getattr(row, field) for field in fields}) for row in archived]
+    # ignore_conflicts: a like may have been added to the stub before stubs were read-only
+    model.objects.bulk_create(rows, batch_size=500, ignore_conflicts=True)
+    # bulk_create stamps auto_now(_add) fields; bulk_update puts the original times back
+    times = [field for field in ('created_at', 'updated_at') if field in fields]
+    for row, original in zip(rows, archived):
+        for field in times:
+            setattr(row, field, getattr(original, field))
+    model.objects.bulk_update(rows, times, batch_size=500)
+
+
+def restore_posts(post_ids):
+    """Move archived posts back into the hot tables; returns (posts, comments, likes) restored."""
+    stub_ids = list(Post.objects.filter(id__in=post_ids, status=ARCHIVED).values_list('id', flat=True))
+    if not stub_ids:
+        return 0, 0, 0
+    originals = ArchivedPost.objects.in_bulk(stub_ids)
+    comments = list(ArchivedComment.objects.filter(post_id__in=stub_ids).order_by('id'))
+    likes = list(ArchivedLike.objects.filter(post_id__in=stub_ids))
+    users = set(User.objects.filter(
+        id__in={c.author_id for c in comments} | {like.user_id for like in likes}
+    ).values_list('id', flat=True))
+    # Rows of since-deleted users (and replies under their comments) are dropped,
+    # as the hot cascade would have; replies always have a higher id than their parent
+    kept = {}
+    for comment in comments:
+        if comment.author_id in users and (comment.parent_id is None or comment.parent_id in kept):
+            kept[comment.id] = comment
+    likes = [like for like in likes if like.user_id in users]
+
+    now = timezone.now()
+    with transaction.atomic():
+        for pk in stub_ids:
+            original = originals.get(pk)
+            Post.objects.filter(pk=pk).update(
+                status=original.status if original else 'published',
+                content=original.content if original else '',
+                updated_at=now,
+            )
+        _restore_rows(Comment, COMMENT_FIELDS, list(kept.values()))
+        _restore_rows(Like, LIKE_FIELDS, likes)
+        cache = caches[single_flight_setting('CACHE')]
+        transaction.on_commit(
+            lambda: cache.delete_many([response_cache_key('post-detail', pk) for pk in stub_ids])
+        )
+    # The hot copy is committed first, so a crash here leaves only unused archive rows
+    for pk in stub_ids:
+        delete_archived(pk)
+    return len(stub_ids), len(kept), len(likes)
+
+
+# ==================== Reading ====================
+
+def load_archived_thread(post_id):
+    """Return the archived comments of a post as a top-level list, each with ``thread_replies``."""
+    comments = list(ArchivedComment.objects.filter(post_id=post_id).order_by('-created_at', '-id'))
+    users = User.objects.select_related('profile').in_bulk({c.author_id for c in comments})
+    # Comments of since-deleted users are skipped, as the hot cascade would have removed them
+    comments = [c for c in comments if c.author_id in users]
+    children = {}
+    for comment in comments:
+        comment.author = users[comment.author_id]
+        children.setdefault(comment.parent_id, []).append(comment)
+    for comment in comments:
+        comment.thread_replies = children.get(comment.id, [])
+    return children.get(None, [])
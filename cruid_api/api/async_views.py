@@ -0,0 +1,185 @@
+# backend/api/async_views.py
+# Async login/register - password hashing চলে hashing pool এ, worker block হয় না
+#
+# These are plain Django async views (DRF views are sync only). Under ASGI they
+# never block the event loop; under WSGI they still work through async_to_sync.
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+
+from .batch import BatchError, authenticate, batch_setting, parse_batch, run_subrequest, run_subrequest_in_thread
+from .events import TooManySubscribers, broadcaster, events_setting, format_sse, streams_supported
+from .hashing import HashingQueueFull, hashing_pool, hash_password, verify_password, rehash_algorithm
+from .models import Post
+from .serializers import UserRegistrationSerializer
+from .views import login_response_data
+
+RETRY_AFTER_SECONDS = 1
+
+
+def _too_busy():
+    response = JsonResponse({'error': 'Too many login attempts in progress, try again shortly'}, status=429)
+    response['Retry-After'] = str(RETRY_AFTER_SECONDS)
+    return response
+
+
+def _parse_json(request):
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+@csrf_exempt
+@require_POST
+async def async_login(request):
+    # Reject before touching the database when the hashing queue is saturated
+    if hashing_pool.is_full():
+        return _too_busy()
+
+    data = _parse_json(request)
+    if data is None:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+    username = data.get('username') or ''
+    password = data.get('password') or ''
+
+    user = await User.objects.filter(username=username).afirst()
+    try:
+        if user is None or not user.has_usable_password():
+            # Hash anyway so unknown usernames take as long as wrong passwords
+            await hashing_pool.run(hash_password, password)
+            valid = False
+        else:
+            valid = await hashing_pool.run(verify_password, password, user.password)
+    except HashingQueueFull:
+        return _too_busy()
+
+    if not valid or not user.is_active:
+        return JsonResponse({'error': 'Invalid credentials'}, status=401)
+
+    algorithm = rehash_algorithm(user.password)
+    if algorithm:
+        try:
+            user.password = await hashing_pool.run(hash_password, password, algorithm)
+            await user.asave(update_fields=['password'])
+        except HashingQueueFull:
+            pass  # try again on the next login
+
+    return JsonResponse(await sync_to_async(login_response_data)(user))
+
+
+@csrf_exempt
+@require_POST
+async def async_register(request):
+    if hashing_pool.is_full():
+        return _too_busy()
+
+    data = _parse_json(request)
+    if data is None:
+        return JsonResponse({'error': 'Invalid JSON body'}, status=400)
+
+    serializer = UserRegistrationSerializer(data=data)
+    if not await sync_to_async(serializer.is_valid)():
+        return JsonResponse(serializer.errors, status=400)
+
+    try:
+        password_hash = await hashing_pool.run(hash_password, serializer.validated_data['password'])
+    except HashingQueueFull:
+        return _too_busy()
+
+    await sync_to_async(serializer.save)(password_hash=password_hash)
+    return JsonResponse(await sync_to_async(lambda: serializer.data)(), status=201)
+
+
+# ==================== Post Events (SSE) ====================
+
+async def _event_stream(post_id):
+    try:
+        sub = broadcaster.subscribe(post_id)
+    except TooManySubscribers:
+        return
+    try:
+        yield f'retry: {events_setting("RETRY_MS")}\n\n'
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), events_setting('HEARTBEAT'))
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            if event['type'] == 'resync':
+                sub.lagging = False
+            yield format_sse(event)
+    finally:
+        broadcaster.unsubscribe(sub)
+
+
+@require_GET
+async def post_events(request, post_id):
+    # Holds one idle coroutine + a small queue per client; needs ASGI to scale
+    if not streams_supported(request):
+        return JsonResponse({'error': 'Live events need an ASGI server'}, status=501)
+    if not await Post.objects.filter(pk=post_id).aexists():
+        return JsonResponse({'error': 'Post not found'}, status=404)
+    if broadcaster.connection_count >= events_setting('MAX_CONNECTIONS'):
+        response = JsonResponse({'error': 'Too many event streams, try again shortly'}, status=503)
+        response['Retry-After'] = str(events_setting('RETRY_MS') // 1000)
+        return response
+
+    response = StreamingHttpResponse(_event_stream(post_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # disable nginx buffering
+    return response
+
+
+# ==================== Batch ====================
+
+async def _run_concurrently(request, urls, user, auth):
+    # Each sub-request gets a worker thread (and its own DB connection)
+    limit = asyncio.Semaphore(batch_setting('CONCURRENCY'))
+    run = sync_to_async(run_subrequest_in_thread, thread_sensitive=False)
+
+    def finished(task):
+        # A timed-out thread cannot be stopped, so its slot is freed only when it returns
+        limit.release()
+        if not task.cancelled():
+            task.exception()
+
+    async def one(url):
+        await limit.acquire()
+        task = asyncio.ensure_future(run(request, url, user, auth))
+        task.add_done_callback(finished)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), batch_setting('TIMEOUT'))
+        except asyncio.TimeoutError:
+            return {'url': url, 'status': 504, 'body': {'error': 'Sub-request timed out'}}
+
+    return await asyncio.gather(*(one(url) for url in urls))
+
+
+@csrf_exempt
+@require_POST
+async def batch(request):
+    try:
+        urls = parse_batch(request.body)
+        user, auth = await sync_to_async(authenticate)(request)
+    except BatchError as e:
+        return JsonResponse({'error': str(e)}, status=e.status)
+
+    # A repeated URL runs once (side effects such as view counts included)
+    unique = list(dict.fromkeys(urls))
+    if isinstance(request, ASGIRequest):
+        results = await _run_concurrently(request, unique, user, auth)
+    else:
+        # WSGI: keep to the request thread, one after another
+        run = sync_to_async(run_subrequest)
+        results = [await run(request, url, user, auth) for url in unique]
+    by_url = dict(zip(unique, results))
+    return JsonResponse({'responses': [by_url[url] for url in urls]})
@@ -0,0 +1,109 @@
+# backend/api/authentication.py
+# Cached JWT authentication - প্রতি request এ User row fetch করা লাগে না
+#
+# Access tokens carry user_id, username, is_active and a token version ("ver").
+# The User row is cached per process for JWT_USER_CACHE['TTL'] seconds; the
+# version stored on UserProfile is bumped on password change, deactivation and
+# logout, which revokes every outstanding token for that user.
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import F
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import UserProfile
+from .utils import TTLCache
+
+TOKEN_VERSION_CLAIM = 'ver'
+
+_cache_settings = getattr(settings, 'JWT_USER_CACHE', {})
+user_cache = TTLCache(
+    maxsize=_cache_settings.get('MAX_SIZE', 10000),
+    ttl=_cache_settings.get('TTL', 60),
+)
+
+_USER_FIELDS = [field.attname for field in User._meta.concrete_fields]
+
+
+def evict_cached_user(user_id):
+    # simplejwt stores the id claim as a string
+    user_cache.delete(str(user_id))
+
+
+def get_token_version(user_id):
+    version = UserProfile.objects.filter(user_id=user_id).values_list('token_version', flat=True).first()
+    return version or 0
+
+
+def bump_token_version(user_id):
+    updated = UserProfile.objects.filter(user_id=user_id).update(token_version=F('token_version') + 1)
+    if not updated:
+        UserProfile.objects.get_or_create(user_id=user_id, defaults={'token_version': 1})
+    evict_cached_user(user_id)
+
+
+def _load_user(user_id):
+    row = (
+        User.objects.filter(pk=user_id)
+        .annotate(_token_version=F('profile__token_version'))
+        .values_list(*_USER_FIELDS, '_token_version')
+        .first()
+    )
+    if row is None:
+        return None
+    entry = (row[:-1], row[-1] or 0)
+    user_cache.set(str(user_id), entry)
+    return entry
+
+
+# Token class used by LoginView
+class VersionedRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['username'] = user.username
+        token['is_active'] = user.is_active
+        token[TOKEN_VERSION_CLAIM] = get_token_version(user.pk)
+        return token
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            # Tokens issued before versioning: regular DB lookup
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken('Token contained no recognizable user identification')
+
+        entry = user_cache.get(str(user_id)) or _load_user(user_id)
+        if entry is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+
+        values, version = entry
+        # A fresh instance per request, so request-level state never leaks between requests
+        user = User.from_db('default', _USER_FIELDS, values)
+
+        if not user.is_active:
+            raise AuthenticationFailed('User is inactive', code='user_inactive')
+        if validated_token[TOKEN_VERSION_CLAIM] != version:
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        return user
+
+
+class VersionedTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = VersionedRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if TOKEN_VERSION_CLAIM in refresh:
+            user_id = refresh.get(jwt_settings.USER_ID_CLAIM)
+            if refresh[TOKEN_VERSION_CLAIM] != get_token_version(user_id):
+                raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        return super().validate(attrs)
@@ -0,0 +1,175 @@
+# backend/api/autocomplete.py
+# Prefix autocomplete - tags, categories ও usernames এর in-memory sorted index
+#
+# Each type keeps a sorted list of (normalized name, id) keys; a keystroke is a
+# bisect to the first key >= the prefix plus a short forward scan, so lookups
+# never touch the database. Signals keep the index current, and a periodic
+# rebuild refreshes popularity (published post counts). Rebuilds read the
+# database without holding the lock (stale ones on a background thread) and
+# replay changes that arrived meanwhile before swapping the new index in.
+# wsgi.py / asgi.py call build_on_startup(), so a worker builds the index
+# while it boots instead of on the first keystroke; management commands
+# never load those modules and never pay for it.
+
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import Count, Q
+
+from .models import Category, Tag
+from .utils import RebuiltIndex
+
+AUTOCOMPLETE_DEFAULTS = {
+    'LIMIT': 8,                 # results per type when ?limit= is not given
+    'MAX_LIMIT': 25,
+    'SCAN_LIMIT': 500,          # prefix matches ranked per lookup
+    'REBUILD_INTERVAL': 900,    # seconds, refreshes popularity and other workers' changes
+    'BUILD_ON_STARTUP': True,   # serving processes build the index as they boot
+}
+
+AUTOCOMPLETE_TYPES = ('tag', 'category', 'user')
+
+
+def autocomplete_setting(name):
+    return getattr(settings, 'AUTOCOMPLETE', {}).get(name, AUTOCOMPLETE_DEFAULTS[name])
+
+
+def normalize(text):
+    """Case- and accent-insensitive form used for both keys and queries."""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold().strip()
+
+
+class PrefixIndex:
+    """Sorted ``(key, id)`` list plus ``id -> entry`` for one object type."""
+
+    def __init__(self):
+        self.keys = []
+        self.entries = {}
+
+    def load(self, rows):
+        # rows: iterable of (id, name, extra, weight)
+        self.entries = {}
+        for obj_id, name, extra, weight in rows:
+            self.entries[obj_id] = (normalize(name), name, extra, weight)
+        self.keys = sorted((entry[0], obj_id) for obj_id, entry in self.entries.items())
+
+    def upsert(self, obj_id, name, extra):
+        old = self.entries.get(obj_id)
+        weight = old[3] if old else 0
+        if old:
+            self._remove_key(old[0], obj_id)
+        key = normalize(name)
+        self.entries[obj_id] = (key, name, extra, weight)
+        insort(self.keys, (key, obj_id))
+
+    def remove(self, obj_id):
+        old = self.entries.pop(obj_id, None)
+        if old:
+            self._remove_key(old[0], obj_id)
+
+    def _remove_key(self, key, obj_id):
+        i = bisect_left(self.keys, (key, obj_id))
+        if i < len(self.keys) and self.keys[i] == (key, obj_id):
+            del self.keys[i]
+
+    def search(self, prefix, limit, scan_limit):
+        keys = self.keys
+        i = bisect_left(keys, (prefix,))
+        matches = []
+        while i < len(keys) and len(matches) < scan_limit and keys[i][0].startswith(prefix):
+            matches.append(keys[i][1])
+            i += 1
+        entries = self.entries
+        # Most popular first; shorter (closer) names break ties
+        matches.sort(key=lambda obj_id: (-entries[obj_id][3], len(entries[obj_id][0]), entries[obj_id][0]))
+        return [(obj_id, entries[obj_id]) for obj_id in matches[:limit]]
+
+    def __len__(self):
+        return len(self.keys)
+
+
+class AutocompleteIndex(RebuiltIndex):
+    rebuild_name = 'autocomplete-rebuild'
+
+    def _reset_state(self):
+        super()._reset_state()
+        self.indexes = {name: PrefixIndex() for name in AUTOCOMPLETE_TYPES}
+
+    # ---------- building ----------
+
+    def _load(self):
+        published = Q(posts__status='published')
+        tags = (
+            Tag.objects.annotate(n=Count('posts', filter=published))
+            .values_list('id', 'name', 'slug', 'n')
+        )
+        categories = (
+            Category.objects.annotate(n=Count('posts', filter=published))
+            .values_list('id', 'name', 'slug', 'n')
+        )
+        users = (
+            User.objects.filter(is_active=True)
+            .annotate(n=Count('posts', filter=published))
+            .values_list('id', 'username', 'first_name', 'last_name', 'n')
+        )
+        indexes = {name: PrefixIndex() for name in AUTOCOMPLETE_TYPES}
+        indexes['tag'].load(tags.iterator(chunk_size=5000))
+        indexes['category'].load(categories.iterator(chunk_size=5000))
+        indexes['user'].load(
+            (obj_id, username, f'{first_name} {last_name}'.strip(), n)
+            for obj_id, username, first_name, last_name, n in users.iterator(chunk_size=5000)
+        )
+        return indexes
+
+    def _install(self, indexes):
+        self.indexes = indexes
+
+    def _is_stale(self):
+        return time.monotonic() - self.built_at > autocomplete_setting('REBUILD_INTERVAL')
+
+    # ---------- incremental updates (signals) ----------
+
+    def upsert(self, type_name, obj_id, name, extra=''):
+        with self._lock:
+            self._record(self.upsert, type_name, obj_id, name, extra)
+            if self.built_at is not None:
+                self.indexes[type_name].upsert(obj_id, name, extra)
+
+    def remove(self, type_name, obj_id):
+        with self._lock:
+            self._record(self.remove, type_name, obj_id)
+            if self.built_at is not None:
+                self.indexes[type_name].remove(obj_id)
+
+    # ---------- queries ----------
+
+    def search(self, query, types=AUTOCOMPLETE_TYPES, limit=None):
+        """Return ``{type: [{'id', 'name', ...}, ...]}`` for names starting with ``query``."""
+        prefix = normalize(query)
+        limit = limit or autocomplete_setting('LIMIT')
+        scan_limit = autocomplete_setting('SCAN_LIMIT')
+        results = {}
+        with self._lock:
+            for type_name in types:
+                matches = self.indexes[type_name].search(prefix, limit, scan_limit) if prefix else []
+                results[type_name] = [self._serialize(type_name, obj_id, entry) for obj_id, entry in matches]
+        return results
+
+    @staticmethod
+    def _serialize(type_name, obj_id, entry):
+        _, name, extra, weight = entry
+        if type_name == 'user':
+            return {'id': obj_id, 'username': name, 'full_name': extra, 'posts_count': weight}
+        return {'id': obj_id, 'name': name, 'slug': extra, 'posts_count': weight}
+
+
+autocomplete_index = AutocompleteIndex()
+
+
+def build_on_startup():
+    if autocomplete_setting('BUILD_ON_STARTUP'):
+        autocomplete_index.build_in_background()
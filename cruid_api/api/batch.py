@@ -0,0 +1,139 @@
+# backend/api/batch.py
+# Batch gateway - একটা request এ অনেকগুলো GET
+#
+# POST /api/batch/ {"requests": ["posts/1/", "profile/", ...]} authenticates
+# once, resolves each relative URL against api/urls.py and calls the view
+# directly with the caller forced in as the user, skipping middleware and a
+# second JWT check per sub-request. Only GET is run, only for API routes
+# outside BATCH_EXCLUDED (streams, exports and the batch itself), and a URL
+# listed twice runs once. Under ASGI the sub-requests run concurrently on
+# worker threads, at most CONCURRENCY at a time (a timed-out one keeps its
+# slot until its thread returns); under WSGI they run one after another in
+# the request thread.
+
+import json
+import logging
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+BATCH_DEFAULTS = {
+    'MAX_REQUESTS': 20,     # sub-requests per batch
+    'MAX_URL_LENGTH': 2000,
+    'CONCURRENCY': 8,       # sub-requests running at once under ASGI
+    'TIMEOUT': 10,          # seconds per sub-request under ASGI
+}
+
+API_PREFIX = '/api/'
+# Streaming or non-GET endpoints that cannot be answered inside a batch
+BATCH_EXCLUDED = {'batch', 'post-events', 'export-me', 'export-site', 'async-login', 'async-register'}
+# Outer request headers not passed on to sub-requests
+DROPPED_META = {'CONTENT_LENGTH', 'CONTENT_TYPE', 'HTTP_CONTENT_LENGTH', 'HTTP_CONTENT_TYPE', 'wsgi.input'}
+
+
+def batch_setting(name):
+    return getattr(settings, 'BATCH', {}).get(name, BATCH_DEFAULTS[name])
+
+
+class BatchError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_batch(body):
+    """Return the list of sub-request URLs in a batch body; raises BatchError."""
+    try:
+        data = json.loads(body or b'{}')
+    except ValueError:
+        raise BatchError('Invalid JSON body')
+    urls = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(urls, list) or not urls:
+        raise BatchError('"requests" must be a non-empty list of URLs')
+    if len(urls) > batch_setting('MAX_REQUESTS'):
+        raise BatchError(f'A batch holds at most {batch_setting("MAX_REQUESTS")} requests', status=413)
+    if not all(isinstance(url, str) and 0 < len(url) <= batch_setting('MAX_URL_LENGTH') for url in urls):
+        raise BatchError(f'Each request must be a URL of at most {batch_setting("MAX_URL_LENGTH")} characters')
+    return urls
+
+
+def authenticate(request):
+    """Run the API's authentication classes once; returns (user, auth) or raises BatchError."""
+    drf_request = Request(request, authenticators=[cls() for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        return drf_request.user, drf_request.auth
+    except APIException as e:
+        detail = e.detail.get('detail', e.default_detail) if isinstance(e.detail, dict) else e.detail
+        raise BatchError(str(detail), status=e.status_code)
+
+
+def _result(url, status, body):
+    return {'url': url, 'status': status, 'body': body}
+
+
+def _sub_request(outer, path, query, match, user, auth):
+    request = HttpRequest()
+    request.method = 'GET'
+    request.path = request.path_info = path
+    request.META = {key: value for key, value in outer.META.items() if key not in DROPPED_META}
+    request.META.update(REQUEST_METHOD='GET', PATH_INFO=path, QUERY_STRING=query)
+    request.GET = QueryDict(query)
+    request.COOKIES = outer.COOKIES
+    request.resolver_match = match
+    request.user = user
+    if user.is_authenticated:
+        # DRF's Request uses these instead of its authentication classes;
+        # anonymous callers keep them so protected views still answer 401
+        request._force_auth_user = user
+        request._force_auth_token = auth
+    return request
+
+
+def run_subrequest(outer, url, user, auth):
+    """Run one GET through its view and return {url, status, body}."""
+    path, _, query = url.partition('?')
+    if not path.startswith('/'):
+        path = API_PREFIX + path
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return _result(url, 404, {'error': 'Not found'})
+    if not path.startswith(API_PREFIX) or match.url_name in BATCH_EXCLUDED or iscoroutinefunction(match.func):
+        return _result(url, 400, {'error': 'This endpoint cannot be batched'})
+
+    try:
+        response = match.func(_sub_request(outer, path, query, match, user, auth), *match.args, **match.kwargs)
+        if hasattr(response, 'render') and not getattr(response, 'is_rendered', True):
+            response.render()
+    except Http404:
+        return _result(url, 404, {'error': 'Not found'})
+    except Exception:
+        logger.exception('Batch sub-request %s failed', url)
+        return _result(url, 500, {'error': 'Internal server error'})
+    if response.streaming:
+        response.close()
+        return _result(url, 400, {'error': 'This endpoint cannot be batched'})
+
+    content = response.content
+    if response.get('Content-Type', '').startswith('application/json'):
+        body = json.loads(content) if content else None
+    else:
+        body = content.decode(response.charset or 'utf-8', errors='replace')
+    return _result(url, response.status_code, body)
+
+
+def run_subrequest_in_thread(outer, url, user, auth):
+    # Executor threads hold their own connection; close it as a request would
+    try:
+        return run_subrequest(outer, url, user, auth)
+    finally:
+        close_old_connections()
+
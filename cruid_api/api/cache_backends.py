@@ -0,0 +1,267 @@
+# backend/api/cache_backends.py
+# Two-tier cache - প্রতি worker এ ছোট LRU, তার পিছনে shared cache (file / Redis)
+#
+# CACHES = {'default': {'BACKEND': 'api.cache_backends.TwoTierCache', 'OPTIONS': {...}}}
+#
+# Reads hit a bounded in-process LRU first (pickled bytes, bounded by total
+# size), then the shared tier. Writes go to both. Local entries live at most
+# LOCAL_TTL seconds, which bounds how stale another worker's copy can be after
+# a delete. Stats are flushed to the shared tier so `manage.py cache_stats`
+# can report them across workers.
+
+import pickle
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.module_loading import import_string
+
+TWO_TIER_DEFAULTS = {
+    'SHARED': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'two-tier-shared',
+    },
+    'LOCAL_MAX_BYTES': 32 * 1024 * 1024,
+    'LOCAL_MAX_ENTRIES': 10000,
+    'LOCAL_TTL': 30,          # seconds
+    'TTL_JITTER': 0.1,        # timeouts are shortened by up to 10% so keys don't expire together
+    'NEGATIVE_TTL': 60,       # seconds for set_negative()
+    'STATS_FLUSH_INTERVAL': 10,
+}
+
+STAT_NAMES = ('local_hits', 'shared_hits', 'negative_hits', 'misses', 'sets', 'evictions')
+
+
+class _Negative:
+    """Marker returned by get() for keys cached as "known not to exist"."""
+
+    def __repr__(self):
+        return 'NEGATIVE'
+
+    def __reduce__(self):
+        return 'NEGATIVE'
+
+
+NEGATIVE = _Negative()
+_MISSING = object()
+
+
+class LocalLRU:
+    """Size-aware LRU of pickled values with per-entry expiry."""
+
+    def __init__(self, max_bytes, max_entries):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            payload, expires = item
+            if expires < time.monotonic():
+                self._pop(key)
+                return _MISSING
+            self._data.move_to_end(key)
+        return pickle.loads(payload)
+
+    def set(self, key, value, ttl):
+        payload = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(payload) > self.max_bytes // 8:
+            # Too big for the local tier; leave it to the shared cache
+            self.delete(key)
+            return 0
+        evicted = 0
+        with self._lock:
+            self._pop(key)
+            self._data[key] = (payload, time.monotonic() + ttl)
+            self.size += len(payload)
+            while self._data and (self.size > self.max_bytes or len(self._data) > self.max_entries):
+                oldest = next(iter(self._data))
+                self._pop(oldest)
+                evicted += 1
+        return evicted
+
+    def delete(self, key):
+        with self._lock:
+            return self._pop(key)
+
+    def _pop(self, key):
+        item = self._data.pop(key, None)
+        if item is None:
+            return False
+        self.size -= len(item[0])
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+class TwoTierCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = {**TWO_TIER_DEFAULTS, **params.get('OPTIONS', {})}
+        self.options = options
+        shared = dict(options['SHARED'])
+        backend = import_string(shared.pop('BACKEND'))
+        self.shared = backend(shared.pop('LOCATION', ''), shared)
+        self.local = LocalLRU(options['LOCAL_MAX_BYTES'], options['LOCAL_MAX_ENTRIES'])
+        self.stats = dict.fromkeys(STAT_NAMES, 0)
+        self._stats_lock = threading.Lock()
+        self._stats_flushed = time.monotonic()
+        self._stats_prefix = f'twotier:stats:{location or "default"}:'
+
+    # ---------- helpers ----------
+
+    def _local_key(self, key, version):
+        return self.make_and_validate_key(key, version=version)
+
+    def _ttl(self, timeout):
+        # Relative seconds for the shared tier (get_backend_timeout() returns an expiry time)
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        if timeout is None:
+            return None
+        jitter = self.options['TTL_JITTER']
+        if jitter and timeout > 1:
+            timeout = timeout * (1 - random.random() * jitter)
+        return timeout
+
+    def _local_ttl(self, timeout):
+        local_ttl = self.options['LOCAL_TTL']
+        return local_ttl if timeout is None else min(timeout, local_ttl)
+
+    def _record(self, name, n=1):
+        with self._stats_lock:
+            self.stats[name] += n
+            due = time.monotonic() - self._stats_flushed > self.options['STATS_FLUSH_INTERVAL']
+        if due:
+            self.flush_stats()
+
+    def flush_stats(self):
+        with self._stats_lock:
+            pending = {name: n for name, n in self.stats.items() if n}
+            self.stats = dict.fromkeys(STAT_NAMES, 0)
+            self._stats_flushed = time.monotonic()
+        for name, n in pending.items():
+            key = self._stats_prefix + name
+            try:
+                self.shared.incr(key, n)
+            except ValueError:
+                self.shared.add(key, 0, None)
+                self.shared.incr(key, n)
+
+    def read_stats(self):
+        """Totals across every worker that shares this cache."""
+        self.flush_stats()
+        totals = self.shared.get_many([self._stats_prefix + name for name in STAT_NAMES])
+        return {name: totals.get(self._stats_prefix + name, 0) for name in STAT_NAMES}
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.stats = dict.fromkeys(STAT_NAMES, 0)
+        self.shared.delete_many([self._stats_prefix + name for name in STAT_NAMES])
+
+    # ---------- cache API ----------
+
+    def get(self, key, default=None, version=None):
+        local_key = self._local_key(key, version)
+        value = self.local.get(local_key)
+        if value is not _MISSING:
+            self._record('negative_hits' if value is NEGATIVE else 'local_hits')
+            return value
+
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._record('misses')
+            return default
+        self._record('negative_hits' if value is NEGATIVE else 'shared_hits')
+        self._record('evictions', self.local.set(local_key, value, self.options['LOCAL_TTL']))
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        remote = []
+        for key in keys:
+            value = self.local.get(self._local_key(key, version))
+            if value is _MISSING:
+                remote.append(key)
+            else:
+                found[key] = value
+        self._record('local_hits', len(found))
+        if remote:
+            shared = self.shared.get_many(remote, version=version)
+            evicted = 0
+            for key, value in shared.items():
+                evicted += self.local.set(self._local_key(key, version), value, self.options['LOCAL_TTL'])
+            self._record('shared_hits', len(shared))
+            self._record('misses', len(remote) - len(shared))
+            self._record('evictions', evicted)
+            found.update(shared)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        self.shared.set(key, value, ttl, version=version)
+        self._record('sets')
+        self._record('evictions', self.local.set(self._local_key(key, version), value, self._local_ttl(ttl)))
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        ttl = self._ttl(timeout)
+        failed = self.shared.set_many(data, ttl, version=version)
+        evicted = 0
+        for key, value in data.items():
+            if key not in failed:
+                evicted += self.local.set(self._local_key(key, version), value, self._local_ttl(ttl))
+        self._record('sets', len(data))
+        self._record('evictions', evicted)
+        return failed
+
+    def set_negative(self, key, timeout=None, version=None):
+        """Remember that ``key`` has no value; get() returns NEGATIVE until it expires."""
+        self.set(key, NEGATIVE, self.options['NEGATIVE_TTL'] if timeout is None else timeout, version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, self._ttl(timeout), version=version)
+        if added:
+            self.local.delete(self._local_key(key, version))
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, self._ttl(timeout), version=version)
+
+    def delete(self, key, version=None):
+        self.local.delete(self._local_key(key, version))
+        return self.shared.delete(key, version=version)
+
+    def delete_many(self, keys, version=None):
+        for key in keys:
+            self.local.delete(self._local_key(key, version))
+        self.shared.delete_many(keys, version=version)
+
+    def has_key(self, key, version=None):
+        if self.local.get(self._local_key(key, version)) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        # Counters live in the shared tier only
+        self.local.delete(self._local_key(key, version))
+        return self.shared.incr(key, delta, version=version)
+
+    def clear(self):
+        self.local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
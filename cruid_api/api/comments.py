@@ -0,0 +1,85 @@
+# backend/api/comments.py
+# Comment threads - post detail এ শুধু প্রথম page, বাকি replies আলাদা endpoint এ
+#
+# Serializing a thread used to walk every reply recursively. Now a page of
+# comments is serialized with two extra queries: one window-function query
+# that fetches the newest REPLY_PREVIEW replies of every comment on the page,
+# and one grouped count of replies for those comments and their previews.
+# The rest of a thread comes from the cursor-paginated
+# /api/comments/<id>/replies/ endpoint.
+
+from django.conf import settings
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from rest_framework.pagination import CursorPagination
+
+from .models import Comment
+
+COMMENTS_DEFAULTS = {
+    'PAGE_SIZE': 10,        # top-level comments embedded in post detail
+    'REPLY_PREVIEW': 3,     # newest replies embedded under each comment
+    'REPLY_PAGE_SIZE': 20,
+    'REPLY_MAX_PAGE_SIZE': 100,
+}
+
+
+def comments_setting(name):
+    return getattr(settings, 'COMMENTS', {}).get(name, COMMENTS_DEFAULTS[name])
+
+
+def thread_queryset():
+    return Comment.objects.select_related('author__profile')
+
+
+def load_reply_previews(comments, limit=None):
+    """{comment_id: [newest replies, newest first]} for every comment in ``comments``."""
+    if limit is None:
+        limit = comments_setting('REPLY_PREVIEW')
+    ids = [c.id for c in comments]
+    previews = {i: [] for i in ids}
+    if not ids or limit <= 0:
+        return previews
+    replies = thread_queryset().filter(parent_id__in=ids).annotate(
+        row=Window(RowNumber(), partition_by=F('parent_id'), order_by=[F('created_at').desc(), F('id').desc()])
+    ).filter(row__lte=limit).order_by('parent_id', 'row')
+    for reply in replies:
+        previews[reply.parent_id].append(reply)
+    return previews
+
+
+def load_reply_counts(ids):
+    rows = Comment.objects.filter(parent_id__in=ids).values('parent_id').annotate(n=Count('id'))
+    return {row['parent_id']: row['n'] for row in rows}
+
+
+def thread_context(comments):
+    """Serializer context that keeps CommentSerializer to a fixed number of queries."""
+    previews = load_reply_previews(comments)
+    ids = [c.id for c in comments] + [r.id for replies in previews.values() for r in replies]
+    return {
+        'reply_previews': previews,
+        'reply_counts': load_reply_counts(ids) if ids else {},
+    }
+
+
+class ReplyCursorPagination(CursorPagination):
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = comments_setting('REPLY_PAGE_SIZE')
+        self.max_page_size = comments_setting('REPLY_MAX_PAGE_SIZE')
+
+
+class CommentThreadMixin:
+    """Serialize comment pages with reply previews and counts instead of full threads."""
+
+    def get_serializer(self, *args, **kwargs):
+        if args and self.request.method == 'GET':
+            objects = list(args[0]) if kwargs.get('many') else [args[0]]
+            context = self.get_serializer_context()
+            context.update(thread_context(objects))
+            kwargs['context'] = context
+            if kwargs.get('many'):
+                args = (objects,) + args[1:]
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,201 @@
+# backend/api/events.py
+# Post activity events (Server-Sent Events) - নতুন comment / like এর delta push
+#
+# Signals publish events through EVENTS['BACKEND']. LocalBackend hands them
+# straight to this process's broadcaster (fine for a single worker and in
+# tests). RedisBackend fans them out to every worker over pub/sub. Each SSE
+# connection owns a small bounded queue; a subscriber that falls behind gets
+# one "resync" event instead of an ever-growing backlog.
+
+import asyncio
+import itertools
+import json
+import logging
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+EVENTS_DEFAULTS = {
+    'BACKEND': 'api.events.LocalBackend',
+    'REDIS_URL': 'redis://127.0.0.1:6379/0',
+    'QUEUE_SIZE': 32,             # pending events per connection
+    'HEARTBEAT': 20,              # seconds between keep-alive comments
+    'MAX_CONNECTIONS': 5000,      # per worker process
+    'RETRY_MS': 3000,             # client reconnect delay
+}
+
+
+# Set on post detail responses when the server can hold event streams open
+LIVE_EVENTS_HEADER = 'Live-Events'
+
+
+def events_setting(name):
+    return getattr(settings, 'EVENTS', {}).get(name, EVENTS_DEFAULTS[name])
+
+
+def streams_supported(request):
+    """Only ASGI can park a stream; under WSGI it would pin a worker thread."""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+class TooManySubscribers(Exception):
+    pass
+
+
+class Subscription:
+    __slots__ = ('post_id', 'queue', 'loop', 'lagging')
+
+    def __init__(self, post_id, loop, maxsize):
+        self.post_id = post_id
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.lagging = False
+
+    def offer(self, event):
+        # Runs on the subscriber's event loop
+        if self.lagging:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Drop the backlog; the client refetches once instead
+            self.lagging = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({'type': 'resync', 'post_id': self.post_id})
+
+
+class Broadcaster:
+    """In-process fan-out from publishers (any thread) to SSE subscribers (event loops)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._count = 0
+        self._ids = itertools.count(1)
+
+    def subscribe(self, post_id):
+        with self._lock:
+            if self._count >= events_setting('MAX_CONNECTIONS'):
+                raise TooManySubscribers()
+            sub = Subscription(post_id, asyncio.get_running_loop(), events_setting('QUEUE_SIZE'))
+            self._subscribers.setdefault(post_id, set()).add(sub)
+            self._count += 1
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.post_id)
+            if subs and sub in subs:
+                subs.discard(sub)
+                self._count -= 1
+                if not subs:
+                    del self._subscribers[sub.post_id]
+
+    def has_subscribers(self, post_id):
+        return post_id in self._subscribers
+
+    @property
+    def connection_count(self):
+        return self._count
+
+    def deliver(self, post_id, event):
+        with self._lock:
+            subs = list(self._subscribers.get(post_id, ()))
+        if not subs:
+            return
+        event = {**event, 'id': next(self._ids)}
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, event)
+            except RuntimeError:
+                # Loop closed under us: the connection is gone
+                self.unsubscribe(sub)
+
+
+broadcaster = Broadcaster()
+
+
+# ==================== Backends ====================
+
+class LocalBackend:
+    """Single-process stand-in: events reach only this worker's subscribers."""
+
+    def wants(self, post_id):
+        return broadcaster.has_subscribers(post_id)
+
+    def publish(self, post_id, event):
+        broadcaster.deliver(post_id, event)
+
+
+class RedisBackend:
+    """Cross-process fan-out over Redis pub/sub (requires the ``redis`` package)."""
+
+    channel_prefix = 'post-events:'
+
+    def __init__(self):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured('EVENTS BACKEND RedisBackend requires the "redis" package')
+        self.client = redis.Redis.from_url(events_setting('REDIS_URL'))
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def wants(self, post_id):
+        return True  # subscribers may live in other workers
+
+    def publish(self, post_id, event):
+        self._ensure_listener()
+        self.client.publish(f'{self.channel_prefix}{post_id}', json.dumps(event))
+
+    def _ensure_listener(self):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='post-events', daemon=True)
+                self._listener.start()
+
+    def _listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f'{self.channel_prefix}*')
+        for message in pubsub.listen():
+            try:
+                post_id = int(message['channel'].decode().rsplit(':', 1)[1])
+                broadcaster.deliver(post_id, json.loads(message['data']))
+            except (ValueError, KeyError, IndexError):
+                logger.warning('Ignoring malformed post event %r', message)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(events_setting('BACKEND'))()
+            if isinstance(_backend, RedisBackend):
+                _backend._ensure_listener()
+        return _backend
+
+
+def publish(post_id, event_type, build_data):
+    """Publish an event; ``build_data()`` only runs when someone may be listening."""
+    backend = get_backend()
+    if not backend.wants(post_id):
+        return
+    backend.publish(post_id, {'type': event_type, 'post_id': post_id, 'data': build_data()})
+
+
+def format_sse(event):
+    return (
+        f'id: {event.get("id", "")}\n'
+        f'event: {event["type"]}\n'
+        f'data: {json.dumps(event.get("data", {}), separators=(",", ":"), default=str)}\n\n'
+    )
@@ -0,0 +1,173 @@
+# backend/api/exports.py
+# Streaming NDJSON/CSV export - export endpoints ও export_blog command দুটোই এটা ব্যবহার করে
+#
+# Rows are read in short keyset windows (pk > last_pk ... LIMIT n) with .values(),
+# so memory stays flat and no single query/transaction spans the whole export.
+# NDJSON output uses the same row shape that import_blog reads.
+
+import csv
+import zlib
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Post, Comment, Like, Bookmark, Follow, Category, Tag
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+USER_DATASETS = ('posts', 'comments', 'likes', 'bookmarks')
+SITE_DATASETS = ('users', 'categories', 'tags', 'posts', 'comments', 'likes', 'bookmarks', 'follows')
+
+# dataset -> (row type, model, {output column: values() lookup})
+DATASETS = {
+    'users': ('user', User, {
+        'id': 'id', 'username': 'username', 'email': 'email',
+        'first_name': 'first_name', 'last_name': 'last_name', 'date_joined': 'date_joined',
+    }),
+    'categories': ('category', Category, {
+        'id': 'id', 'name': 'name', 'slug': 'slug', 'description': 'description',
+    }),
+    'tags': ('tag', Tag, {'id': 'id', 'name': 'name', 'slug': 'slug'}),
+    'posts': ('post', Post, {
+        'id': 'id', 'title': 'title', 'content': 'content', 'author': 'author__username',
+        'category': 'category__name', 'status': 'status', 'views_count': 'views_count',
+        'created_at': 'created_at', 'updated_at': 'updated_at',
+    }),
+    'comments': ('comment', Comment, {
+        'id': 'id', 'post': 'post_id', 'author': 'author__username', 'content': 'content',
+        'parent': 'parent_id', 'created_at': 'created_at', 'updated_at': 'updated_at',
+    }),
+    'likes': ('like', Like, {'id': 'id', 'post': 'post_id', 'user': 'user__username', 'created_at': 'created_at'}),
+    'bookmarks': ('bookmark', Bookmark, {
+        'id': 'id', 'post': 'post_id', 'user': 'user__username', 'created_at': 'created_at',
+    }),
+    'follows': ('follow', Follow, {
+        'id': 'id', 'follower': 'follower__username', 'following': 'following__username',
+        'created_at': 'created_at',
+    }),
+}
+
+# dataset -> owner lookup for per-user exports
+USER_FILTERS = {
+    'posts': 'author',
+    'comments': 'author',
+    'likes': 'user',
+    'bookmarks': 'user',
+}
+
+
+def export_setting(name, default):
+    return getattr(settings, 'EXPORT', {}).get(name, default)
+
+
+def iter_dataset(dataset, user=None):
+    """Yield export rows (dicts) for one dataset, one keyset window at a time."""
+    row_type, model, columns = DATASETS[dataset]
+    chunk_size = export_setting('CHUNK_SIZE', 2000)
+    queryset = model._default_manager.using(export_setting('DATABASE', 'default'))
+    if user is not None:
+        queryset = queryset.filter(**{USER_FILTERS[dataset]: user})
+    queryset = queryset.order_by('pk').values(*columns.values())
+
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        last_pk = chunk[-1]['id']
+
+        tags = _post_tags([row['id'] for row in chunk]) if dataset == 'posts' else None
+        for row in chunk:
+            out = {'type': row_type}
+            for column, lookup in columns.items():
+                out[column] = row[lookup]
+            if tags is not None:
+                out['tags'] = tags.get(row['id'], [])
+            yield out
+
+
+def _post_tags(post_ids):
+    through = Post.tags.through
+    rows = through.objects.using(export_setting('DATABASE', 'default')).filter(
+        post_id__in=post_ids
+    ).values_list('post_id', 'tag__name')
+    tags = {}
+    for post_id, name in rows:
+        tags.setdefault(post_id, []).append(name)
+    return tags
+
+
+# ==================== Encoders ====================
+
+def iter_ndjson(rows):
+    encoder = DjangoJSONEncoder(separators=(',', ':'))
+    for row in rows:
+        yield (encoder.encode(row) + '\n').encode()
+
+
+class _Echo:
+    # csv.writer target that hands back each line instead of buffering it
+    def write(self, value):
+        return value
+
+
+def iter_csv(dataset, rows):
+    writer = csv.writer(_Echo())
+    columns = list(DATASETS[dataset][2])
+    if dataset == 'posts':
+        columns.append('tags')
+    yield writer.writerow(columns).encode()
+    for row in rows:
+        if dataset == 'posts':
+            row['tags'] = '|'.join(row['tags'])
+        yield writer.writerow([row[column] for column in columns]).encode()
+
+
+def iter_gzip(chunks, flush_bytes=64 * 1024):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    pending = 0
+    for chunk in chunks:
+        pending += len(chunk)
+        out = compressor.compress(chunk)
+        if pending >= flush_bytes:
+            out += compressor.flush(zlib.Z_SYNC_FLUSH)
+            pending = 0
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def iter_export(datasets, fmt='ndjson', user=None, compress=False):
+    """Byte chunks for the requested datasets. CSV supports a single dataset."""
+    if fmt == 'csv':
+        if len(datasets) != 1:
+            raise ValueError('CSV export needs exactly one dataset')
+        chunks = iter_csv(datasets[0], iter_dataset(datasets[0], user=user))
+    else:
+        chunks = (
+            chunk
+            for dataset in datasets
+            for chunk in iter_ndjson(iter_dataset(dataset, user=user))
+        )
+    return iter_gzip(chunks) if compress else chunks
+
+
+def parse_datasets(value, allowed):
+    if not value:
+        return list(allowed)
+    datasets = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in datasets if name not in allowed]
+    if unknown:
+        raise ValueError(f'Unknown dataset(s): {", ".join(unknown)}')
+    return datasets
+
+
+def export_filename(base, fmt, compress):
+    return f'{base}.{fmt}' + ('.gz' if compress else '')
+
+
+def content_type_for(fmt, compress):
+    if compress:
+        return 'application/gzip'
+    return 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
@@ -0,0 +1,217 @@
+# backend/api/fragments.py
+# Per-post rendered JSON fragment cache - list endpoints এ post একবার serialize হয়
+#
+# The shared part of a PostListSerializer row (everything except views_count,
+# is_liked and is_bookmarked) is rendered once and cached as bytes under
+# (generation, host, post id, updated_at, likes, comments). A page costs one
+# get_many plus a few grouped queries; only misses go through the serializer,
+# and PostFragmentJSONRenderer splices the cached bytes into the response.
+
+import hashlib
+import json
+import re
+import secrets
+from collections.abc import Mapping
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+from .models import Bookmark, Comment, Like
+from .serializers import PostListSerializer
+from .normalized import is_normalized
+from .singleflight import SingleFlightTimeout, single_flight
+
+POST_FRAGMENT_DEFAULTS = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'TIMEOUT': 300,   # seconds; bounds staleness of nested author/tag counts
+}
+
+LIVE_FIELDS = ('views_count', 'is_liked', 'is_bookmarked')
+GENERATION_KEY = 'postfrag:generation'
+
+
+def fragment_setting(name):
+    return getattr(settings, 'POST_FRAGMENT_CACHE', {}).get(name, POST_FRAGMENT_DEFAULTS[name])
+
+
+def fragment_cache():
+    return caches[fragment_setting('CACHE')]
+
+
+def bump_fragment_generation():
+    """Invalidate every fragment, e.g. after a tag, category or author rename."""
+    cache = fragment_cache()
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, 2, None)
+
+
+class PostFragment(Mapping):
+    """Cached shared bytes plus the per-request fields; behaves like the serialized dict."""
+
+    def __init__(self, shared, live):
+        self.shared = shared
+        self.live = live
+        self._data = None
+
+    def render(self):
+        live = json.dumps(self.live, separators=(',', ':')).encode()
+        return self.shared[:-1] + b',' + live[1:]
+
+    @property
+    def data(self):
+        if self._data is None:
+            self._data = {**json.loads(self.shared), **self.live}
+        return self._data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __iter__(self):
+        return iter(self.data)
+
+    def __len__(self):
+        return len(self.data)
+
+
+def _grouped_counts(model, post_ids):
+    return dict(
+        model.objects.filter(post_id__in=post_ids).order_by()
+        .values('post_id').annotate(n=Count('id')).values_list('post_id', 'n')
+    )
+
+
+def load_post_counts(post_ids, request):
+    """Serializer context with the per-post counts and flags for a page, in four queries."""
+    user = getattr(request, 'user', None)
+    liked, bookmarked = set(), set()
+    if user is not None and user.is_authenticated:
+        liked = set(Like.objects.filter(user=user, post_id__in=post_ids).values_list('post_id', flat=True))
+        bookmarked = set(Bookmark.objects.filter(user=user, post_id__in=post_ids).values_list('post_id', flat=True))
+    return {
+        'likes_counts': _grouped_counts(Like, post_ids),
+        'comments_counts': _grouped_counts(Comment, post_ids),
+        'liked_post_ids': liked,
+        'bookmarked_post_ids': bookmarked,
+    }
+
+
+def load_post_fragments(posts, request, serializer_class=PostListSerializer):
+    """Return ``{post_id: PostFragment}`` for ``posts``, serializing only cache misses."""
+    posts = {post.pk: post for post in posts}
+    if not posts:
+        return {}
+    post_ids = list(posts)
+    counts = load_post_counts(post_ids, request)
+    likes, comments = counts['likes_counts'], counts['comments_counts']
+    liked, bookmarked = counts['liked_post_ids'], counts['bookmarked_post_ids']
+
+    cache = fragment_cache()
+    generation = cache.get_or_set(GENERATION_KEY, 1, None)
+    host = request.get_host() if request is not None else ''
+    keys = {
+        pk: f'postfrag:{generation}:{host}:{pk}:{post.updated_at.timestamp()}:{likes.get(pk, 0)}:{comments.get(pk, 0)}'
+        for pk, post in posts.items()
+    }
+    cached = cache.get_many(keys.values())
+
+    misses = [post for pk, post in posts.items() if keys[pk] not in cached]
+    if misses:
+        def render_misses():
+            serializer = serializer_class(misses, many=True, context={'request': request, **counts})
+            renderer = JSONRenderer()
+            fresh = {}
+            for post, row in zip(misses, serializer.data):
+                shared = {k: v for k, v in row.items() if k not in LIVE_FIELDS}
+                fresh[keys[post.pk]] = renderer.render(shared)
+            cache.set_many(fresh, fragment_setting('TIMEOUT'))
+            return fresh
+
+        # Concurrent requests for the same page render the misses once
+        flight_key = 'postfrag-fill:' + hashlib.md5(
+            '|'.join(sorted(keys[post.pk] for post in misses)).encode()
+        ).hexdigest()
+        try:
+            fresh = single_flight.do(flight_key, render_misses)
+        except SingleFlightTimeout:
+            fresh = render_misses()
+        cached.update(fresh)
+
+    return {
+        pk: PostFragment(cached[keys[pk]], {
+            'views_count': post.views_count,
+            'is_liked': pk in liked,
+            'is_bookmarked': pk in bookmarked,
+        })
+        for pk, post in posts.items()
+    }
+
+
+class FragmentEncoder(JSONEncoder):
+    def __init__(self, *args, fragments, marker, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fragments = fragments
+        self.marker = marker
+
+    def default(self, obj):
+        if isinstance(obj, PostFragment):
+            # Placeholder string, swapped for the cached bytes after encoding
+            self.fragments.append(obj)
+            return f'{self.marker}{len(self.fragments) - 1}{self.marker}'
+        return super().default(obj)
+
+
+class PostFragmentJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        fragments = []
+        # A fresh random marker per response: post content cannot forge a placeholder
+        marker = '\x00' + secrets.token_hex(8)
+        self.encoder_class = partial(FragmentEncoder, fragments=fragments, marker=marker)
+        ret = super().render(data, accepted_media_type, renderer_context)
+        if not fragments:
+            return ret
+        encoded = re.escape(json.dumps(marker)[1:-1].encode())
+        placeholder = re.compile(rb'"' + encoded + rb'(\d+)' + encoded + rb'"')
+        return placeholder.sub(lambda m: fragments[int(m.group(1))].render(), ret)
+
+
+class PostFragmentMixin:
+    """
+    List-view mixin: serve PostListSerializer rows from the fragment cache.
+
+    ``fragment_post_field`` names the attribute holding the post when the
+    listed objects are not posts themselves (e.g. ``'post'`` for bookmarks).
+    """
+    fragment_post_field = None
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if fragment_setting('ENABLED'):
+            renderers = [
+                PostFragmentJSONRenderer() if type(r) is JSONRenderer else r
+                for r in renderers
+            ]
+        return renderers
+
+    def get_serializer(self, *args, **kwargs):
+        if (
+            fragment_setting('ENABLED') and args and kwargs.get('many')
+            and self.request.method == 'GET'
+        ):
+            objects = list(args[0])
+            posts = [getattr(o, self.fragment_post_field) for o in objects] if self.fragment_post_field else objects
+            context = self.get_serializer_context()
+            if is_normalized(self.request):
+                # Fragments embed nested objects; normalized rows are serialized directly
+                context.update(load_post_counts([post.pk for post in posts], self.request))
+            else:
+                context['post_fragments'] = load_post_fragments(posts, self.request)
+            kwargs['context'] = context
+            args = (objects,) + args[1:]
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,216 @@
+# backend/api/graph.py
+# Follow graph - compact in-memory adjacency (CSR) for "who to follow" suggestions
+
+import logging
+import time
+from array import array
+from bisect import bisect_left
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Follow, Post
+from .utils import RebuiltIndex, TTLCache
+
+logger = logging.getLogger(__name__)
+
+FOLLOW_GRAPH_DEFAULTS = {
+    'MAX_EDGES': 2000000,            # hard cap on edges loaded into memory
+    'REBUILD_INTERVAL': 600,         # seconds, picks up follows made in other workers
+    'MAX_PENDING_CHANGES': 10000,    # overlay size that triggers a rebuild
+    'MAX_FANOUT': 500,               # neighbours inspected per followed user
+    'SUGGESTIONS_CACHE_TTL': 300,
+    'SUGGESTIONS_CACHE_SIZE': 10000,
+    'ACTIVITY_WINDOW_DAYS': 30,
+}
+
+
+def graph_setting(name):
+    return getattr(settings, 'FOLLOW_GRAPH', {}).get(name, FOLLOW_GRAPH_DEFAULTS[name])
+
+
+# Follow Graph
+class FollowGraph(RebuiltIndex):
+    """
+    Follower -> following adjacency in CSR form.
+
+    ``ids`` holds every user id seen in the graph (sorted), ``offsets`` and
+    ``targets`` store the out-edges as 32-bit indices into ``ids``, so an edge
+    costs 4 bytes. Follows/unfollows between rebuilds go to a small overlay.
+    Rebuilds read the database without holding ``_lock``; changes made while
+    one runs are replayed onto the new arrays when they are swapped in.
+    """
+
+    rebuild_name = 'follow-graph-rebuild'
+
+    def _reset_state(self):
+        super()._reset_state()
+        self.ids = array('q')
+        self.offsets = array('I', [0])
+        self.targets = array('I')
+        self._added = {}
+        self._removed = set()
+        self._pending = 0
+
+    # ---------- building ----------
+
+    def load_edges(self, edges):
+        """Build the CSR arrays from an iterable of (follower_id, following_id) pairs."""
+        self.install(self._csr(edges))
+
+    def _csr(self, edges):
+        max_edges = graph_setting('MAX_EDGES')
+        sources = array('q')
+        raw_targets = array('q')
+        for follower_id, following_id in edges:
+            if len(raw_targets) >= max_edges:
+                logger.warning('Follow graph truncated at %s edges', max_edges)
+                break
+            sources.append(follower_id)
+            raw_targets.append(following_id)
+
+        ids = array('q', sorted(set(sources).union(raw_targets)))
+        index = {user_id: i for i, user_id in enumerate(ids)}
+        offsets = array('I', bytes(4 * (len(ids) + 1)))
+        targets = array('I', bytes(4 * len(raw_targets)))
+
+        for user_id in sources:
+            offsets[index[user_id] + 1] += 1
+        for i in range(len(ids)):
+            offsets[i + 1] += offsets[i]
+
+        cursor = array('I', offsets[:-1])
+        for user_id, target_id in zip(sources, raw_targets):
+            row = index[user_id]
+            targets[cursor[row]] = index[target_id]
+            cursor[row] += 1
+        return ids, offsets, targets
+
+    def _load(self):
+        edges = Follow.objects.order_by().values_list('follower_id', 'following_id').iterator(chunk_size=10000)
+        return self._csr(edges)
+
+    def _install(self, state):
+        self.ids, self.offsets, self.targets = state
+        self._added = {}
+        self._removed = set()
+        self._pending = 0
+
+    def _is_stale(self):
+        return (
+            self._pending > graph_setting('MAX_PENDING_CHANGES')
+            or time.monotonic() - self.built_at > graph_setting('REBUILD_INTERVAL')
+        )
+
+    # ---------- queries ----------
+
+    def _row(self, user_id):
+        i = bisect_left(self.ids, user_id)
+        if i < len(self.ids) and self.ids[i] == user_id:
+            return i
+        return None
+
+    def _csr_following(self, user_id):
+        row = self._row(user_id)
+        if row is None:
+            return []
+        ids = self.ids
+        return [ids[t] for t in self.targets[self.offsets[row]:self.offsets[row + 1]]]
+
+    def following(self, user_id):
+        with self._lock:
+            result = set(self._csr_following(user_id))
+            result.update(self._added.get(user_id, ()))
+            if self._removed:
+                result = {t for t in result if (user_id, t) not in self._removed}
+            return result
+
+    def edge_count(self):
+        return len(self.targets)
+
+    def memory_bytes(self):
+        return (
+            self.ids.itemsize * len(self.ids)
+            + self.offsets.itemsize * len(self.offsets)
+            + self.targets.itemsize * len(self.targets)
+        )
+
+    # ---------- incremental updates ----------
+
+    def add_edge(self, follower_id, following_id):
+        with self._lock:
+            self._record(self.add_edge, follower_id, following_id)
+            if self.built_at is None:
+                return
+            self._removed.discard((follower_id, following_id))
+            self._added.setdefault(follower_id, set()).add(following_id)
+            self._pending += 1
+
+    def remove_edge(self, follower_id, following_id):
+        with self._lock:
+            self._record(self.remove_edge, follower_id, following_id)
+            if self.built_at is None:
+                return
+            added = self._added.get(follower_id)
+            if added:
+                added.discard(following_id)
+            self._removed.add((follower_id, following_id))
+            self._pending += 1
+
+    def mutual_counts(self, user_id):
+        """Count, for each candidate, how many of ``user_id``'s followees follow them."""
+        max_fanout = graph_setting('MAX_FANOUT')
+        following = self.following(user_id)
+        counts = {}
+        for followee in following:
+            for candidate in list(self.following(followee))[:max_fanout]:
+                if candidate == user_id or candidate in following:
+                    continue
+                counts[candidate] = counts.get(candidate, 0) + 1
+        return counts
+
+
+follow_graph = FollowGraph()
+suggestions_cache = TTLCache(
+    maxsize=graph_setting('SUGGESTIONS_CACHE_SIZE'),
+    ttl=graph_setting('SUGGESTIONS_CACHE_TTL'),
+)
+
+
+def get_suggestions(user, limit=10):
+    """Return ``[(user_id, mutual_count, recent_posts), ...]`` ranked for ``user``."""
+    cached = suggestions_cache.get(user.id)
+    if cached is not None:
+        computed_for, result = cached
+        # A short list computed for a smaller limit held every candidate there was
+        if computed_for >= limit or len(result) < computed_for:
+            return result[:limit]
+
+    # Rank enough for the cached list to answer any limit up to computed_for
+    computed_for = max(limit, 10)
+    follow_graph.ensure_built()
+    counts = follow_graph.mutual_counts(user.id)
+    candidates = sorted(counts, key=lambda c: -counts[c])[:computed_for * 5]
+
+    since = timezone.now() - timedelta(days=graph_setting('ACTIVITY_WINDOW_DAYS'))
+    activity_qs = Post.objects.filter(status='published', created_at__gte=since)
+    if candidates:
+        activity_qs = activity_qs.filter(author_id__in=candidates)
+    else:
+        # No friends-of-friends yet: fall back to the most active authors
+        activity_qs = activity_qs.exclude(author_id=user.id).exclude(
+            author_id__in=follow_graph.following(user.id)
+        )
+    activity = dict(
+        activity_qs.order_by().values('author_id').annotate(n=Count('id'))
+        .order_by('-n').values_list('author_id', 'n')[:max(computed_for * 5, 50)]
+    )
+    if not candidates:
+        candidates = list(activity)
+
+    ranked = sorted(candidates, key=lambda c: (-counts.get(c, 0), -activity.get(c, 0), c))
+    result = [(c, counts.get(c, 0), activity.get(c, 0)) for c in ranked[:computed_for]]
+    suggestions_cache.set(user.id, (computed_for, result))
+    return result[:limit]
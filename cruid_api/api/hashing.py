@@ -0,0 +1,112 @@
+# backend/api/hashing.py
+# Password hashing off the request thread - bounded process pool
+#
+# PBKDF2 is CPU bound; running it in a small process pool keeps ASGI event
+# loops (and WSGI worker threads) free. Once MAX_PENDING hashes are queued new
+# work is refused with HashingQueueFull, which the views turn into a 429.
+
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, identify_hasher, make_password
+
+PASSWORD_HASHING_DEFAULTS = {
+    'EXECUTOR': 'process',      # 'process' or 'thread'
+    'WORKERS': 2,
+    'MAX_PENDING': 32,
+    'REHASH_ALGORITHM': None,   # e.g. 'argon2'; must be listed in PASSWORD_HASHERS
+}
+
+
+def hashing_setting(name):
+    return getattr(settings, 'PASSWORD_HASHING', {}).get(name, PASSWORD_HASHING_DEFAULTS[name])
+
+
+class HashingQueueFull(Exception):
+    pass
+
+
+# ---------- functions executed in the pool (must be picklable) ----------
+
+def verify_password(password, encoded):
+    return check_password(password, encoded)
+
+
+def hash_password(password, algorithm='default'):
+    return make_password(password, hasher=algorithm)
+
+
+# ---------- pool ----------
+
+class PasswordHashingPool:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                workers = hashing_setting('WORKERS')
+                if hashing_setting('EXECUTOR') == 'thread':
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='hashing')
+                else:
+                    self._executor = ProcessPoolExecutor(max_workers=workers)
+            return self._executor
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def is_full(self):
+        return self._pending >= hashing_setting('MAX_PENDING')
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= hashing_setting('MAX_PENDING'):
+                raise HashingQueueFull()
+            self._pending += 1
+
+    def _release(self):
+        with self._lock:
+            self._pending -= 1
+
+    async def run(self, fn, *args):
+        self._acquire()
+        try:
+            future = self._get_executor().submit(fn, *args)
+            return await asyncio.wrap_future(future)
+        finally:
+            self._release()
+
+    def run_sync(self, fn, *args):
+        self._acquire()
+        try:
+            return self._get_executor().submit(fn, *args).result()
+        finally:
+            self._release()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+hashing_pool = PasswordHashingPool()
+
+
+def rehash_algorithm(encoded):
+    """Algorithm a stored hash should be upgraded to after a successful login, or None."""
+    target = hashing_setting('REHASH_ALGORITHM')
+    if not target:
+        return None
+    try:
+        current = identify_hasher(encoded)
+    except ValueError:
+        return None
+    if current.algorithm != target or current.must_update(encoded):
+        return target
+    return None
@@ -0,0 +1,231 @@
+# backend/api/jobs.py
+# Database-backed background jobs - আলাদা broker লাগে না
+#
+# enqueue() writes a Job row in the caller's transaction, so a job exists only
+# if the request that created it committed. `manage.py run_workers` claims due
+# jobs (highest priority first) with a conditional UPDATE, runs them, and
+# retries failures with exponential backoff. Handlers registered with
+# batch=True receive every claimed payload of their kind in one call; those
+# registered with every=<seconds> are also queued by the workers on that
+# interval, once across all workers.
+
+import logging
+import random
+import socket
+import threading
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_DEFAULTS = {
+    'BATCH_SIZE': 100,          # jobs claimed per poll
+    'POLL_INTERVAL': 1.0,       # seconds between polls when idle
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 5,          # seconds; doubles per attempt
+    'BACKOFF_MAX': 3600,
+    'LOCK_TIMEOUT': 300,        # running jobs older than this are requeued (crashed worker)
+    'KEEP_DONE': 7 * 24 * 3600, # seconds finished jobs are kept
+    'PURGE_INTERVAL': 3600,
+    'DEFER_SIDE_EFFECTS': False, # True queues view counts / profile creation for run_workers
+}
+
+
+def job_setting(name):
+    return getattr(settings, 'JOBS', {}).get(name, JOB_DEFAULTS[name])
+
+
+# ==================== Registry ====================
+
+HANDLERS = {}
+PERIODIC = {}   # kind -> seconds between runs
+
+
+def job(kind, batch=False, every=None):
+    """Register ``fn(payload)`` (or ``fn(payloads)`` when ``batch``) as the handler for ``kind``."""
+    def decorator(fn):
+        HANDLERS[kind] = (fn, batch)
+        if every:
+            PERIODIC[kind] = every
+        return fn
+    return decorator
+
+
+def enqueue(kind, payload=None, priority=0, delay=0, idempotency_key=None, max_attempts=None):
+    """Queue a job; returns the Job, or None when ``idempotency_key`` was already used."""
+    if kind not in HANDLERS:
+        raise ValueError(f'Unknown job kind: {kind}')
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        priority=priority,
+        run_after=timezone.now() + timedelta(seconds=delay),
+        idempotency_key=idempotency_key,
+        max_attempts=max_attempts or job_setting('MAX_ATTEMPTS'),
+    )
+    if idempotency_key is None:
+        job.save()
+        return job
+    try:
+        with transaction.atomic():
+            job.save()
+    except IntegrityError:
+        return None
+    return job
+
+
+def run_or_enqueue(kind, payload=None, **kwargs):
+    """Defer a side effect, or run it inline when DEFER_SIDE_EFFECTS is off."""
+    if job_setting('DEFER_SIDE_EFFECTS'):
+        return enqueue(kind, payload, **kwargs)
+    fn, batch = HANDLERS[kind]
+    if batch:
+        fn([payload or {}])
+    else:
+        fn(payload or {})
+    return None
+
+
+# ==================== Worker ====================
+
+def backoff_delay(attempts):
+    delay = min(job_setting('BACKOFF_BASE') * 2 ** (attempts - 1), job_setting('BACKOFF_MAX'))
+    return delay * (0.5 + random.random() / 2)
+
+
+def requeue_stale():
+    # A lost claim counts as an attempt, so a job that keeps killing its worker ends up failed
+    now = timezone.now()
+    stale = Job.objects.filter(status='running', locked_at__lt=now - timedelta(seconds=job_setting('LOCK_TIMEOUT')))
+    released = {'attempts': F('attempts') + 1, 'locked_by': '', 'locked_at': None, 'last_error': 'Worker lock timed out'}
+    stale.filter(attempts__gte=F('max_attempts') - 1).update(status='failed', finished_at=now, **released)
+    return stale.update(status='queued', **released)
+
+
+def claim_jobs(worker_id, limit, kinds=None):
+    now = timezone.now()
+    due = Job.objects.filter(status='queued', run_after__lte=now)
+    if kinds:
+        due = due.filter(kind__in=kinds)
+    ids = list(due.order_by('-priority', 'run_after', 'id').values_list('id', flat=True)[:limit])
+    if not ids:
+        return []
+    # Conditional UPDATE: a job another worker claimed first is no longer 'queued'
+    token = f'{worker_id}:{uuid.uuid4().hex[:8]}'
+    Job.objects.filter(id__in=ids, status='queued').update(
+        status='running', locked_by=token, locked_at=now
+    )
+    return list(Job.objects.filter(locked_by=token, status='running').order_by('-priority', 'run_after', 'id'))
+
+
+def _mark_failed(jobs, error):
+    now = timezone.now()
+    for j in jobs:
+        j.attempts += 1
+        j.last_error = error
+        j.locked_by = ''
+        j.locked_at = None
+        if j.attempts >= j.max_attempts:
+            j.status = 'failed'
+            j.finished_at = now
+        else:
+            j.status = 'queued'
+            j.run_after = now + timedelta(seconds=backoff_delay(j.attempts))
+    Job.objects.bulk_update(
+        jobs, ['attempts', 'last_error', 'locked_by', 'locked_at', 'status', 'finished_at', 'run_after']
+    )
+
+
+def run_jobs(jobs):
+    """Run claimed jobs; same-kind jobs with a batch handler run in one call."""
+    groups = {}
+    for j in jobs:
+        groups.setdefault(j.kind, []).append(j)
+
+    for kind, group in groups.items():
+        handler = HANDLERS.get(kind)
+        if handler is None:
+            _mark_failed(group, f'No handler registered for {kind}')
+            continue
+        fn, batch = handler
+        units = [group] if batch else [[j] for j in group]
+        for unit in units:
+            try:
+                with transaction.atomic():
+                    if batch:
+                        fn([j.payload for j in unit])
+                    else:
+                        fn(unit[0].payload)
+            except Exception:
+                logger.warning('Job %s failed', ','.join(str(j.id) for j in unit), exc_info=True)
+                _mark_failed(unit, traceback.format_exc(limit=5))
+            else:
+                Job.objects.filter(id__in=[j.id for j in unit]).update(
+                    status='done', attempts=F('attempts') + 1, locked_by='',
+                    finished_at=timezone.now(), last_error=''
+                )
+
+
+def run_pending_jobs(worker_id='inline', kinds=None):
+    """Drain every due job in this thread; returns the number of jobs run."""
+    total = 0
+    while True:
+        jobs = claim_jobs(worker_id, job_setting('BATCH_SIZE'), kinds)
+        if not jobs:
+            return total
+        run_jobs(jobs)
+        total += len(jobs)
+
+
+def enqueue_periodic(scheduled):
+    """Queue each periodic job once per interval; ``scheduled`` maps kind -> last bucket queued."""
+    now = time.time()
+    for kind, every in PERIODIC.items():
+        bucket = int(now // every)
+        if scheduled.get(kind) == bucket:
+            continue
+        # The idempotency key keeps it to one job per interval across workers
+        enqueue(kind, idempotency_key=f'{kind}:every:{bucket}')
+        scheduled[kind] = bucket
+
+
+def purge_finished():
+    cutoff = timezone.now() - timedelta(seconds=job_setting('KEEP_DONE'))
+    return Job.objects.filter(Q(status='done') | Q(status='failed'), finished_at__lt=cutoff).delete()[0]
+
+
+class Worker:
+    """Poll loop; ``run_workers`` starts one per thread or process."""
+
+    def __init__(self, name=None, kinds=None, stop_event=None):
+        self.name = name or f'{socket.gethostname()}:{threading.get_ident()}'
+        self.kinds = kinds
+        self.stop_event = stop_event or threading.Event()
+
+    def run(self, once=False):
+        last_purge = 0
+        scheduled = {}
+        while not self.stop_event.is_set():
+            close_old_connections()
+            requeue_stale()
+            enqueue_periodic(scheduled)
+            if time.monotonic() - last_purge > job_setting('PURGE_INTERVAL'):
+                purge_finished()
+                last_purge = time.monotonic()
+            jobs = claim_jobs(self.name, job_setting('BATCH_SIZE'), self.kinds)
+            if jobs:
+                run_jobs(jobs)
+                continue
+            if once:
+                break
+            self.stop_event.wait(job_setting('POLL_INTERVAL'))
+        close_old_connections()
@@ -0,0 +1,445 @@
+# backend/api/loadtest.py
+# In-process load test - WSGI (thread pool) বা ASGI (asyncio) application কে সরাসরি call করে
+#
+# `manage.py loadtest` seeds loadtest_* users and posts, then replays a
+# weighted mix of real requests (anonymous feed, timeline, post detail with
+# its view increment, like toggle, comment create, search) against
+# cruid_api.wsgi.application from a thread pool or cruid_api.asgi.application
+# from asyncio tasks. No network or server process is involved, so the numbers
+# measure Django, the views and the database. Results (throughput, latency
+# percentiles, status codes, errors, lock-contention errors) are written as
+# JSON and can be compared with an earlier run.
+
+import asyncio
+import io
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection
+
+from .authentication import VersionedRefreshToken
+from .models import Follow, Post
+
+SEED_PREFIX = 'loadtest_'
+SEARCH_TERMS = ('post', 'load', 'django', 'react', 'test')
+
+DEFAULT_MIX = {
+    'feed': 40,
+    'timeline': 15,
+    'detail': 25,
+    'like': 8,
+    'comment': 5,
+    'search': 7,
+}
+
+# Driver exceptions / logged server errors that mean the database refused a lock
+LOCK_ERROR_MARKERS = (
+    'database is locked',
+    'database table is locked',
+    'deadlock detected',
+    'could not serialize access',
+    'lock wait timeout',
+)
+
+
+def is_lock_error(message):
+    message = message.lower()
+    return any(marker in message for marker in LOCK_ERROR_MARKERS)
+
+
+def parse_mix(value):
+    """'feed=40,detail=25' -> {'feed': 40, 'detail': 25}"""
+    if not value:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in DEFAULT_MIX:
+            raise ValueError(f'Unknown scenario "{name}" (choose from {", ".join(DEFAULT_MIX)})')
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise ValueError(f'Invalid weight for "{name}": {weight}')
+    if not any(mix.values()):
+        raise ValueError('At least one scenario needs a positive weight')
+    return mix
+
+
+# ==================== Seeding ====================
+
+def seed(users=20, posts=200, follows=5, password='loadtest-pass'):
+    """Create missing loadtest_* users and posts; returns (user ids, post ids)."""
+    existing = list(User.objects.filter(username__startswith=SEED_PREFIX).order_by('id'))
+    missing = [
+        User(username=f'{SEED_PREFIX}{i}', email=f'{SEED_PREFIX}{i}@example.com')
+        for i in range(len(existing), users)
+    ]
+    if missing:
+        # Hash once; every seeded user shares the password
+        template = User()
+        template.set_password(password)
+        for user in missing:
+            user.password = template.password
+        User.objects.bulk_create(missing)
+        existing = list(User.objects.filter(username__startswith=SEED_PREFIX).order_by('id'))
+    user_ids = [u.id for u in existing[:users]]
+
+    post_qs = Post.objects.filter(author_id__in=user_ids, status='published')
+    have = post_qs.count()
+    if have < posts:
+        rng = random.Random(have)
+        for i in range(have, posts):
+            Post.objects.create(
+                title=f'Load test post {i}',
+                content=' '.join(rng.choice(SEARCH_TERMS + ('lorem', 'ipsum', 'dolor')) for _ in range(300)),
+                author_id=user_ids[i % len(user_ids)],
+                status='published',
+            )
+    post_ids = list(post_qs.values_list('id', flat=True)[:posts])
+
+    rng = random.Random(0)
+    Follow.objects.bulk_create([
+        Follow(follower_id=uid, following_id=other)
+        for uid in user_ids
+        for other in rng.sample(user_ids, min(follows + 1, len(user_ids)))
+        if other != uid
+    ], ignore_conflicts=True)
+    return user_ids, post_ids
+
+
+def access_tokens(user_ids):
+    users = User.objects.filter(id__in=user_ids)
+    return [str(VersionedRefreshToken.for_user(user).access_token) for user in users]
+
+
+# ==================== Request mix ====================
+
+class RequestSpec:
+    __slots__ = ('scenario', 'method', 'path', 'query', 'body', 'token')
+
+    def __init__(self, scenario, method, path, query=None, body=None, token=None):
+        self.scenario = scenario
+        self.method = method
+        self.path = path
+        self.query = urlencode(query or {})
+        self.body = json.dumps(body).encode() if body is not None else b''
+        self.token = token
+
+
+class RequestMix:
+    def __init__(self, mix, post_ids, tokens, seed_value=None):
+        if not post_ids or not tokens:
+            raise ValueError('The load test needs seeded posts and users')
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.post_ids = post_ids
+        self.tokens = tokens
+        self.rng = random.Random(seed_value)
+        self._lock = threading.Lock()
+
+    def next(self):
+        with self._lock:
+            name = self.rng.choices(self.names, self.weights)[0]
+            post_id = self.rng.choice(self.post_ids)
+            token = self.rng.choice(self.tokens)
+            page = self.rng.randint(1, 3)
+            term = self.rng.choice(SEARCH_TERMS)
+        if name == 'feed':
+            return RequestSpec(name, 'GET', '/api/posts/', {'page': page})
+        if name == 'timeline':
+            return RequestSpec(name, 'GET', '/api/timeline/', token=token)
+        if name == 'detail':
+            return RequestSpec(name, 'GET', f'/api/posts/{post_id}/')
+        if name == 'like':
+            return RequestSpec(name, 'POST', f'/api/posts/{post_id}/like/', token=token)
+        if name == 'comment':
+            return RequestSpec(name, 'POST', f'/api/posts/{post_id}/comments/', body={'content': 'Load test comment'}, token=token)
+        return RequestSpec(name, 'GET', '/api/search/', {'q': term})
+
+
+# ==================== Results ====================
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = {}
+        self.statuses = {}
+        self.errors = Counter()
+        self.lock_errors = 0
+
+    def record(self, scenario, status, elapsed, error=None):
+        with self._lock:
+            self.latencies.setdefault(scenario, []).append(elapsed)
+            self.statuses.setdefault(scenario, Counter())[str(status)] += 1
+            if error:
+                self.errors[error] += 1
+
+    def lock_error(self):
+        with self._lock:
+            self.lock_errors += 1
+
+    def summary(self, duration, meta):
+        scenarios = {}
+        total = failed = 0
+        for name, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            statuses = self.statuses[name]
+            errors = sum(n for code, n in statuses.items() if code == 'error' or int(code) >= 500)
+            total += len(values)
+            failed += errors
+            scenarios[name] = {
+                'requests': len(values),
+                'errors': errors,
+                'error_rate': round(errors / len(values), 4),
+                'statuses': dict(sorted(statuses.items())),
+                'latency_ms': {
+                    'mean': round(sum(values) / len(values) * 1000, 2),
+                    'p50': round(percentile(values, 50) * 1000, 2),
+                    'p90': round(percentile(values, 90) * 1000, 2),
+                    'p95': round(percentile(values, 95) * 1000, 2),
+                    'p99': round(percentile(values, 99) * 1000, 2),
+                    'max': round(values[-1] * 1000, 2),
+                },
+            }
+        return {
+            **meta,
+            'duration_s': round(duration, 3),
+            'requests': total,
+            'throughput_rps': round(total / duration, 2) if duration else None,
+            'errors': failed,
+            'error_rate': round(failed / total, 4) if total else 0,
+            'lock_errors': self.lock_errors,
+            'exceptions': dict(self.errors.most_common(10)),
+            'scenarios': scenarios,
+        }
+
+
+class LockErrorHandler(logging.Handler):
+    """Counts server errors logged by django.request that were lock contention."""
+
+    def __init__(self, recorder):
+        super().__init__(level=logging.ERROR)
+        self.recorder = recorder
+
+    def emit(self, record):
+        exc = record.exc_info[1] if record.exc_info else None
+        if exc is not None and is_lock_error(str(exc)):
+            self.recorder.lock_error()
+
+
+# ==================== Drivers ====================
+
+def _headers(spec, host):
+    headers = [(b'host', host.encode()), (b'accept', b'application/json')]
+    if spec.body:
+        headers += [(b'content-type', b'application/json'), (b'content-length', str(len(spec.body)).encode())]
+    if spec.token:
+        headers.append((b'authorization', f'Bearer {spec.token}'.encode()))
+    return headers
+
+
+def wsgi_environ(spec, host):
+    environ = {
+        'REQUEST_METHOD': spec.method,
+        'PATH_INFO': spec.path,
+        'QUERY_STRING': spec.query,
+        'SERVER_NAME': host,
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(spec.body),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in _headers(spec, host):
+        key = name.decode().upper().replace('-', '_')
+        if key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            environ[key] = value.decode()
+        else:
+            environ[f'HTTP_{key}'] = value.decode()
+    return environ
+
+
+class LoadTest:
+    def __init__(self, application, interface, mix, concurrency=8, requests=None, duration=10.0, host='localhost'):
+        if requests is None and not duration:
+            raise ValueError('Give a request count or a duration')
+        self.application = application
+        self.interface = interface
+        self.mix = mix
+        self.concurrency = max(1, concurrency)
+        self.requests = requests
+        self.duration = duration
+        self.host = host
+        self.recorder = Recorder()
+        self._issued = 0
+        self._issued_lock = threading.Lock()
+
+    def _take(self, deadline):
+        # One more request to send? (shared budget across workers)
+        if self.requests is None:
+            return time.monotonic() < deadline
+        with self._issued_lock:
+            if self._issued >= self.requests:
+                return False
+            self._issued += 1
+            return True
+
+    def _record(self, spec, status, started, error=None):
+        elapsed = time.perf_counter() - started
+        if error is not None:
+            if is_lock_error(str(error)):
+                self.recorder.lock_error()
+            self.recorder.record(spec.scenario, 'error', elapsed, f'{type(error).__name__}: {error}')
+            return
+        self.recorder.record(spec.scenario, status, elapsed)
+
+    # ---------- WSGI ----------
+
+    def _wsgi_worker(self, deadline):
+        try:
+            while self._take(deadline):
+                spec = self.mix.next()
+                started = time.perf_counter()
+                status = []
+                try:
+                    result = self.application(wsgi_environ(spec, self.host), lambda s, h, exc_info=None: status.append(s))
+                    try:
+                        for _ in result:
+                            pass
+                    finally:
+                        if hasattr(result, 'close'):
+                            result.close()
+                except Exception as e:
+                    self._record(spec, None, started, error=e)
+                else:
+                    self._record(spec, int(status[0].split()[0]), started)
+        finally:
+            close_old_connections()
+
+    def _run_wsgi(self, deadline):
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='loadtest') as pool:
+            futures = [pool.submit(self._wsgi_worker, deadline) for _ in range(self.concurrency)]
+            for future in futures:
+                future.result()
+
+    # ---------- ASGI ----------
+
+    async def _asgi_request(self, spec):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': spec.method,
+            'scheme': 'http',
+            'path': spec.path,
+            'raw_path': spec.path.encode(),
+            'query_string': spec.query.encode(),
+            'root_path': '',
+            'headers': _headers(spec, self.host),
+            'client': ('127.0.0.1', 0),
+            'server': (self.host, 80),
+        }
+        sent = False
+        status = None
+        done = asyncio.Event()
+
+        async def receive():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {'type': 'http.request', 'body': spec.body, 'more_body': False}
+            await done.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body':
+                if not message.get('more_body'):
+                    done.set()
+
+        await self.application(scope, receive, send)
+        done.set()
+        return status
+
+    async def _asgi_worker(self, deadline):
+        while self._take(deadline):
+            spec = self.mix.next()
+            started = time.perf_counter()
+            try:
+                status = await self._asgi_request(spec)
+            except Exception as e:
+                self._record(spec, None, started, error=e)
+            else:
+                self._record(spec, status, started)
+
+    async def _run_asgi(self, deadline):
+        await asyncio.gather(*(self._asgi_worker(deadline) for _ in range(self.concurrency)))
+
+    # ---------- entry point ----------
+
+    def run(self):
+        handler = LockErrorHandler(self.recorder)
+        request_logger = logging.getLogger('django.request')
+        request_logger.addHandler(handler)
+        started = time.perf_counter()
+        deadline = time.monotonic() + (self.duration or 0)
+        try:
+            if self.interface == 'asgi':
+                asyncio.run(self._run_asgi(deadline))
+            else:
+                self._run_wsgi(deadline)
+        finally:
+            request_logger.removeHandler(handler)
+        elapsed = time.perf_counter() - started
+        return self.recorder.summary(elapsed, {
+            'interface': self.interface,
+            'concurrency': self.concurrency,
+            'database': connection.vendor,
+            'mix': dict(zip(self.mix.names, self.mix.weights)),
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        })
+
+
+def compare(current, baseline):
+    """Lines describing throughput / latency / error changes against an earlier result."""
+    def change(new, old):
+        if not old:
+            return 'n/a'
+        return f'{(new - old) / old * 100:+.1f}%'
+
+    lines = [
+        f'throughput {baseline["throughput_rps"]} -> {current["throughput_rps"]} rps '
+        f'({change(current["throughput_rps"], baseline["throughput_rps"])})',
+        f'error rate {baseline["error_rate"]} -> {current["error_rate"]}, '
+        f'lock errors {baseline["lock_errors"]} -> {current["lock_errors"]}',
+    ]
+    for name, stats in current['scenarios'].items():
+        old = baseline.get('scenarios', {}).get(name)
+        if old:
+            lines.append(
+                f'{name}: p95 {old["latency_ms"]["p95"]} -> {stats["latency_ms"]["p95"]} ms '
+                f'({change(stats["latency_ms"]["p95"], old["latency_ms"]["p95"])})'
+            )
+    return lines
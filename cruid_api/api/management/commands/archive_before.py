@@ -0,0 +1,30 @@
+# backend/api/management/commands/archive_before.py
+# Move old posts to cold storage: python manage.py archive_before 2023-01-01
+
+from datetime import date, datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from api.archive import archive_posts
+
+
+class Command(BaseCommand):
+    help = 'Move content, comments and likes of posts created before a date into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('date', help='Archive posts created before this date (YYYY-MM-DD)')
+        parser.add_argument('--batch-size', type=int, help='Posts per batch')
+        parser.add_argument('--dry-run', action='store_true', help='Only count what would be archived')
+
+    def handle(self, *args, **options):
+        try:
+            before = timezone.make_aware(datetime.combine(date.fromisoformat(options['date']), time.min))
+        except ValueError:
+            raise CommandError('date must be YYYY-MM-DD')
+        if before > timezone.now():
+            raise CommandError('date must not be in the future')
+
+        posts, comments, likes = archive_posts(before, batch_size=options['batch_size'], dry_run=options['dry_run'])
+        verb = 'Would archive' if options['dry_run'] else 'Archived'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {posts} posts, {comments} comments and {likes} likes'))
@@ -0,0 +1,38 @@
+# backend/api/management/commands/backfill_excerpts.py
+# Fill Post.excerpt / reading_time for existing rows: python manage.py backfill_excerpts
+
+from django.core.management.base import BaseCommand
+
+from api.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Compute stored excerpts and reading times for posts in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--all', action='store_true',
+                            help='Recompute every post, not only those without an excerpt')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Post.objects.order_by('pk').only('id', 'content')
+        if not options['all']:
+            queryset = queryset.filter(excerpt='')
+
+        last_pk = 0
+        updated = 0
+        while True:
+            # Keyset batches: only one batch of post bodies is in memory at a time
+            posts = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not posts:
+                break
+            for post in posts:
+                post.refresh_summary()
+            # bulk_update skips save(), so updated_at is left alone
+            Post.objects.bulk_update(posts, ['excerpt', 'reading_time'])
+            updated += len(posts)
+            last_pk = posts[-1].pk
+            self.stdout.write(f'  {updated} posts updated', ending='\r')
+
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {updated} posts'))
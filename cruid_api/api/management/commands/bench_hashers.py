@@ -0,0 +1,48 @@
+# backend/api/management/commands/bench_hashers.py
+# Password hasher cost benchmark: python manage.py bench_hashers --rounds 5
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.hashers import get_hashers
+from django.core.management.base import BaseCommand
+
+from api.hashing import hashing_pool, hash_password, hashing_setting
+
+
+class Command(BaseCommand):
+    help = 'Measure the cost of each configured password hasher and the hashing pool throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=5, help='Hashes per hasher')
+        parser.add_argument('--concurrency', type=int, default=8, help='Parallel submissions to the pool')
+
+    def handle(self, *args, **options):
+        rounds = options['rounds']
+        self.stdout.write(f'{"algorithm":<24}{"ms/hash":>10}{"hashes/s":>12}')
+
+        for hasher in get_hashers():
+            try:
+                started = time.perf_counter()
+                for _ in range(rounds):
+                    hasher.encode('benchmark-password', hasher.salt())
+                elapsed = (time.perf_counter() - started) / rounds
+            except Exception as e:  # hasher library not installed, etc.
+                self.stdout.write(f'{hasher.algorithm:<24}{"skipped":>10}  ({e})')
+                continue
+            self.stdout.write(f'{hasher.algorithm:<24}{elapsed * 1000:>10.1f}{1 / elapsed:>12.1f}')
+
+        # Pool throughput with the default hasher
+        concurrency = min(options['concurrency'], hashing_setting('MAX_PENDING'))
+        total = max(rounds * concurrency, concurrency)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as submitters:
+            list(submitters.map(lambda _: hashing_pool.run_sync(hash_password, 'benchmark-password'), range(total)))
+        elapsed = time.perf_counter() - started
+        hashing_pool.shutdown()
+
+        self.stdout.write('')
+        self.stdout.write(
+            f'Pool ({hashing_setting("EXECUTOR")}, {hashing_setting("WORKERS")} workers, '
+            f'{get_hashers()[0].algorithm}): {total / elapsed:.1f} hashes/s'
+        )
@@ -0,0 +1,44 @@
+# backend/api/management/commands/cache_stats.py
+# Two-tier cache hit rates (all workers): python manage.py cache_stats
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from api.cache_backends import TwoTierCache
+
+
+class Command(BaseCommand):
+    help = 'Report hit-rate statistics for TwoTierCache caches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--alias', action='append', help='Cache alias (default: every TwoTierCache)')
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after reporting')
+
+    def handle(self, *args, **options):
+        aliases = options['alias'] or [
+            alias for alias in settings.CACHES if isinstance(caches[alias], TwoTierCache)
+        ]
+        if not aliases:
+            raise CommandError('No TwoTierCache configured in CACHES')
+
+        for alias in aliases:
+            cache = caches[alias]
+            if not isinstance(cache, TwoTierCache):
+                raise CommandError(f'Cache "{alias}" is not a TwoTierCache')
+
+            stats = cache.read_stats()
+            lookups = stats['local_hits'] + stats['shared_hits'] + stats['negative_hits'] + stats['misses']
+            hits = lookups - stats['misses']
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{alias} ({type(cache.shared).__name__} shared tier)'))
+            for name, value in stats.items():
+                self.stdout.write(f'  {name:<14}{value:>12}')
+            rate = hits / lookups * 100 if lookups else 0.0
+            local_rate = stats['local_hits'] / lookups * 100 if lookups else 0.0
+            self.stdout.write(f'  {"hit rate":<14}{rate:>11.1f}%  (local {local_rate:.1f}%)')
+            self.stdout.write(
+                f'  {"local tier":<14}{len(cache.local):>12} entries, {cache.local.size / 1024:.0f} KiB in this process'
+            )
+
+            if options['reset']:
+                cache.reset_stats()
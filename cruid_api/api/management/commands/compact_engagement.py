@@ -0,0 +1,17 @@
+# backend/api/management/commands/compact_engagement.py
+# Fold pending engagement events into the daily rollups: python manage.py compact_engagement
+
+from django.core.management.base import BaseCommand
+
+from api.analytics import compact_engagement
+
+
+class Command(BaseCommand):
+    help = 'Fold pending engagement events into DailyPostStats'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Events per transaction')
+
+    def handle(self, *args, **options):
+        compacted = compact_engagement(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Compacted {compacted} engagement events'))
@@ -0,0 +1,53 @@
+# backend/api/management/commands/export_blog.py
+# Streaming export: python manage.py export_blog --output dump.ndjson.gz --gzip
+# NDJSON output can be fed back into import_blog.
+
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.exports import (
+    EXPORT_FORMATS, USER_DATASETS, SITE_DATASETS, iter_export, parse_datasets
+)
+
+
+class Command(BaseCommand):
+    help = 'Stream a site (or single user) export as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='ndjson')
+        parser.add_argument('--dataset', help='Comma separated datasets (default: all)')
+        parser.add_argument('--user', help='Only export data owned by this username')
+        parser.add_argument('--gzip', action='store_true', help='Gzip-compress the output')
+        parser.add_argument('--output', '-o', help='Output file (default: stdout)')
+
+    def handle(self, *args, **options):
+        user = None
+        allowed = SITE_DATASETS
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'User not found: {options["user"]}')
+            allowed = USER_DATASETS
+
+        try:
+            datasets = parse_datasets(options['dataset'], allowed)
+            chunks = iter_export(datasets, fmt=options['format'], user=user, compress=options['gzip'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['output']:
+            with open(options['output'], 'wb') as f:
+                written = self.write_chunks(chunks, f)
+            self.stderr.write(f'Wrote {written} bytes to {options["output"]}')
+        else:
+            self.write_chunks(chunks, sys.stdout.buffer)
+
+    def write_chunks(self, chunks, target):
+        written = 0
+        for chunk in chunks:
+            target.write(chunk)
+            written += len(chunk)
+        return written
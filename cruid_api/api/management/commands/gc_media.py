@@ -0,0 +1,22 @@
+# backend/api/management/commands/gc_media.py
+# Delete media blobs nothing references any more: python manage.py gc_media [--recount] [--dry-run]
+
+from django.core.management.base import BaseCommand
+
+from api.media import collect_garbage, media_setting
+
+
+class Command(BaseCommand):
+    help = 'Delete content-addressed media blobs that no post image or avatar references'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--recount', action='store_true',
+                            help='Recompute reference counts from the posts and profiles first')
+        parser.add_argument('--dry-run', action='store_true', help='Only report what would be deleted')
+
+    def handle(self, *args, **options):
+        deleted, freed = collect_garbage(dry_run=options['dry_run'], recount=options['recount'])
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {deleted} blobs ({freed} bytes) unreferenced for over {media_setting("GC_GRACE")}s'
+        ))
@@ -0,0 +1,376 @@
+# backend/api/management/commands/import_blog.py
+# Streaming bulk import: python manage.py import_blog export.jsonl
+#
+# Input: one JSON object per line, each with a "type":
+#   {"type": "post", "id": "p1", "title": "...", "content": "...", "author": "alice",
+#    "category": "Tech", "tags": ["django"], "status": "published",
+#    "views_count": 3, "created_at": "2021-01-01T10:00:00Z"}
+#   {"type": "comment", "id": "c1", "post": "p1", "author": "bob", "content": "...",
+#    "parent": null, "created_at": "..."}
+#   {"type": "like" | "bookmark", "post": "p1", "user": "bob"}
+#   {"type": "follow", "follower": "bob", "following": "alice"}
+# Users, categories and tags are resolved by name and created when missing.
+# Lines that are not JSON, have an unknown type, a post status other than
+# draft/published or an unreadable date are skipped and counted.
+#
+# Each batch commits together with its ImportCheckpoint row and the external id
+# map (ImportedObject), so a crash never leaves rows without a checkpoint and a
+# resume never inserts a post or comment twice. Only the current batch's ids
+# and names are held in memory.
+
+import json
+import os
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from django.utils.text import slugify
+
+from api.models import (
+    Post, Comment, Like, Bookmark, Follow, Category, Tag, ImportCheckpoint, ImportedObject,
+)
+
+ROW_TYPES = ('post', 'comment', 'like', 'bookmark', 'follow')
+# Archived stubs are only made by archive_before, never imported
+POST_STATUSES = {value for value, _ in Post.STATUS_CHOICES} - {'archived'}
+DATE_FIELDS = ('created_at', 'updated_at')
+
+
+def read_datetime(value):
+    # parse_datetime returns None for a bad format but raises for e.g. month 13
+    try:
+        return parse_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def row_is_valid(row):
+    if row['type'] == 'post' and row.get('status') and row['status'] not in POST_STATUSES:
+        return False
+    return all(read_datetime(row[field]) for field in DATE_FIELDS if row.get(field))
+
+
+def unique_ids(rows):
+    # A repeated external id inside one batch is imported once
+    seen = set()
+    unique = []
+    for row in rows:
+        if row.get('id') is not None:
+            if str(row['id']) in seen:
+                continue
+            seen.add(str(row['id']))
+        unique.append(row)
+    return unique
+
+
+class Command(BaseCommand):
+    help = 'Stream a JSONL blog export into the database using batched bulk inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='Path to the .jsonl export')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--checkpoint',
+            help='Checkpoint name (default: absolute path of the file). Re-running resumes from it.'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Read the file from the start; posts and comments already imported are still skipped'
+        )
+
+    def handle(self, *args, **options):
+        path = options['file']
+        if not os.path.exists(path):
+            raise CommandError(f'File not found: {path}')
+
+        self.batch_size = options['batch_size']
+        self.source = (options['checkpoint'] or os.path.abspath(path))[:255]
+
+        # Per-batch lookups (name -> id, external id -> primary key), cleared after each flush
+        self.users = {}
+        self.categories = {}
+        self.tags = {}
+        self.post_ids = {}
+        self.comment_ids = {}
+        self.counts = dict.fromkeys(ROW_TYPES, 0)
+        self.skipped = 0
+
+        if options['restart']:
+            ImportCheckpoint.objects.filter(source=self.source).delete()
+        offset, line_no = self.load_checkpoint()
+        if offset:
+            self.stdout.write(f'Resuming at line {line_no} (byte {offset})')
+
+        self.started = time.monotonic()
+        buffer = {row_type: [] for row_type in ROW_TYPES}
+        buffered = 0
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for raw in f:
+                offset += len(raw)
+                line_no += 1
+                raw = raw.strip()
+                if not raw:
+                    continue
+                try:
+                    row = json.loads(raw)
+                except ValueError:
+                    self.skipped += 1
+                    continue
+                row_type = row.get('type') if isinstance(row, dict) else None
+                if row_type not in buffer or not row_is_valid(row):
+                    self.skipped += 1
+                    continue
+                buffer[row_type].append(row)
+                buffered += 1
+
+                if buffered >= self.batch_size:
+                    self.flush(buffer, offset, line_no)
+                    buffered = 0
+
+        self.flush(buffer, offset, line_no)
+        self.stdout.write(self.style.SUCCESS(
+            f'Import finished: {self.summary()}, skipped {self.skipped} line(s)'
+        ))
+
+    # ==================== Checkpoints ====================
+
+    def load_checkpoint(self):
+        checkpoint = ImportCheckpoint.objects.filter(source=self.source).first()
+        if checkpoint is None:
+            return 0, 0
+        self.counts.update(checkpoint.counts)
+        return checkpoint.offset, checkpoint.line
+
+    def save_checkpoint(self, offset, line_no):
+        ImportCheckpoint.objects.update_or_create(
+            source=self.source,
+            defaults={'offset': offset, 'line': line_no, 'counts': self.counts},
+        )
+
+    def load_ids(self, buffer):
+        # Earlier batches' posts and comments this batch refers to (or would re-insert)
+        post_refs = {str(row.get('id')) for row in buffer['post']}
+        post_refs.update(str(row.get('post')) for row in buffer['comment'] + buffer['like'] + buffer['bookmark'])
+        comment_refs = {str(row.get('id')) for row in buffer['comment']}
+        comment_refs.update(str(row['parent']) for row in buffer['comment'] if row.get('parent') is not None)
+        for kind, refs, target in (('post', post_refs, self.post_ids), ('comment', comment_refs, self.comment_ids)):
+            target.update(
+                ImportedObject.objects.filter(source=self.source, kind=kind, external_id__in=refs)
+                .values_list('external_id', 'object_id')
+            )
+
+    def record_ids(self, kind, new_ids):
+        ImportedObject.objects.bulk_create(
+            [ImportedObject(source=self.source, kind=kind, external_id=ext_id[:255], object_id=pk)
+             for ext_id, pk in new_ids],
+            batch_size=1000,
+        )
+
+    # ==================== Batch writing ====================
+
+    def flush(self, buffer, offset, line_no):
+        if not any(buffer.values()):
+            return
+        counts = dict(self.counts)
+        try:
+            with transaction.atomic():
+                self.load_ids(buffer)
+                self.resolve_names(buffer)
+                self.record_ids('post', self.write_posts(buffer['post']))
+                self.record_ids('comment', self.write_comments(buffer['comment']))
+                self.write_engagement(buffer)
+                self.save_checkpoint(offset, line_no)
+        except BaseException:
+            self.counts = counts
+            raise
+        finally:
+            for lookup in (self.users, self.categories, self.tags, self.post_ids, self.comment_ids):
+                lookup.clear()
+
+        for rows in buffer.values():
+            rows.clear()
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        self.stdout.write(f'line {line_no}: {self.summary()} ({line_no / elapsed:.0f} lines/s)')
+
+    def summary(self):
+        return ', '.join(f'{count} {row_type}s' for row_type, count in self.counts.items())
+
+    def resolve_names(self, buffer):
+        usernames, categories, tags = set(), set(), set()
+        for row in buffer['post']:
+            usernames.add(row.get('author'))
+            categories.add(row.get('category'))
+            tags.update(row.get('tags') or [])
+        for row in buffer['comment']:
+            usernames.add(row.get('author'))
+        for row in buffer['like'] + buffer['bookmark']:
+            usernames.add(row.get('user'))
+        for row in buffer['follow']:
+            usernames.update((row.get('follower'), row.get('following')))
+
+        self.resolve(
+            User, 'username', usernames, self.users,
+            lambda name: User(username=name, password=make_password(None))
+        )
+        self.resolve_slugged(Category, categories, self.categories)
+        self.resolve_slugged(Tag, tags, self.tags)
+
+    def resolve(self, model, field, names, cache, build):
+        missing = {name for name in names if name and name not in cache}
+        if not missing:
+            return
+        lookup = f'{field}__in'
+        cache.update(model.objects.filter(**{lookup: missing}).values_list(field, 'id'))
+        missing -= cache.keys()
+        if missing:
+            model.objects.bulk_create([build(name) for name in missing], ignore_conflicts=True)
+            cache.update(model.objects.filter(**{lookup: missing}).values_list(field, 'id'))
+
+    def resolve_slugged(self, model, names, cache):
+        # Names that differ only in case or punctuation share a slug (unique):
+        # they all map to the existing or first-created row with that slug
+        missing = {name for name in names if name and name not in cache}
+        if not missing:
+            return
+        cache.update(model.objects.filter(name__in=missing).values_list('name', 'id'))
+        by_slug = {}
+        for name in missing - cache.keys():
+            slug = slugify(name) or slugify(name, allow_unicode=True)
+            if slug:
+                by_slug.setdefault(slug, []).append(name)
+        if not by_slug:
+            return
+        ids = dict(model.objects.filter(slug__in=by_slug).values_list('slug', 'id'))
+        model.objects.bulk_create(
+            [model(name=min(group), slug=slug) for slug, group in by_slug.items() if slug not in ids],
+            ignore_conflicts=True,
+        )
+        ids.update(model.objects.filter(slug__in=by_slug).values_list('slug', 'id'))
+        for slug, group in by_slug.items():
+            for name in group:
+                if slug in ids:
+                    cache[name] = ids[slug]
+
+    def write_posts(self, rows):
+        rows = unique_ids([
+            row for row in rows
+            if row.get('title') and row.get('author') in self.users
+            and str(row.get('id')) not in self.post_ids
+        ])
+        if not rows:
+            return []
+
+        posts = [
+            Post(
+                title=row['title'][:200],
+                content=row.get('content', ''),
+                author_id=self.users[row['author']],
+                category_id=self.categories.get(row.get('category')),
+                status=row.get('status') or 'published',
+                views_count=row.get('views_count') or 0,
+            )
+            for row in rows
+        ]
+        for post in posts:
+            post.refresh_summary()  # bulk_create does not call save()
+        Post.objects.bulk_create(posts, batch_size=1000)
+        self.restore_timestamps(Post, posts, rows)
+
+        through = Post.tags.through
+        tag_links = [
+            through(post_id=post.pk, tag_id=self.tags[name])
+            for post, row in zip(posts, rows)
+            for name in (row.get('tags') or [])
+            if name in self.tags
+        ]
+        through.objects.bulk_create(tag_links, batch_size=1000, ignore_conflicts=True)
+
+        new_ids = [(str(row['id']), post.pk) for row, post in zip(rows, posts) if row.get('id') is not None]
+        self.post_ids.update(new_ids)
+        self.counts['post'] += len(posts)
+        return new_ids
+
+    def write_comments(self, rows):
+        rows = unique_ids([
+            row for row in rows
+            if str(row.get('post')) in self.post_ids and row.get('author') in self.users
+            and str(row.get('id')) not in self.comment_ids
+        ])
+        new_ids = []
+        # Parents must exist before their replies: insert in waves
+        while rows:
+            ready, waiting = [], []
+            for row in rows:
+                parent = row.get('parent')
+                if parent is None or str(parent) in self.comment_ids:
+                    ready.append(row)
+                else:
+                    waiting.append(row)
+            if not ready:
+                # Orphaned replies: keep them as top-level comments
+                for row in waiting:
+                    row['parent'] = None
+                ready, waiting = waiting, []
+
+            comments = [
+                Comment(
+                    post_id=self.post_ids[str(row['post'])],
+                    author_id=self.users[row['author']],
+                    content=row.get('content', ''),
+                    parent_id=self.comment_ids.get(str(row.get('parent'))) if row.get('parent') is not None else None,
+                )
+                for row in ready
+            ]
+            Comment.objects.bulk_create(comments, batch_size=1000)
+            self.restore_timestamps(Comment, comments, ready)
+
+            wave_ids = [(str(row['id']), c.pk) for row, c in zip(ready, comments) if row.get('id') is not None]
+            self.comment_ids.update(wave_ids)
+            new_ids.extend(wave_ids)
+            self.counts['comment'] += len(comments)
+            rows = waiting
+        return new_ids
+
+    def write_engagement(self, buffer):
+        likes = [
+            Like(post_id=self.post_ids[str(row.get('post'))], user_id=self.users[row['user']])
+            for row in buffer['like']
+            if str(row.get('post')) in self.post_ids and row.get('user') in self.users
+        ]
+        Like.objects.bulk_create(likes, batch_size=1000, ignore_conflicts=True)
+        self.counts['like'] += len(likes)
+
+        bookmarks = [
+            Bookmark(post_id=self.post_ids[str(row.get('post'))], user_id=self.users[row['user']])
+            for row in buffer['bookmark']
+            if str(row.get('post')) in self.post_ids and row.get('user') in self.users
+        ]
+        Bookmark.objects.bulk_create(bookmarks, batch_size=1000, ignore_conflicts=True)
+        self.counts['bookmark'] += len(bookmarks)
+
+        follows = [
+            Follow(follower_id=self.users[row['follower']], following_id=self.users[row['following']])
+            for row in buffer['follow']
+            if row.get('follower') in self.users and row.get('following') in self.users
+            and row['follower'] != row['following']
+        ]
+        Follow.objects.bulk_create(follows, batch_size=1000, ignore_conflicts=True)
+        self.counts['follow'] += len(follows)
+
+    def restore_timestamps(self, model, objs, rows):
+        # auto_now_add/auto_now overwrite dates on insert; put the exported ones back
+        changed = []
+        for obj, row in zip(objs, rows):
+            created = read_datetime(row['created_at']) if row.get('created_at') else None
+            if created is None:
+                continue
+            obj.created_at = created
+            obj.updated_at = read_datetime(row['updated_at']) if row.get('updated_at') else created
+            changed.append(obj)
+        if changed:
+            model.objects.bulk_update(changed, ['created_at', 'updated_at'], batch_size=1000)
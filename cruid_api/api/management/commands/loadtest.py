@@ -0,0 +1,82 @@
+# backend/api/management/commands/loadtest.py
+# In-process load test: python manage.py loadtest --interface wsgi --concurrency 16 --duration 30
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from api.loadtest import LoadTest, RequestMix, access_tokens, compare, parse_mix, seed
+
+APPLICATIONS = {
+    'wsgi': 'cruid_api.wsgi.application',
+    'asgi': 'cruid_api.asgi.application',
+}
+
+
+class Command(BaseCommand):
+    help = 'Replay a weighted request mix against the WSGI or ASGI application and report latency/throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interface', choices=list(APPLICATIONS), default='wsgi',
+                            help='wsgi: thread pool; asgi: asyncio tasks')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run (ignored with --requests)')
+        parser.add_argument('--requests', type=int, help='Stop after this many requests')
+        parser.add_argument('--mix', help='Scenario weights, e.g. "feed=40,timeline=15,detail=25,like=8,comment=5,search=7"')
+        parser.add_argument('--users', type=int, default=20, help='Seeded loadtest_* users')
+        parser.add_argument('--posts', type=int, default=200, help='Seeded posts')
+        parser.add_argument('--host', default='localhost', help='Host header (must be in ALLOWED_HOSTS)')
+        parser.add_argument('--seed', type=int, help='Random seed for a repeatable request sequence')
+        parser.add_argument('--output', help='Write the JSON results here')
+        parser.add_argument('--baseline', help='Earlier results file to compare against')
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'Cannot read baseline: {e}')
+
+        user_ids, post_ids = seed(users=options['users'], posts=options['posts'])
+        self.stdout.write(f'Seeded {len(user_ids)} users / {len(post_ids)} posts')
+
+        test = LoadTest(
+            import_string(APPLICATIONS[options['interface']]),
+            options['interface'],
+            RequestMix(mix, post_ids, access_tokens(user_ids), seed_value=options['seed']),
+            concurrency=options['concurrency'],
+            requests=options['requests'],
+            duration=options['duration'],
+            host=options['host'],
+        )
+        self.stdout.write(f'Running {options["interface"]} load test with concurrency {test.concurrency}...')
+        results = test.run()
+
+        self.stdout.write(
+            f'{results["requests"]} requests in {results["duration_s"]}s: {results["throughput_rps"]} rps, '
+            f'error rate {results["error_rate"]:.2%}, lock errors {results["lock_errors"]}'
+        )
+        for name, stats in results['scenarios'].items():
+            latency = stats['latency_ms']
+            self.stdout.write(
+                f'  {name:<9} {stats["requests"]:>6} req  p50 {latency["p50"]:>8} ms  '
+                f'p95 {latency["p95"]:>8} ms  p99 {latency["p99"]:>8} ms  errors {stats["errors"]}'
+            )
+        for message, count in results['exceptions'].items():
+            self.stdout.write(self.style.WARNING(f'  {count} x {message}'))
+        if baseline:
+            self.stdout.write('Compared with baseline:')
+            for line in compare(results, baseline):
+                self.stdout.write(f'  {line}')
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
@@ -0,0 +1,15 @@
+# backend/api/management/commands/purge_tombstones.py
+# Drop delta-sync tombstones older than SYNC['RETENTION']: python manage.py purge_tombstones
+
+from django.core.management.base import BaseCommand
+
+from api.sync import purge_tombstones, sync_setting
+
+
+class Command(BaseCommand):
+    help = 'Delete delta-sync tombstones older than the sync token retention'
+
+    def handle(self, *args, **options):
+        deleted = purge_tombstones()
+        days = sync_setting('RETENTION') / 86400
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} tombstones older than {days:g} days'))
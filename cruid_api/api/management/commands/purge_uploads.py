@@ -0,0 +1,14 @@
+# backend/api/management/commands/purge_uploads.py
+# Drop unfinished chunked uploads past their expiry: python manage.py purge_uploads
+
+from django.core.management.base import BaseCommand
+
+from api.uploads import purge_expired
+
+
+class Command(BaseCommand):
+    help = 'Delete expired chunked uploads and their temp files'
+
+    def handle(self, *args, **options):
+        deleted = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired uploads'))
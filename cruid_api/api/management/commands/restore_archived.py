@@ -0,0 +1,17 @@
+# backend/api/management/commands/restore_archived.py
+# Move archived posts back to the hot tables: python manage.py restore_archived 12 34
+
+from django.core.management.base import BaseCommand
+
+from api.archive import restore_posts
+
+
+class Command(BaseCommand):
+    help = 'Restore archived posts with their content, comments, likes and original status'
+
+    def add_arguments(self, parser):
+        parser.add_argument('post_ids', nargs='+', type=int, help='Ids of archived posts')
+
+    def handle(self, *args, **options):
+        posts, comments, likes = restore_posts(options['post_ids'])
+        self.stdout.write(self.style.SUCCESS(f'Restored {posts} posts, {comments} comments and {likes} likes'))
@@ -0,0 +1,76 @@
+# backend/api/management/commands/run_workers.py
+# Background job workers: python manage.py run_workers --concurrency 4
+
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from api.jobs import Worker, run_pending_jobs
+
+
+def _run_process(name, kinds):
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    Worker(name=name, kinds=kinds, stop_event=stop).run()
+
+
+class Command(BaseCommand):
+    help = 'Run background jobs from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=2, help='Number of workers')
+        parser.add_argument('--pool', choices=['thread', 'process'], default='thread')
+        parser.add_argument('--kind', action='append', help='Only run jobs of this kind (repeatable)')
+        parser.add_argument('--once', action='store_true', help='Run every due job, then exit')
+
+    def handle(self, *args, **options):
+        kinds = options['kind']
+        if options['once']:
+            ran = run_pending_jobs(worker_id='once', kinds=kinds)
+            self.stdout.write(self.style.SUCCESS(f'Ran {ran} job(s)'))
+            return
+
+        concurrency = max(1, options['concurrency'])
+        self.stdout.write(f'Starting {concurrency} {options["pool"]} worker(s)')
+        if options['pool'] == 'process':
+            self.run_processes(concurrency, kinds)
+        else:
+            self.run_threads(concurrency, kinds)
+
+    def run_threads(self, concurrency, kinds):
+        stop = threading.Event()
+        workers = [Worker(name=f'thread-{i}', kinds=kinds, stop_event=stop) for i in range(concurrency)]
+        threads = [threading.Thread(target=w.run, name=w.name) for w in workers]
+        signal.signal(signal.SIGTERM, lambda *_: stop.set())
+        for thread in threads:
+            thread.start()
+        try:
+            while any(t.is_alive() for t in threads):
+                for thread in threads:
+                    thread.join(timeout=1)
+        except KeyboardInterrupt:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+    def run_processes(self, concurrency, kinds):
+        # Children must not inherit the parent's database connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=_run_process, args=(f'process-{i}', kinds), name=f'process-{i}')
+            for i in range(concurrency)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+                process.join()
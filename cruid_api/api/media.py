@@ -0,0 +1,295 @@
+# backend/api/media.py
+# Content-addressed media - একই ছবি একবারই disk এ, নাম = SHA-256
+#
+# ContentAddressedStorage stores every file as cas/ab/cd/<sha256><ext>, hashing
+# while it copies, so re-uploading the same image reuses the existing blob.
+# MediaBlob counts how many Post.image / UserProfile.avatar values point at a
+# blob (kept by signals); gc_media deletes blobs nobody has referenced for
+# GC_GRACE seconds. Blob names never change content, so serve_media answers
+# them with a far-future immutable Cache-Control and the hash as ETag; it
+# supports conditional and Range requests and can hand the bytes to the web
+# server with X-Accel-Redirect / X-Sendfile instead of reading them in Python.
+# Hidden paths (chunked upload parts) and temp files are never served.
+
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from functools import cache
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import FileSystemStorage
+from django.db.models import F
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags, quote_etag
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+from .models import MediaBlob
+
+MEDIA_DEFAULTS = {
+    'GC_GRACE': 3600,            # seconds a blob stays unreferenced before gc_media deletes it
+    'OFFLOAD': None,             # None, 'x-accel-redirect' (nginx) or 'x-sendfile' (Apache / lighttpd)
+    'ACCEL_PREFIX': '/protected-media/',  # nginx `internal` location aliased to MEDIA_ROOT
+    'LEGACY_MAX_AGE': 3600,      # Cache-Control max-age for files not named by hash
+}
+
+BLOB_DIR = 'cas'
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+BLOB_NAME = re.compile(rf'^{BLOB_DIR}/[0-9a-f]{{2}}/[0-9a-f]{{2}}/(?P<sha256>[0-9a-f]{{64}})(\.[a-z0-9]+)?$')
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+EXTENSION_ALIASES = {'.jpeg': '.jpg'}
+
+
+def media_setting(name):
+    return getattr(settings, 'MEDIA_FILES', {}).get(name, MEDIA_DEFAULTS[name])
+
+
+def blob_name(sha256, extension=''):
+    return f'{BLOB_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension}'
+
+
+def is_blob(name):
+    return bool(name) and BLOB_NAME.match(name) is not None
+
+
+# ==================== Storage ====================
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by their SHA-256 and writes each content once."""
+
+    def get_available_name(self, name, max_length=None):
+        # _save picks the final name; identical content shares it on purpose
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1].lower()
+        extension = EXTENSION_ALIASES.get(extension, extension)
+        # Chunked uploads arrive already hashed; a known blob is not copied again
+        sha256 = getattr(content, 'sha256', '')
+        if sha256 and self.exists(blob_name(sha256, extension)):
+            name = blob_name(sha256, extension)
+            register_blob(name, sha256, content.size)
+            return name
+
+        blob_root = self.path(BLOB_DIR)
+        os.makedirs(blob_root, exist_ok=True)
+        fd, temp = tempfile.mkstemp(dir=blob_root, suffix='.tmp')
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, 'wb') as out:
+                for chunk in content.chunks():
+                    hasher.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            name = blob_name(hasher.hexdigest(), extension)
+            path = self.path(name)
+            if os.path.exists(path):
+                os.remove(temp)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temp, path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        register_blob(name, hasher.hexdigest(), size)
+        return name
+
+    def delete(self, name):
+        # Blobs are shared; only gc_media removes them
+        if not is_blob(name):
+            super().delete(name)
+
+
+# ==================== Reference Counting ====================
+
+def register_blob(name, sha256, size):
+    # A reused blob is touched too, so gc_media (which skips blobs updated within
+    # GC_GRACE) cannot delete it before the new reference is counted on save
+    if not MediaBlob.objects.filter(name=name).update(updated_at=timezone.now()):
+        MediaBlob.objects.get_or_create(name=name, defaults={'sha256': sha256, 'size': size})
+
+
+def change_references(added='', removed=''):
+    """Move one reference from blob ``removed`` to blob ``added`` (either may be empty)."""
+    if added == removed:
+        return
+    if is_blob(added):
+        MediaBlob.objects.filter(name=added).update(refcount=F('refcount') + 1, updated_at=timezone.now())
+    if is_blob(removed):
+        MediaBlob.objects.filter(name=removed).update(refcount=F('refcount') - 1, updated_at=timezone.now())
+
+
+@cache
+def media_fields():
+    # {model: field} of every field naming a blob; models load this module (the storage backend), so import late
+    from .models import Post, UserProfile
+    return {Post: 'image', UserProfile: 'avatar'}
+
+
+def count_references():
+    counts = Counter()
+    for model, field_name in media_fields().items():
+        names = model.objects.filter(**{f'{field_name}__startswith': f'{BLOB_DIR}/'}).values_list(field_name, flat=True)
+        counts.update(names.iterator())
+    return counts
+
+
+def collect_garbage(dry_run=False, recount=False):
+    """Delete unreferenced blobs older than GC_GRACE; returns (blobs deleted, bytes freed)."""
+    storage = ContentAddressedStorage()
+    if recount:
+        # Repair drift (bulk updates, raw SQL) from the referencing columns
+        counts = count_references()
+        for blob in MediaBlob.objects.iterator():
+            if blob.refcount != counts.get(blob.name, 0):
+                MediaBlob.objects.filter(pk=blob.pk).update(refcount=counts.get(blob.name, 0), updated_at=timezone.now())
+
+    cutoff = timezone.now() - timedelta(seconds=media_setting('GC_GRACE'))
+    deleted = freed = 0
+    for blob in MediaBlob.objects.filter(refcount__lte=0, updated_at__lt=cutoff).iterator():
+        # A reference saved since the scan started keeps the blob
+        if any(model.objects.filter(**{field_name: blob.name}).exists() for model, field_name in media_fields().items()):
+            continue
+        deleted += 1
+        freed += blob.size
+        if not dry_run:
+            FileSystemStorage.delete(storage, blob.name)
+            blob.delete()
+
+    # Files whose save rolled back left no MediaBlob row
+    known = set(MediaBlob.objects.values_list('name', flat=True))
+    root = storage.path(BLOB_DIR)
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(directory, filename)
+            name = os.path.relpath(path, storage.location).replace(os.sep, '/')
+            if name in known or os.path.getmtime(path) > cutoff.timestamp():
+                continue
+            deleted += 1
+            freed += os.path.getsize(path)
+            if not dry_run:
+                os.remove(path)
+    return deleted, freed
+
+
+# ==================== Serving ====================
+
+class FileRange:
+    """The ``length`` bytes of ``file`` from ``start``; keeps fileno() so servers can sendfile() it."""
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Return (start, end) for a single ``bytes=`` range, None to ignore it, or False if unsatisfiable."""
+    match = RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _cache_headers(response, name, stat, etag):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Accept-Ranges'] = 'bytes'
+    if is_blob(name):
+        response['Cache-Control'] = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        response['Cache-Control'] = f'public, max-age={media_setting("LEGACY_MAX_AGE")}'
+    return response
+
+
+def is_private_path(path):
+    # Upload parts (.uploads/<id>.part) and blobs still being written (cas/*.tmp)
+    return any(part.startswith('.') for part in path.split('/')) or path.endswith(('.tmp', '.part'))
+
+
+@require_safe
+def serve_media(request, path):
+    if is_private_path(path):
+        raise Http404('Media file not found')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (OSError, ValueError, SuspiciousFileOperation):
+        raise Http404('Media file not found')
+    if not os.path.isfile(full_path):
+        raise Http404('Media file not found')
+
+    match = BLOB_NAME.match(path)
+    etag = quote_etag(match.group('sha256') if match else f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match:
+        if etag in parse_etags(if_none_match) or if_none_match.strip() == '*':
+            return _cache_headers(HttpResponseNotModified(), path, stat, etag)
+    elif not was_modified_since(request.headers.get('If-Modified-Since'), stat.st_mtime):
+        return _cache_headers(HttpResponseNotModified(), path, stat, etag)
+
+    content_type = mimetypes.guess_type(full_path)[0] or 'application/octet-stream'
+    offload = media_setting('OFFLOAD')
+    if offload:
+        # The web server sends the bytes and handles Range itself
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel-redirect':
+            response['X-Accel-Redirect'] = media_setting('ACCEL_PREFIX').rstrip('/') + '/' + path.lstrip('/')
+        else:
+            response['X-Sendfile'] = full_path
+        return _cache_headers(response, path, stat, etag)
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if request.headers.get('Range') and (not if_range or if_range.strip() == etag):
+        byte_range = parse_range(request.headers['Range'], stat.st_size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return _cache_headers(response, path, stat, etag)
+
+    file = open(full_path, 'rb')
+    if byte_range is None:
+        # FileResponse streams through wsgi.file_wrapper (sendfile under gunicorn)
+        response = FileResponse(file, content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(FileRange(file, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Length'] = str(end - start + 1)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    return _cache_headers(response, path, stat, etag)
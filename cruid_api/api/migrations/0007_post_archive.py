@@ -0,0 +1,55 @@
+# Generated by Django 5.2.7 on 2026-10-19 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_engagement_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('post_id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('content', models.TextField()),
+                ('status', models.CharField(max_length=10)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('published', 'Published'), ('archived', 'Archived')], default='published', max_length=10),
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('post_id', models.PositiveIntegerField()),
+                ('author_id', models.PositiveIntegerField()),
+                ('parent_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('content', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['post_id', '-created_at'], name='api_archive_post_id_2f8229_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedLike',
+            fields=[
+                ('id', models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ('post_id', models.PositiveIntegerField()),
+                ('user_id', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'unique_together': {('post_id', 'user_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_media_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, unique=True)),
+                ('offset', models.PositiveBigIntegerField(default=0)),
+                ('line', models.PositiveBigIntegerField(default=0)),
+                ('counts', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ImportedObject',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255)),
+                ('kind', models.CharField(choices=[('post', 'Post'), ('comment', 'Comment')], max_length=10)),
+                ('external_id', models.CharField(max_length=255)),
+                ('object_id', models.PositiveIntegerField()),
+            ],
+            options={
+                'unique_together': {('source', 'kind', 'external_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-19 09:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_import_checkpoints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='engagementevent',
+            index=models.Index(fields=['post_id', 'created_at'], name='api_engagem_post_id_6ef1e0_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 10:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_engagement_event_post_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='upload',
+            name='writing_until',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
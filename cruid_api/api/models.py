@@ -2,10 +2,15 @@
 # এই file টি backend/api/ folder এ থাকবে
 # পুরনো models.py file এর content replace করে এটা দিন
 
+import uuid
+
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils import timezone
 from django.utils.text import slugify
 
+from .utils import make_excerpt, reading_time_minutes
+
 # User Profile Model
 class UserProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
@@ -13,6 +18,8 @@ class UserProfile(models.Model):
     avatar = models.ImageField(upload_to='avatars/', null=True, blank=True)
     location = models.CharField(max_length=100, blank=True)
     website = models.URLField(blank=True)
+    # Bumped on password change / deactivation / logout; access tokens carry it as "ver"
+    token_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -59,10 +66,14 @@ class Post(models.Model):
     STATUS_CHOICES = (
         ('draft', 'Draft'),
         ('published', 'Published'),
+        ('archived', 'Archived'),  # stub; content, comments and likes live in the archive tables
     )
     
     title = models.CharField(max_length=200)
     content = models.TextField()
+    # Derived from content on save - list pages use these and defer content
+    excerpt = models.CharField(max_length=210, blank=True)
+    reading_time = models.PositiveIntegerField(default=1)
     image = models.ImageField(upload_to='posts/', null=True, blank=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True, related_name='posts')
@@ -77,11 +88,25 @@ class Post(models.Model):
         indexes = [
             models.Index(fields=['-created_at']),
             models.Index(fields=['author']),
+            models.Index(fields=['updated_at']),  # delta sync range scans
         ]
     
     def __str__(self):
         return self.title
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        # Skip when content was deferred or is not part of a partial save
+        if 'content' in self.__dict__ and (update_fields is None or 'content' in update_fields):
+            self.refresh_summary()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'excerpt', 'reading_time'}
+        super().save(*args, **kwargs)
+    
+    def refresh_summary(self):
+        self.excerpt = make_excerpt(self.content)
+        self.reading_time = reading_time_minutes(self.content)
+    
     def increment_views(self):
         self.views_count += 1
         self.save(update_fields=['views_count'])
@@ -123,6 +148,9 @@ class Bookmark(models.Model):
     class Meta:
         unique_together = ['user', 'post']
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', 'created_at']),
+        ]
     
     def __str__(self):
         return f'{self.user.username} bookmarked {self.post.title}'
@@ -138,4 +166,217 @@ class Follow(models.Model):
         ordering = ['-created_at']
     
     def __str__(self):
-        return f'{self.follower.username} follows {self.following.username}'
\ No newline at end of file
+        return f'{self.follower.username} follows {self.following.username}'
+# Background Job Model (see api/jobs.py)
+class Job(models.Model):
+    STATUS_CHOICES = (
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+    
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0)  # higher runs first
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        ordering = ['-priority', 'run_after', 'id']
+        indexes = [
+            models.Index(fields=['status', '-priority', 'run_after']),
+        ]
+    
+    def __str__(self):
+        return f'{self.kind} #{self.pk} ({self.status})'
+
+# Deletion record for delta sync (see api/sync.py); written by signals, purged by purge_tombstones
+class Tombstone(models.Model):
+    KIND_CHOICES = (
+        ('post', 'Post'),
+        ('bookmark', 'Bookmark'),
+        ('follow', 'Follow'),
+    )
+    
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()  # post id; followed user id for follows
+    # Post author, or owner of a bookmark/follow; a plain column so tombstones survive the user's own deletion cascade
+    user_id = models.PositiveIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['deleted_at']
+        indexes = [
+            models.Index(fields=['kind', 'deleted_at']),
+            models.Index(fields=['kind', 'user_id', 'deleted_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.kind} {self.object_id} deleted at {self.deleted_at}'
+
+# Raw engagement event (see api/analytics.py); appended by signals / the view-count job,
+# folded into DailyPostStats and deleted by compact_engagement
+class EngagementEvent(models.Model):
+    METRIC_CHOICES = (
+        ('views', 'Views'),
+        ('likes', 'Likes'),
+        ('comments', 'Comments'),
+        ('bookmarks', 'Bookmarks'),
+    )
+    
+    # A plain column: events written while a post's cascade runs must not block its delete
+    post_id = models.PositiveIntegerField()
+    metric = models.CharField(max_length=10, choices=METRIC_CHOICES)
+    delta = models.IntegerField(default=1)  # negative for unlike / comment delete / unbookmark
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['post_id', 'created_at']),  # dashboards add pending events per post
+        ]
+    
+    def __str__(self):
+        return f'{self.metric} {self.delta:+d} on post {self.post_id}'
+
+# Per-post daily engagement rollup; author is copied in so dashboards range-scan (author, day)
+class DailyPostStats(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='daily_stats')
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_post_stats')
+    day = models.DateField()
+    views = models.IntegerField(default=0)
+    likes = models.IntegerField(default=0)  # net: likes minus unlikes that day
+    comments = models.IntegerField(default=0)
+    bookmarks = models.IntegerField(default=0)
+    
+    class Meta:
+        unique_together = ['post', 'day']
+        ordering = ['day']
+        indexes = [
+            models.Index(fields=['author', 'day']),
+        ]
+    
+    def __str__(self):
+        return f'{self.post_id} on {self.day}'
+
+# Cold storage for archived posts (see api/archive.py). Plain id columns so the
+# tables can sit in a separate database; the Post row stays behind as a stub.
+class ArchivedPost(models.Model):
+    post_id = models.PositiveIntegerField(primary_key=True)
+    content = models.TextField()
+    status = models.CharField(max_length=10)  # status before archiving
+    archived_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f'Archived post {self.post_id}'
+
+class ArchivedComment(models.Model):
+    id = models.PositiveIntegerField(primary_key=True)  # original Comment id
+    post_id = models.PositiveIntegerField()
+    author_id = models.PositiveIntegerField()
+    parent_id = models.PositiveIntegerField(null=True, blank=True)
+    content = models.TextField()
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['post_id', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f'Archived comment {self.id} on post {self.post_id}'
+
+class ArchivedLike(models.Model):
+    id = models.PositiveIntegerField(primary_key=True)  # original Like id
+    post_id = models.PositiveIntegerField()
+    user_id = models.PositiveIntegerField()
+    created_at = models.DateTimeField()
+    
+    class Meta:
+        unique_together = ['post_id', 'user_id']
+    
+    def __str__(self):
+        return f'Archived like by {self.user_id} on post {self.post_id}'
+
+# Chunked upload in progress (see api/uploads.py); bytes live in a temp file until attached
+class Upload(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='uploads')
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()                 # declared total
+    offset = models.PositiveBigIntegerField(default=0)      # bytes received
+    content_type = models.CharField(max_length=50, blank=True)  # sniffed from the first bytes
+    sha256 = models.CharField(max_length=64, blank=True)    # set once every byte arrived
+    writing_until = models.DateTimeField(null=True, blank=True)  # lease of the PATCH writing a chunk
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['expires_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.filename} ({self.offset}/{self.size})'
+    
+    @property
+    def is_complete(self):
+        return self.offset == self.size
+
+# Content-addressed media file (see api/media.py); refcount = Post.image / UserProfile.avatar values naming it
+class MediaBlob(models.Model):
+    name = models.CharField(max_length=255, unique=True)  # cas/ab/cd/<sha256><ext>
+    sha256 = models.CharField(max_length=64)
+    size = models.PositiveBigIntegerField()
+    refcount = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # last reference change; gc_media's grace clock
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['refcount', 'updated_at']),
+        ]
+    
+    def __str__(self):
+        return f'{self.name} ({self.refcount} refs)'
+
+# Resumable import_blog state, written in the same transaction as each batch
+class ImportCheckpoint(models.Model):
+    source = models.CharField(max_length=255, unique=True)  # absolute path of the export, or --checkpoint
+    offset = models.PositiveBigIntegerField(default=0)      # byte after the last committed batch
+    line = models.PositiveBigIntegerField(default=0)
+    counts = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f'{self.source} at line {self.line}'
+
+# External id -> primary key of an imported post or comment; makes re-imports skip them
+class ImportedObject(models.Model):
+    KIND_CHOICES = (
+        ('post', 'Post'),
+        ('comment', 'Comment'),
+    )
+    
+    source = models.CharField(max_length=255)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    external_id = models.CharField(max_length=255)
+    object_id = models.PositiveIntegerField()
+    
+    class Meta:
+        unique_together = ['source', 'kind', 'external_id']
+    
+    def __str__(self):
+        return f'{self.kind} {self.external_id} -> {self.object_id}'
@@ -0,0 +1,105 @@
+# backend/api/normalized.py
+# Side-loaded (normalized) responses - ?format=normalized
+#
+# Feed rows repeat the same author, category and tags over and over. With
+# ?format=normalized, fields listed in a serializer's `included_fields` render
+# as ids and the referenced objects are collected in the serializer context.
+# The view then serializes each unique object once into a top-level
+# `included` map: {"users": {"<id>": {...}}, "categories": {...}, "tags": {...}}.
+
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+NORMALIZED_FORMAT = 'normalized'
+
+
+def is_normalized(request):
+    renderer = getattr(request, 'accepted_renderer', None)
+    return renderer is not None and renderer.format == NORMALIZED_FORMAT
+
+
+class NormalizedJSONRenderer(JSONRenderer):
+    format = NORMALIZED_FORMAT
+
+
+class Included:
+    """Collects related objects by type while a response is serialized."""
+
+    def __init__(self):
+        self._objects = {}
+
+    def add(self, type_name, serializer_class, obj):
+        bucket = self._objects.setdefault(type_name, (serializer_class, {}))[1]
+        bucket.setdefault(obj.pk, obj)
+
+    def render(self, context):
+        context = {k: v for k, v in context.items() if k != 'included'}
+        return {
+            type_name: {
+                str(obj.pk): row
+                for obj, row in zip(objects.values(), serializer_class(list(objects.values()), many=True, context=context).data)
+            }
+            for type_name, (serializer_class, objects) in self._objects.items()
+        }
+
+
+class IncludedField(serializers.Field):
+    """Renders a related object (or objects) as ids and registers them in ``context['included']``."""
+
+    def __init__(self, type_name, serializer_class, many=False, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+        self.type_name = type_name
+        self.serializer_class = serializer_class
+        self.many = many
+
+    def to_representation(self, value):
+        included = self.context['included']
+        if self.many:
+            objects = list(value.all())
+            for obj in objects:
+                included.add(self.type_name, self.serializer_class, obj)
+            return [obj.pk for obj in objects]
+        included.add(self.type_name, self.serializer_class, value)
+        return value.pk
+
+
+class IncludedFieldsMixin:
+    """
+    Serializer mixin: in normalized responses, swap the fields named in
+    ``included_fields = {name: (type_name, serializer_class)}`` for ids.
+    """
+    included_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if 'included' in self.context:
+            for name, (type_name, serializer_class) in self.included_fields.items():
+                many = isinstance(fields[name], serializers.ListSerializer)
+                fields[name] = IncludedField(type_name, serializer_class, many=many)
+        return fields
+
+
+class NormalizedResponseMixin:
+    """List-view mixin that adds the ?format=normalized renderer and the ``included`` map."""
+
+    def get_renderers(self):
+        return super().get_renderers() + [NormalizedJSONRenderer()]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if is_normalized(self.request):
+            context['included'] = self._included
+        return context
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self._included = Included()
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if is_normalized(request):
+            if not isinstance(response.data, dict):
+                response.data = {'results': response.data}
+            response.data['included'] = self._included.render(self.get_serializer_context())
+        return response
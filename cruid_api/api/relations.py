@@ -0,0 +1,125 @@
+# backend/api/relations.py
+# Idempotent like / bookmark / follow writes - প্রতিটা write একটা SQL statement
+#
+# ensure() is one INSERT ... SELECT ... WHERE EXISTS(target) ON CONFLICT DO
+# NOTHING RETURNING id, so a double tap can't hit the unique_together
+# constraint and a missing post/user inserts nothing. remove() is one
+# DELETE ... RETURNING id. Both run in a transaction and send post_save /
+# post_delete themselves (raw SQL bypasses the ORM), so cache invalidation,
+# SSE events, tombstones and the follow graph stay in step. toggle() tries
+# ensure() first and deletes only if the row was already there, in one
+# transaction. An optional target_filter (a Q on the target model) goes into
+# the same EXISTS, so e.g. archived posts take no likes without a separate
+# SELECT. Backends without ON CONFLICT / RETURNING fall back to the ORM.
+
+from django.db import IntegrityError, connections, router, transaction
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+CREATED = 'created'
+EXISTS = 'exists'
+MISSING = 'missing'   # the target row (post / user) does not exist
+REFUSED = 'refused'   # the target exists but does not match target_filter
+REMOVED = 'removed'
+
+
+def _supports_returning(connection):
+    return connection.vendor in ('sqlite', 'postgresql') and connection.features.can_return_columns_from_insert
+
+
+def _columns(model, owner_field, target_field):
+    meta = model._meta
+    target = meta.get_field(target_field)
+    return (
+        meta.db_table,
+        meta.get_field(owner_field).column,
+        target.column,
+        target.related_model,
+    )
+
+
+def _missing_or_refused(targets, target_filter):
+    if target_filter is not None and targets.exists():
+        return REFUSED
+    return MISSING
+
+
+def ensure(model, owner_field, owner_id, target_field, target_id, target_filter=None):
+    """Create the (owner, target) row if absent; returns CREATED, EXISTS, MISSING or REFUSED."""
+    using = router.db_for_write(model)
+    connection = connections[using]
+    values = {f'{owner_field}_id': owner_id, f'{target_field}_id': target_id}
+    table, owner_col, target_col, target_model = _columns(model, owner_field, target_field)
+    targets = target_model._default_manager.using(using).filter(pk=target_id)
+    allowed = targets.filter(target_filter) if target_filter is not None else targets
+
+    with transaction.atomic(using=using, savepoint=False):
+        if not _supports_returning(connection):
+            if not allowed.exists():
+                return _missing_or_refused(targets, target_filter)
+            try:
+                with transaction.atomic(using=using):
+                    _, created = model._default_manager.using(using).get_or_create(**values)
+            except IntegrityError:
+                created = False
+            return CREATED if created else EXISTS
+
+        qn = connection.ops.quote_name
+        created_at = model._meta.get_field('created_at')
+        now = timezone.now()
+        exists_sql, exists_params = allowed.values('pk').query.get_compiler(using).as_sql()
+        sql = (
+            f'INSERT INTO {qn(table)} ({qn(owner_col)}, {qn(target_col)}, {qn(created_at.column)}) '
+            f'SELECT %s, %s, %s WHERE EXISTS ({exists_sql}) '
+            f'ON CONFLICT DO NOTHING RETURNING {qn(model._meta.pk.column)}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [owner_id, target_id, created_at.get_db_prep_value(now, connection), *exists_params])
+            row = cursor.fetchone()
+        if row is None:
+            # Nothing inserted: already there, or the target is gone / filtered out (rare path)
+            if model._default_manager.using(using).filter(**values).exists():
+                return EXISTS
+            return _missing_or_refused(targets, target_filter)
+
+        instance = model(pk=row[0], created_at=now, **values)
+        instance._state.adding = False
+        instance._state.db = using
+        post_save.send(sender=model, instance=instance, created=True, update_fields=None, raw=False, using=using)
+        return CREATED
+
+
+def remove(model, owner_field, owner_id, target_field, target_id):
+    """Delete the (owner, target) row if present; returns the number of rows deleted."""
+    using = router.db_for_write(model)
+    connection = connections[using]
+    values = {f'{owner_field}_id': owner_id, f'{target_field}_id': target_id}
+    table, owner_col, target_col, _ = _columns(model, owner_field, target_field)
+
+    with transaction.atomic(using=using, savepoint=False):
+        if not _supports_returning(connection):
+            return model._default_manager.using(using).filter(**values).delete()[0]
+
+        qn = connection.ops.quote_name
+        sql = (
+            f'DELETE FROM {qn(table)} WHERE {qn(owner_col)} = %s AND {qn(target_col)} = %s '
+            f'RETURNING {qn(model._meta.pk.column)}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [owner_id, target_id])
+            rows = cursor.fetchall()
+        for (pk,) in rows:
+            instance = model(pk=pk, **values)
+            instance._state.db = using
+            post_delete.send(sender=model, instance=instance, using=using, origin=instance)
+        return len(rows)
+
+
+def toggle(model, owner_field, owner_id, target_field, target_id, target_filter=None):
+    """Create the row, or delete it if it already existed; returns CREATED, REMOVED, MISSING or REFUSED."""
+    with transaction.atomic(using=router.db_for_write(model)):
+        result = ensure(model, owner_field, owner_id, target_field, target_id, target_filter)
+        if result != EXISTS:
+            return result
+        remove(model, owner_field, owner_id, target_field, target_id)
+        return REMOVED
@@ -4,10 +4,22 @@
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
 from .models import (
     Post, Comment, Like, Bookmark, Follow, 
-    UserProfile, Category, Tag
+    UserProfile, Category, Tag, ArchivedComment, ArchivedLike, Upload
 )
+from .archive import ARCHIVED, load_archived_thread
+from .jobs import run_or_enqueue
+from .comments import comments_setting, thread_context, thread_queryset
+from .normalized import IncludedFieldsMixin
+from .autocomplete import autocomplete_index
+from .singleflight import response_cache_key, single_flight_setting
 
 # User Profile Serializer
 class UserProfileSerializer(serializers.ModelSerializer):
@@ -52,9 +64,19 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         validated_data.pop('password2')
-        user = User.objects.create_user(**validated_data)
-        # Create user profile automatically
-        UserProfile.objects.create(user=user)
+        # Async register view hashes the password in the hashing pool and passes the result
+        password_hash = validated_data.pop('password_hash', None)
+        if password_hash:
+            validated_data.pop('password')
+            validated_data['email'] = User.objects.normalize_email(validated_data.get('email', ''))
+            user = User(**validated_data)
+            user.username = user.normalize_username(user.username)
+            user.password = password_hash
+            user.save()
+        else:
+            user = User.objects.create_user(**validated_data)
+        # Profile is created by a background job (UpdateUserProfileView also get_or_creates it)
+        run_or_enqueue('create_profile', {'user_id': user.id}, idempotency_key=f'profile:{user.id}')
         return user
 
 # Category Serializer
@@ -84,20 +106,35 @@ class TagSerializer(serializers.ModelSerializer):
 class CommentSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     replies = serializers.SerializerMethodField()
+    reply_count = serializers.SerializerMethodField()
     
     class Meta:
         model = Comment
-        fields = ['id', 'post', 'author', 'content', 'parent', 'replies', 'created_at', 'updated_at']
+        fields = ['id', 'post', 'author', 'content', 'parent', 'reply_count', 'replies', 'created_at', 'updated_at']
         read_only_fields = ['author', 'created_at', 'updated_at', 'post']  # 'post' read_only করা হলো
     
     def get_replies(self, obj):
+        # Thread views (CommentThreadMixin) embed only the newest replies;
+        # the rest come from /api/comments/<id>/replies/
+        previews = self.context.get('reply_previews')
+        if previews is not None:
+            replies = previews.get(obj.id, [])
+            if not replies:
+                return []
+            return CommentSerializer(replies, many=True, context={**self.context, 'reply_previews': {}}).data
         if obj.replies.exists():
             return CommentSerializer(obj.replies.all(), many=True, context=self.context).data
         return []
     
+    def get_reply_count(self, obj):
+        counts = self.context.get('reply_counts')
+        if counts is not None:
+            return counts.get(obj.id, 0)
+        return obj.replies.count()
     
-# Post Serializer (List)
-class PostListSerializer(serializers.ModelSerializer):
+    
+# Post Serializer (List) - excerpt only, list querysets defer content
+class PostListSerializer(IncludedFieldsMixin, serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
@@ -109,24 +146,49 @@ class PostListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = [
-            'id', 'title', 'content', 'image', 'author', 'category', 'tags',
+            'id', 'title', 'excerpt', 'reading_time', 'image', 'author', 'category', 'tags',
             'status', 'views_count', 'likes_count', 'comments_count',
             'is_liked', 'is_bookmarked', 'created_at', 'updated_at'
         ]
+        
+    included_fields = {
+        'author': ('users', UserSerializer),
+        'category': ('categories', CategorySerializer),
+        'tags': ('tags', TagSerializer),
+    }
+    
+    def to_representation(self, instance):
+        # List views (PostFragmentMixin) pre-load cached fragments for the page
+        fragments = self.context.get('post_fragments')
+        if fragments and instance.pk in fragments:
+            return fragments[instance.pk]
+        return super().to_representation(instance)
     
     def get_likes_count(self, obj):
+        counts = self.context.get('likes_counts')
+        if counts is not None:
+            return counts.get(obj.id, 0)
         return obj.likes.count()
     
     def get_comments_count(self, obj):
+        counts = self.context.get('comments_counts')
+        if counts is not None:
+            return counts.get(obj.id, 0)
         return obj.comments.count()
     
     def get_is_liked(self, obj):
+        liked = self.context.get('liked_post_ids')
+        if liked is not None:
+            return obj.id in liked
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.likes.filter(user=request.user).exists()
         return False
     
     def get_is_bookmarked(self, obj):
+        bookmarked = self.context.get('bookmarked_post_ids')
+        if bookmarked is not None:
+            return obj.id in bookmarked
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return obj.bookmarked_by.filter(user=request.user).exists()
@@ -137,7 +199,8 @@ class PostDetailSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
     category = CategorySerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
+    comments = serializers.SerializerMethodField()
+    comments_next = serializers.SerializerMethodField()
     likes_count = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
@@ -146,11 +209,34 @@ class PostDetailSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = [
-            'id', 'title', 'content', 'image', 'author', 'category', 'tags',
+            'id', 'title', 'content', 'excerpt', 'reading_time', 'image', 'author', 'category', 'tags',
             'status', 'views_count', 'likes_count', 'comments_count',
-            'is_liked', 'is_bookmarked', 'comments', 'created_at', 'updated_at'
+            'is_liked', 'is_bookmarked', 'comments', 'comments_next', 'created_at', 'updated_at'
         ]
     
+    def _comment_page(self, obj):
+        # First page of top-level comments (one extra row tells whether there are more)
+        if not hasattr(obj, '_comment_page'):
+            size = comments_setting('PAGE_SIZE')
+            rows = list(thread_queryset().filter(post=obj, parent=None).order_by('-created_at', '-id')[:size + 1])
+            obj._comment_page = (rows[:size], len(rows) > size)
+        return obj._comment_page
+    
+    def get_comments(self, obj):
+        page, _ = self._comment_page(obj)
+        context = {**self.context, **thread_context(page)}
+        return CommentSerializer(page, many=True, context=context).data
+    
+    def get_comments_next(self, obj):
+        _, has_more = self._comment_page(obj)
+        if not has_more:
+            return None
+        url = reverse('comment-list-create', kwargs={'post_id': obj.pk})
+        request = self.context.get('request')
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return f'{url}?page=2&page_size={comments_setting("PAGE_SIZE")}'
+    
     def get_likes_count(self, obj):
         return obj.likes.count()
     
@@ -169,7 +255,235 @@ class PostDetailSerializer(serializers.ModelSerializer):
             return obj.bookmarked_by.filter(user=request.user).exists()
         return False
 
+# Archived comment - same shape as CommentSerializer, whole thread nested
+class ArchivedCommentSerializer(serializers.ModelSerializer):
+    author = UserSerializer(read_only=True)
+    post = serializers.IntegerField(source='post_id', read_only=True)
+    parent = serializers.IntegerField(source='parent_id', read_only=True)
+    reply_count = serializers.SerializerMethodField()
+    replies = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = ArchivedComment
+        fields = ['id', 'post', 'author', 'content', 'parent', 'reply_count', 'replies', 'created_at', 'updated_at']
+    
+    def get_replies(self, obj):
+        return ArchivedCommentSerializer(obj.thread_replies, many=True, context=self.context).data
+    
+    def get_reply_count(self, obj):
+        return len(obj.thread_replies)
+
+# Post Serializer (Detail) for archive stubs - content, thread and likes come from the archive
+# tables (stubs take no new likes; hot likes left from before that are still counted)
+class ArchivedPostDetailSerializer(PostDetailSerializer):
+    content = serializers.CharField(source='archive.content', read_only=True)
+    
+    def get_comments(self, obj):
+        return ArchivedCommentSerializer(load_archived_thread(obj.pk), many=True, context=self.context).data
+    
+    def get_comments_next(self, obj):
+        return None
+    
+    def get_likes_count(self, obj):
+        return obj.likes.count() + ArchivedLike.objects.filter(post_id=obj.pk).count()
+    
+    def get_comments_count(self, obj):
+        return ArchivedComment.objects.filter(post_id=obj.pk).count()
+    
+    def get_is_liked(self, obj):
+        request = self.context.get('request')
+        if request and request.user.is_authenticated:
+            return super().get_is_liked(obj) or ArchivedLike.objects.filter(post_id=obj.pk, user_id=request.user.pk).exists()
+        return False
+
 # Post Create/Update Serializer
+MAX_POST_TAGS = 20
+
+def tag_slug(name):
+    # ASCII slug where there is one, else a unicode one ("বাংলা" has no ASCII letters)
+    return slugify(name) or slugify(name, allow_unicode=True)
+
+def _find_tags(by_slug, slugs):
+    # A tag matches by slug, or by exact name when its stored slug differs
+    # (e.g. name "REST API" saved with slug "restapi")
+    names = {by_slug[slug]: slug for slug in slugs}
+    found = {}
+    rows = Tag.objects.filter(Q(slug__in=slugs) | Q(name__in=names)).values_list('slug', 'id', 'name')
+    for slug, tag_id, name in rows:
+        if slug in slugs:
+            found[slug] = (tag_id, name, slug)
+        elif name in names:
+            found.setdefault(names[name], (tag_id, name, slug))
+    return found
+
+def resolve_tag_names(names):
+    """Return ``{slug: tag id}`` for ``names``, creating missing tags in one INSERT."""
+    by_slug = {tag_slug(name): name for name in names}
+    tags = _find_tags(by_slug, set(by_slug))
+    missing = {slug for slug in by_slug if slug not in tags}
+    if missing:
+        # ignore_conflicts: a concurrent request may create the same tag first
+        Tag.objects.bulk_create([Tag(name=by_slug[slug], slug=slug) for slug in missing], ignore_conflicts=True)
+        created = _find_tags(by_slug, missing)
+        tags.update(created)
+        # bulk_create skips post_save, so index the new tags here
+        transaction.on_commit(lambda: [
+            autocomplete_index.upsert('tag', tag_id, name, slug) for tag_id, name, slug in created.values()
+        ])
+    unresolved = [by_slug[slug] for slug in by_slug if slug not in tags]
+    if unresolved:
+        # Name and slug each taken by different tags
+        raise serializers.ValidationError({'tag_names': [f'Could not resolve tags: {", ".join(unresolved)}']})
+    return {slug: tags[slug][0] for slug in by_slug}
+
+class PostBulkListSerializer(serializers.ListSerializer):
+    """
+    PostWriteSerializer(many=True) for /api/posts/bulk/.
+    
+    Items are validated one at a time and failures are kept in ``item_errors``
+    (by index) instead of rejecting the batch. Tag and category ids are checked
+    for the whole batch in two queries; valid items are written with
+    bulk_create / bulk_update and one through-table insert. For updates,
+    ``instance`` is a ``{id: Post}`` map of the caller's posts.
+    
+    bulk_create / bulk_update send no post_save, so none of the Post
+    post_save handlers in signals.py run for these rows: update() drops the
+    cached detail pages itself, and media_saved has nothing to count because
+    a JSON body cannot carry an image file.
+    """
+    
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            raise serializers.ValidationError({'non_field_errors': ['Expected a list of posts.']})
+        if not data:
+            raise serializers.ValidationError({'non_field_errors': ['Send at least one post.']})
+        if self.max_length is not None and len(data) > self.max_length:
+            raise serializers.ValidationError({'non_field_errors': [f'At most {self.max_length} posts per request.']})
+        
+        self._load_references(data)
+        self.item_errors = {}
+        valid = []
+        seen = set()
+        for index, item in enumerate(data):
+            try:
+                post = self._target(item, seen) if self.instance is not None else None
+                validated = self.child.run_validation(item)
+            except serializers.ValidationError as exc:
+                self.item_errors[index] = exc.detail
+            else:
+                valid.append({**validated, '_index': index, '_post': post})
+        return valid
+    
+    @staticmethod
+    def _coerce(field, value):
+        # Same parsing as validation will apply ("1" -> 1); bad values are reported there
+        try:
+            return field.to_internal_value(value)
+        except serializers.ValidationError:
+            return None
+    
+    def _load_references(self, data):
+        tag_field = self.child.fields['tag_ids'].child
+        category_field = self.child.fields['category_id']
+        tag_ids, category_ids = set(), set()
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            ids = item.get('tag_ids')
+            if isinstance(ids, list):
+                tag_ids.update(self._coerce(tag_field, i) for i in ids)
+            if item.get('category_id') is not None:
+                category_ids.add(self._coerce(category_field, item['category_id']))
+        tag_ids.discard(None)
+        category_ids.discard(None)
+        self.context['known_tag_ids'] = set(Tag.objects.filter(id__in=tag_ids).values_list('id', flat=True)) if tag_ids else set()
+        self.context['known_category_ids'] = (
+            set(Category.objects.filter(id__in=category_ids).values_list('id', flat=True)) if category_ids else set()
+        )
+    
+    def _target(self, item, seen):
+        pk = item.get('id') if isinstance(item, dict) else None
+        if not isinstance(pk, int) or isinstance(pk, bool):
+            raise serializers.ValidationError({'id': ['This field is required.']})
+        if pk not in self.instance:
+            raise serializers.ValidationError({'id': ['Post not found.']})
+        # One write per post: a repeated id would insert its tags twice
+        if pk in seen:
+            raise serializers.ValidationError({'id': ['This post appears more than once.']})
+        seen.add(pk)
+        return self.instance[pk]
+    
+    def _resolve_tags(self, validated_data):
+        # One resolve_tag_names() call for every tag name in the batch
+        names = [name for data in validated_data for name in data.get('tag_names') or []]
+        by_slug = resolve_tag_names(names) if names else {}
+        result = []
+        for data in validated_data:
+            tag_ids = data.pop('tag_ids', None)
+            tag_names = data.pop('tag_names', None)
+            if tag_ids is None and tag_names is None:
+                result.append(None)
+                continue
+            ids = list(tag_ids or []) + [by_slug[tag_slug(name)] for name in tag_names or []]
+            result.append(list(dict.fromkeys(ids)))
+        return result
+    
+    def _write_tags(self, posts, tag_ids, replace):
+        Through = Post.tags.through
+        tagged = [(post, ids) for post, ids in zip(posts, tag_ids) if ids is not None]
+        if replace and tagged:
+            Through.objects.filter(post_id__in=[post.pk for post, _ in tagged]).delete()
+        rows = [Through(post_id=post.pk, tag_id=tag_id) for post, ids in tagged for tag_id in ids]
+        if rows:
+            Through.objects.bulk_create(rows)
+    
+    def create(self, validated_data):
+        author = self.context['request'].user
+        with transaction.atomic():
+            tag_ids = self._resolve_tags(validated_data)
+            posts = []
+            for data in validated_data:
+                data.pop('_index')
+                data.pop('_post')
+                if not data.get('category_id'):
+                    data.pop('category_id', None)
+                post = Post(author=author, **data)
+                # bulk_create skips Post.save()
+                post.refresh_summary()
+                posts.append(post)
+            Post.objects.bulk_create(posts)
+            self._write_tags(posts, tag_ids, replace=False)
+        return posts
+    
+    def update(self, instance, validated_data):
+        now = timezone.now()
+        fields = {'updated_at'}
+        with transaction.atomic():
+            tag_ids = self._resolve_tags(validated_data)
+            posts = []
+            for data in validated_data:
+                data.pop('_index')
+                post = data.pop('_post')
+                category_id = data.pop('category_id', None)
+                if category_id:
+                    post.category_id = category_id
+                    fields.add('category_id')
+                for attr, value in data.items():
+                    setattr(post, attr, value)
+                    fields.add(attr)
+                if 'content' in data:
+                    post.refresh_summary()
+                    fields.update(('excerpt', 'reading_time'))
+                # bulk_update skips auto_now
+                post.updated_at = now
+                posts.append(post)
+            Post.objects.bulk_update(posts, sorted(fields))
+            self._write_tags(posts, tag_ids, replace=True)
+            # bulk_update skips post_save, which normally drops the cached detail pages
+            keys = [response_cache_key('post-detail', post.pk) for post in posts]
+            transaction.on_commit(lambda: caches[single_flight_setting('CACHE')].delete_many(keys))
+        return posts
+
 class PostWriteSerializer(serializers.ModelSerializer):
     category_id = serializers.IntegerField(required=False, allow_null=True)
     tag_ids = serializers.ListField(
@@ -177,39 +491,104 @@ class PostWriteSerializer(serializers.ModelSerializer):
         required=False,
         allow_empty=True
     )
+    # Resolved (and created if missing) by slug, e.g. ["Django", "REST API"]
+    tag_names = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        required=False,
+        allow_empty=True,
+        write_only=True
+    )
     
     class Meta:
         model = Post
-        fields = ['title', 'content', 'image', 'category_id', 'tag_ids', 'status']
+        fields = ['title', 'content', 'image', 'category_id', 'tag_ids', 'tag_names', 'status']
+        list_serializer_class = PostBulkListSerializer
+    
+    def validate_status(self, value):
+        # Only archive_before makes stubs
+        if value == ARCHIVED:
+            raise serializers.ValidationError('Posts are archived with the archive_before command')
+        return value
+    
+    def validate_category_id(self, value):
+        if not value:
+            return value
+        # Bulk requests pre-load the batch's categories
+        known = self.context.get('known_category_ids')
+        exists = value in known if known is not None else Category.objects.filter(id=value).exists()
+        if not exists:
+            raise serializers.ValidationError(f'Unknown category id: {value}')
+        return value
+    
+    def validate_tag_ids(self, value):
+        ids = list(dict.fromkeys(value))
+        found = self.context.get('known_tag_ids')
+        if found is None:
+            found = set(Tag.objects.filter(id__in=ids).values_list('id', flat=True)) if ids else set()
+        unknown = [i for i in ids if i not in found]
+        if unknown:
+            raise serializers.ValidationError(f'Unknown tag ids: {", ".join(map(str, unknown))}')
+        return ids
+    
+    def validate_tag_names(self, value):
+        names = {}
+        for name in value:
+            name = name.strip()
+            slug = tag_slug(name)
+            if not slug:
+                raise serializers.ValidationError(f'"{name}" is not a valid tag name')
+            names.setdefault(slug, name)
+        return list(names.values())
+    
+    def validate(self, attrs):
+        # Counted before names are resolved, so a name that matches one of the ids still counts
+        count = len(attrs.get('tag_ids') or []) + len(attrs.get('tag_names') or [])
+        if count > MAX_POST_TAGS:
+            raise serializers.ValidationError(f'A post can have at most {MAX_POST_TAGS} tags')
+        return attrs
+    
+    def _resolve_tags(self, validated_data):
+        tag_ids = validated_data.pop('tag_ids', None)
+        tag_names = validated_data.pop('tag_names', None)
+        if tag_ids is None and tag_names is None:
+            return None
+        ids = list(tag_ids or [])
+        if tag_names:
+            ids.extend(resolve_tag_names(tag_names).values())
+        return list(dict.fromkeys(ids))
     
     def create(self, validated_data):
         category_id = validated_data.pop('category_id', None)
-        tag_ids = validated_data.pop('tag_ids', [])
         
         if category_id:
             validated_data['category_id'] = category_id
         
-        post = Post.objects.create(**validated_data)
-        
-        if tag_ids:
-            post.tags.set(tag_ids)
+        # Fixed query count however many tags: tag lookup/insert, post insert, one through-table insert
+        with transaction.atomic():
+            tag_ids = self._resolve_tags(validated_data)
+            post = Post.objects.create(**validated_data)
+            if tag_ids:
+                Through = Post.tags.through
+                Through.objects.bulk_create([Through(post_id=post.pk, tag_id=tag_id) for tag_id in tag_ids])
         
         return post
     
     def update(self, instance, validated_data):
         category_id = validated_data.pop('category_id', None)
-        tag_ids = validated_data.pop('tag_ids', None)
-        
-        if category_id:
-            instance.category_id = category_id
         
-        if tag_ids is not None:
-            instance.tags.set(tag_ids)
-        
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        
-        instance.save()
+        with transaction.atomic():
+            tag_ids = self._resolve_tags(validated_data)
+            
+            if category_id:
+                instance.category_id = category_id
+            
+            if tag_ids is not None:
+                instance.tags.set(tag_ids)
+            
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            
+            instance.save()
         return instance
 
 # Like Serializer
@@ -231,11 +610,42 @@ class BookmarkSerializer(serializers.ModelSerializer):
         read_only_fields = ['created_at']
 
 # Follow Serializer
-class FollowSerializer(serializers.ModelSerializer):
+class FollowSerializer(IncludedFieldsMixin, serializers.ModelSerializer):
     follower = UserSerializer(read_only=True)
     following = UserSerializer(read_only=True)
     
     class Meta:
         model = Follow
         fields = ['id', 'follower', 'following', 'created_at']
-        read_only_fields = ['follower', 'created_at']
\ No newline at end of file
+        read_only_fields = ['follower', 'created_at']
+    
+    included_fields = {
+        'follower': ('users', UserSerializer),
+        'following': ('users', UserSerializer),
+    }
+
+# Suggested User Serializer ("Who to follow")
+class SuggestedUserSerializer(serializers.ModelSerializer):
+    profile = UserProfileSerializer(read_only=True)
+    mutual_count = serializers.SerializerMethodField()
+    recent_posts_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = ['id', 'username', 'first_name', 'last_name', 'profile',
+                  'mutual_count', 'recent_posts_count']
+
+    def get_mutual_count(self, obj):
+        return self.context.get('mutual_counts', {}).get(obj.id, 0)
+
+    def get_recent_posts_count(self, obj):
+        return self.context.get('activity', {}).get(obj.id, 0)
+
+# Chunked upload state - the client resumes from "offset"
+class UploadSerializer(serializers.ModelSerializer):
+    complete = serializers.BooleanField(source='is_complete', read_only=True)
+    
+    class Meta:
+        model = Upload
+        fields = ['id', 'filename', 'size', 'offset', 'content_type', 'sha256', 'complete', 'expires_at']
+        read_only_fields = ['offset', 'content_type', 'sha256', 'expires_at']
@@ -0,0 +1,249 @@
+# backend/api/signals.py
+# Model signal handlers - ApiConfig.ready() এ connect করা হয়
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models.signals import pre_save, post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Follow, Tag, Category, UserProfile, Post, Comment, Like, Bookmark, Upload
+from .graph import follow_graph, suggestions_cache
+from .authentication import evict_cached_user, bump_token_version
+from .autocomplete import autocomplete_index
+from .fragments import bump_fragment_generation
+from .singleflight import response_cache_key, single_flight_setting
+from .events import publish
+from .serializers import CommentSerializer
+from .comments import thread_context
+from .sync import record_tombstone
+from .analytics import record_event
+from .archive import delete_archived
+from .uploads import discard
+from .media import change_references, media_fields
+
+# ==================== Follow Graph ====================
+
+@receiver(post_save, sender=Follow)
+def follow_created(sender, instance, created, **kwargs):
+    if not created:
+        return
+    follower_id, following_id = instance.follower_id, instance.following_id
+
+    def apply():
+        follow_graph.add_edge(follower_id, following_id)
+        suggestions_cache.delete(follower_id)
+    transaction.on_commit(apply)
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    follower_id, following_id = instance.follower_id, instance.following_id
+
+    def apply():
+        follow_graph.remove_edge(follower_id, following_id)
+        suggestions_cache.delete(follower_id)
+    transaction.on_commit(apply)
+
+# ==================== JWT User Cache ====================
+
+@receiver(pre_save, sender=User)
+def user_pre_save(sender, instance, **kwargs):
+    # set_password() stores the raw password in _password until the user is saved
+    instance._revoke_tokens = bool(instance.pk) and (
+        instance._password is not None or not instance.is_active
+    )
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, created, **kwargs):
+    evict_cached_user(instance.pk)
+    if not created and getattr(instance, '_revoke_tokens', False):
+        bump_token_version(instance.pk)
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    evict_cached_user(instance.pk)
+
+# ==================== Autocomplete Index ====================
+
+AUTOCOMPLETE_USER_FIELDS = {'username', 'first_name', 'last_name', 'is_active'}
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Category)
+def autocomplete_term_saved(sender, instance, **kwargs):
+    type_name = 'tag' if sender is Tag else 'category'
+    obj_id, name, slug = instance.pk, instance.name, instance.slug
+    transaction.on_commit(lambda: autocomplete_index.upsert(type_name, obj_id, name, slug))
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Category)
+def autocomplete_term_deleted(sender, instance, **kwargs):
+    type_name = 'tag' if sender is Tag else 'category'
+    obj_id = instance.pk
+    transaction.on_commit(lambda: autocomplete_index.remove(type_name, obj_id))
+
+@receiver(post_save, sender=User)
+def autocomplete_user_saved(sender, instance, update_fields=None, **kwargs):
+    # Logins save last_login only - nothing to re-index
+    if update_fields and not AUTOCOMPLETE_USER_FIELDS.intersection(update_fields):
+        return
+    obj_id, username = instance.pk, instance.username
+    full_name = instance.get_full_name()
+    if instance.is_active:
+        transaction.on_commit(lambda: autocomplete_index.upsert('user', obj_id, username, full_name))
+    else:
+        transaction.on_commit(lambda: autocomplete_index.remove('user', obj_id))
+
+@receiver(post_delete, sender=User)
+def autocomplete_user_deleted(sender, instance, **kwargs):
+    obj_id = instance.pk
+    transaction.on_commit(lambda: autocomplete_index.remove('user', obj_id))
+
+# ==================== Post Fragment Cache ====================
+# Post edits change updated_at and counters are part of the key; these cover
+# the nested objects rendered into every post fragment.
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=UserProfile)
+def fragment_dependency_changed(sender, **kwargs):
+    transaction.on_commit(bump_fragment_generation)
+
+@receiver(post_save, sender=User)
+def fragment_author_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields and not AUTOCOMPLETE_USER_FIELDS.intersection(update_fields)):
+        return
+    transaction.on_commit(bump_fragment_generation)
+
+# ==================== Cached Post Detail ====================
+
+def drop_post_detail(post_id):
+    caches[single_flight_setting('CACHE')].delete(response_cache_key('post-detail', post_id))
+
+@receiver(post_save, sender=Post)
+def post_detail_saved(sender, instance, update_fields=None, **kwargs):
+    # View counting alone does not invalidate the cached page
+    if update_fields and set(update_fields) <= {'views_count'}:
+        return
+    post_id = instance.pk
+    transaction.on_commit(lambda: drop_post_detail(post_id))
+
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def post_detail_changed(sender, instance, **kwargs):
+    post_id = instance.pk if sender is Post else instance.post_id
+    transaction.on_commit(lambda: drop_post_detail(post_id))
+
+# ==================== Post Events (SSE) ====================
+
+@receiver(post_save, sender=Comment)
+def comment_event(sender, instance, created, **kwargs):
+    def build():
+        return {
+            'comment': CommentSerializer(instance, context=thread_context([instance])).data,
+            'comments_count': Comment.objects.filter(post_id=instance.post_id).count(),
+        }
+    event_type = 'comment.created' if created else 'comment.updated'
+    transaction.on_commit(lambda: publish(instance.post_id, event_type, build))
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted_event(sender, instance, **kwargs):
+    comment_id, parent_id, post_id = instance.pk, instance.parent_id, instance.post_id
+    
+    def build():
+        return {
+            'id': comment_id,
+            'parent': parent_id,
+            'comments_count': Comment.objects.filter(post_id=post_id).count(),
+        }
+    transaction.on_commit(lambda: publish(post_id, 'comment.deleted', build))
+
+@receiver(post_save, sender=Like)
+@receiver(post_delete, sender=Like)
+def like_event(sender, instance, **kwargs):
+    post_id = instance.post_id
+    
+    def build():
+        return {'likes_count': Like.objects.filter(post_id=post_id).count()}
+    transaction.on_commit(lambda: publish(post_id, 'likes', build))
+
+# ==================== Delta Sync Tombstones ====================
+# Written in the deleting transaction, so a tombstone exists iff the delete committed
+
+@receiver(post_delete, sender=Post)
+def post_tombstone(sender, instance, **kwargs):
+    record_tombstone('post', instance.pk, user_id=instance.author_id)
+
+@receiver(post_delete, sender=Bookmark)
+def bookmark_tombstone(sender, instance, **kwargs):
+    record_tombstone('bookmark', instance.post_id, user_id=instance.user_id)
+
+@receiver(post_delete, sender=Follow)
+def follow_tombstone(sender, instance, **kwargs):
+    record_tombstone('follow', instance.following_id, user_id=instance.follower_id)
+
+# ==================== Engagement Events ====================
+# Appended in the writing transaction; compact_engagement folds them into DailyPostStats
+
+ENGAGEMENT_METRICS = {Like: 'likes', Comment: 'comments', Bookmark: 'bookmarks'}
+
+@receiver(post_save, sender=Like)
+@receiver(post_save, sender=Comment)
+@receiver(post_save, sender=Bookmark)
+def engagement_created(sender, instance, created, **kwargs):
+    if created:
+        record_event(instance.post_id, ENGAGEMENT_METRICS[sender])
+
+@receiver(post_delete, sender=Like)
+@receiver(post_delete, sender=Comment)
+@receiver(post_delete, sender=Bookmark)
+def engagement_deleted(sender, instance, origin=None, **kwargs):
+    # A deleted post takes its rollups with it
+    if isinstance(origin, Post):
+        return
+    record_event(instance.post_id, ENGAGEMENT_METRICS[sender], -1)
+
+# ==================== Post Archive ====================
+
+@receiver(post_delete, sender=Post)
+def archived_post_deleted(sender, instance, **kwargs):
+    if instance.status == 'archived':
+        delete_archived(instance.pk)
+
+# ==================== Chunked Uploads ====================
+
+@receiver(post_delete, sender=Upload)
+def upload_deleted(sender, instance, **kwargs):
+    upload_id = instance.pk
+    transaction.on_commit(lambda: discard(upload_id))
+
+# ==================== Media Blob References ====================
+# The stored name as loaded is kept on the instance; saves that change it move one reference
+
+def stored_media_name(instance, field_name):
+    value = instance.__dict__.get(field_name)  # deferred fields are not loaded
+    return getattr(value, 'name', value) or ''
+
+@receiver(post_init, sender=Post)
+@receiver(post_init, sender=UserProfile)
+def media_loaded(sender, instance, **kwargs):
+    instance._stored_media = stored_media_name(instance, media_fields()[sender])
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=UserProfile)
+def media_saved(sender, instance, created, update_fields=None, **kwargs):
+    field_name = media_fields()[sender]
+    if field_name not in instance.__dict__ or (update_fields and field_name not in update_fields):
+        return
+    current = stored_media_name(instance, field_name)
+    change_references(added=current, removed='' if created else instance._stored_media)
+    instance._stored_media = current
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=UserProfile)
+def media_deleted(sender, instance, **kwargs):
+    change_references(removed=stored_media_name(instance, media_fields()[sender]))
@@ -0,0 +1,241 @@
+# backend/api/singleflight.py
+# Single-flight cache fills - একই key এর জন্য একসাথে একটাই recompute
+#
+# cached_call() stores (value, fresh_until) under the key. While the value is
+# fresh it is returned as is. Once stale, one caller refreshes it and everyone
+# else keeps getting the stale value (stale-while-revalidate). On a cold miss,
+# concurrent callers in this process wait for the first one's result (with
+# background=True a stale refresh runs on its own thread, so no request waits
+# for it). With
+# CROSS_PROCESS enabled, callers in other workers wait on a lock key in the
+# shared cache. Waiters that time out get SingleFlightTimeout instead of
+# piling onto the database.
+
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import caches
+from django.http import HttpRequest
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .utils import run_in_background
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_DEFAULTS = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'FRESH_TIMEOUT': 30,     # seconds a cached response is served as is
+    'STALE_TIMEOUT': 300,    # extra seconds it may be served while being refreshed
+    'WAIT_TIMEOUT': 5,       # seconds a waiter blocks before giving up
+    'LOCK_TIMEOUT': 30,      # cross-process fill lock expiry (a crashed filler releases it)
+    'CROSS_PROCESS': True,
+    'POLL_INTERVAL': 0.05,
+}
+
+
+def single_flight_setting(name):
+    return getattr(settings, 'SINGLE_FLIGHT', {}).get(name, SINGLE_FLIGHT_DEFAULTS[name])
+
+
+class SingleFlightTimeout(Exception):
+    pass
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key within a process into one."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def running(self, key):
+        return key in self._calls
+
+    def do(self, key, fn, wait_timeout=None):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            if wait_timeout is None:
+                wait_timeout = single_flight_setting('WAIT_TIMEOUT')
+            if not call.event.wait(wait_timeout):
+                raise SingleFlightTimeout(key)
+            if call.error is not None:
+                # Share the failure instead of every waiter retrying it
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+
+single_flight = SingleFlight()
+
+
+def _lock_key(key):
+    return f'{key}:filling'
+
+
+def _fill(cache, key, compute, fresh_timeout, stale_timeout):
+    value = compute()
+    cache.set(key, (value, time.time() + fresh_timeout), fresh_timeout + stale_timeout)
+    return value
+
+
+def _fill_exclusive(cache, key, compute, fresh_timeout, stale_timeout):
+    """Cold miss: fill under the cross-process lock, or wait for whoever holds it."""
+    if not single_flight_setting('CROSS_PROCESS'):
+        return _fill(cache, key, compute, fresh_timeout, stale_timeout)
+
+    deadline = time.monotonic() + single_flight_setting('WAIT_TIMEOUT')
+    while True:
+        if cache.add(_lock_key(key), 1, single_flight_setting('LOCK_TIMEOUT')):
+            try:
+                return _fill(cache, key, compute, fresh_timeout, stale_timeout)
+            finally:
+                cache.delete(_lock_key(key))
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+        if time.monotonic() > deadline:
+            raise SingleFlightTimeout(key)
+        time.sleep(single_flight_setting('POLL_INTERVAL'))
+
+
+def _refresh(cache, key, compute, fresh_timeout, stale_timeout):
+    # Background stale refresh; the stale value keeps being served if it fails
+    try:
+        single_flight.do(key, lambda: _fill(cache, key, compute, fresh_timeout, stale_timeout))
+    except Exception:
+        logger.exception('Refreshing %s failed, serving stale value', key)
+    finally:
+        if single_flight_setting('CROSS_PROCESS'):
+            cache.delete(_lock_key(key))
+
+
+def cached_call(key, compute, fresh_timeout=None, stale_timeout=None, cache=None, background=False):
+    """Return the cached value for ``key``, computing it at most once at a time."""
+    cache = cache or caches[single_flight_setting('CACHE')]
+    if fresh_timeout is None:
+        fresh_timeout = single_flight_setting('FRESH_TIMEOUT')
+    if stale_timeout is None:
+        stale_timeout = single_flight_setting('STALE_TIMEOUT')
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if time.time() < fresh_until:
+            return value
+        # Stale: at most one refresher per process and (optionally) per cluster
+        if single_flight.running(key):
+            return value
+        if single_flight_setting('CROSS_PROCESS') and not cache.add(
+            _lock_key(key), 1, single_flight_setting('LOCK_TIMEOUT')
+        ):
+            return value
+        if background:
+            run_in_background(
+                lambda: _refresh(cache, key, compute, fresh_timeout, stale_timeout), f'refresh {key}'
+            )
+            return value
+        try:
+            return single_flight.do(key, lambda: _fill(cache, key, compute, fresh_timeout, stale_timeout))
+        except SingleFlightTimeout:
+            return value
+        except Exception:
+            logger.exception('Refreshing %s failed, serving stale value', key)
+            return value
+        finally:
+            if single_flight_setting('CROSS_PROCESS'):
+                cache.delete(_lock_key(key))
+
+    return single_flight.do(key, lambda: _fill_exclusive(cache, key, compute, fresh_timeout, stale_timeout))
+
+
+def response_cache_key(*parts):
+    return 'view:' + ':'.join(str(part) for part in parts)
+
+
+class SingleFlightCacheMixin:
+    """
+    Cache anonymous GET responses with single-flight fills and stale-while-revalidate.
+
+    Views return a key from ``get_response_cache_key()`` (``None`` skips the
+    cache). The cached payload comes from ``get_cached_data()``, which runs on
+    a detached anonymous copy of the view and request (a stale refresh runs
+    after the response has gone out), so it must have no side effects.
+    ``served_from_cache()`` runs once on the request thread for every request
+    answered through the cache, for side effects such as view counting.
+    """
+
+    def get_response_cache_key(self, request, *args, **kwargs):
+        return None
+
+    def get_cached_data(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs).data
+
+    def served_from_cache(self, request, *args, **kwargs):
+        pass
+
+    def detached_view(self, request, *args, **kwargs):
+        """Return a fresh instance of this view bound to an anonymous copy of ``request``."""
+        http = HttpRequest()
+        http.method = 'GET'
+        http.path = request._request.path
+        http.path_info = request._request.path_info
+        http.META = dict(request._request.META)
+        http.GET = request._request.GET.copy()
+        http.user = AnonymousUser()
+        view = type(self)()
+        view.request = Request(http, authenticators=[])
+        view.args, view.kwargs = args, kwargs
+        view.format_kwarg = view.get_format_suffix(**kwargs)
+        view.headers = {}
+        # Negotiation and per-request setup, without counting against throttles
+        view.throttle_classes = ()
+        view.initial(view.request, *args, **kwargs)
+        return view
+
+    def get(self, request, *args, **kwargs):
+        key = None
+        if single_flight_setting('ENABLED') and not request.user.is_authenticated:
+            key = self.get_response_cache_key(request, *args, **kwargs)
+        if key is None:
+            return super().get(request, *args, **kwargs)
+
+        view = self.detached_view(request, *args, **kwargs)
+        try:
+            # Stale pages are refreshed off the request thread
+            data = cached_call(key, lambda: view.get_cached_data(view.request, *args, **kwargs), background=True)
+        except SingleFlightTimeout:
+            return Response(
+                {'error': 'This page is being generated, try again shortly'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={'Retry-After': '1'},
+            )
+        self.served_from_cache(request, *args, **kwargs)
+        return Response(data)
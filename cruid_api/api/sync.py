@@ -0,0 +1,74 @@
+# backend/api/sync.py
+# Delta sync - client শেষবার যা পেয়েছে তার পর থেকে শুধু পরিবর্তনগুলো
+#
+# A sync token is a signed (feed, timestamp) pair. /api/sync/<feed>/?since=<token>
+# returns posts of that feed whose updated_at (or bookmark time) is newer than
+# the token, plus the ids that left the feed: deleted or unpublished posts and
+# removed bookmarks, read from the Tombstone table. Each request re-reads an
+# OVERLAP window so rows committed while the previous sync ran are not missed;
+# clients merge by id. Missing, foreign or expired tokens and oversized deltas
+# answer with full_resync so the client reloads the feed instead.
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Tombstone
+
+SYNC_DEFAULTS = {
+    'MAX_CHANGES': 200,            # larger deltas answer full_resync
+    'OVERLAP': 5,                  # seconds re-read on every sync
+    'RETENTION': 30 * 24 * 3600,   # tombstones (and so tokens) live this long
+}
+
+SYNC_SALT = 'api.sync'
+
+
+def sync_setting(name):
+    return getattr(settings, 'SYNC', {}).get(name, SYNC_DEFAULTS[name])
+
+
+def make_sync_token(feed, at):
+    return signing.dumps({'f': feed, 't': at.timestamp()}, salt=SYNC_SALT, compress=True)
+
+
+def read_sync_token(token, feed):
+    """Return the token's timestamp, or None if it is invalid, for another feed, or expired."""
+    if not token:
+        return None
+    try:
+        data = signing.loads(token, salt=SYNC_SALT)
+        at = datetime.fromtimestamp(float(data['t']), tz=dt_timezone.utc)
+    except (signing.BadSignature, KeyError, TypeError, ValueError):
+        return None
+    if data.get('f') != feed:
+        return None
+    if at < timezone.now() - timedelta(seconds=sync_setting('RETENTION')):
+        return None
+    return at
+
+
+def sync_since(at):
+    return at - timedelta(seconds=sync_setting('OVERLAP'))
+
+
+def tombstones_since(kind, since, user_id=None, authors=None):
+    queryset = Tombstone.objects.filter(kind=kind, deleted_at__gt=since)
+    if user_id is not None:
+        queryset = queryset.filter(user_id=user_id)
+    if authors is not None:
+        # Post tombstones written before authors were recorded have no user_id
+        queryset = queryset.filter(Q(user_id__in=authors) | Q(user_id__isnull=True))
+    return set(queryset.values_list('object_id', flat=True))
+
+
+def record_tombstone(kind, object_id, user_id=None):
+    Tombstone.objects.create(kind=kind, object_id=object_id, user_id=user_id)
+
+
+def purge_tombstones():
+    cutoff = timezone.now() - timedelta(seconds=sync_setting('RETENTION'))
+    return Tombstone.objects.filter(deleted_at__lt=cutoff).delete()[0]
@@ -0,0 +1,37 @@
+# backend/api/tasks.py
+# Background job handlers - ApiConfig.ready() এ import হয়ে register হয়
+
+from collections import Counter
+
+from django.contrib.auth.models import User
+from django.db.models import F
+
+from .analytics import analytics_setting, compact_engagement as compact, record_events
+from .jobs import job
+from .models import Post, UserProfile
+from .uploads import purge_expired, upload_setting
+
+
+@job('increment_views', batch=True)
+def increment_views(payloads):
+    # One UPDATE per post however many views were queued for it
+    counts = Counter(payload['post_id'] for payload in payloads)
+    for post_id, n in counts.items():
+        Post.objects.filter(pk=post_id).update(views_count=F('views_count') + n)
+    record_events({(post_id, 'views'): n for post_id, n in counts.items()})
+
+
+@job('create_profile')
+def create_profile(payload):
+    if User.objects.filter(pk=payload['user_id']).exists():
+        UserProfile.objects.get_or_create(user_id=payload['user_id'])
+
+
+@job('compact_engagement', every=analytics_setting('COMPACT_INTERVAL'))
+def compact_engagement(payload):
+    compact()
+
+
+@job('purge_uploads', every=upload_setting('PURGE_INTERVAL'))
+def purge_uploads(payload):
+    purge_expired()
@@ -0,0 +1,25 @@
+# backend/api/test_runner.py
+# Test runner - টেস্ট কখনো আসল Redis ছোঁয় না
+#
+# settings.TEST_RUNNER. For the whole run the shared cache tier is swapped for
+# settings.LOCAL_SHARED_CACHE (a process-local LocMemCache), whatever
+# REDIS_URL says, so tests neither read nor clear a shared Redis.
+
+import copy
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class LocalCacheTestRunner(DiscoverRunner):
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        caches = copy.deepcopy(settings.CACHES)
+        caches['default']['OPTIONS']['SHARED'] = settings.LOCAL_SHARED_CACHE
+        self._local_caches = override_settings(CACHES=caches)
+        self._local_caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._local_caches.disable()
+        super().teardown_test_environment(**kwargs)
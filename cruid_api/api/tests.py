@@ -7,8 +7,44 @@ from django.contrib.auth.models import User
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 from django.urls import reverse
-from .models import Post, Comment, Like, Bookmark, Category, Tag, UserProfile
+from .models import Post, Comment, Like, Bookmark, Category, Tag, UserProfile, Follow
+from .graph import FollowGraph, follow_graph, suggestions_cache
+from .hashing import hashing_pool
+from .autocomplete import autocomplete_index, build_on_startup
+from .cache_backends import TwoTierCache, NEGATIVE
+from .singleflight import SingleFlight, cached_call, response_cache_key
+from .jobs import HANDLERS, Worker, claim_jobs, enqueue, job, requeue_stale, run_pending_jobs
+from .models import Job, Tombstone, EngagementEvent, DailyPostStats, ArchivedPost, ArchivedComment, ArchivedLike, Upload
+from .uploads import temp_path, write_chunk
+from .models import MediaBlob, ImportCheckpoint, ImportedObject
+from .media import collect_garbage, register_blob
+from django.core.files.uploadedfile import SimpleUploadedFile
+from . import analytics
+from .analytics import compact_engagement
+from . import batch as batch_module
+from .events import broadcaster
+from .authentication import CachedJWTAuthentication
+from unittest import mock
+import asyncio
+import threading
+import time
 import json
+import os
+import tempfile
+import gzip
+import csv
+from io import BytesIO, StringIO
+import hashlib
+from django.http import UnreadablePostError
+from django.core.management import call_command
+from django.test import override_settings, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.text import slugify
+from datetime import timedelta
 
 # ==================== Unit Tests ====================
 
@@ -106,6 +142,23 @@ class PostModelTest(TestCase):
         post.increment_views()
         post.refresh_from_db()
         self.assertEqual(post.views_count, initial_views + 1)
+    
+    def test_post_excerpt_and_reading_time(self):
+        """Test that excerpt and reading time are stored on save"""
+        post = Post.objects.create(
+            title='Long Post',
+            content='word ' * 450,
+            author=self.user
+        )
+        self.assertTrue(post.excerpt.endswith('…'))
+        self.assertLessEqual(len(post.excerpt), 201)
+        self.assertEqual(post.reading_time, 3)
+        
+        post.content = 'Short now'
+        post.save(update_fields=['content'])
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Short now')
+        self.assertEqual(post.reading_time, 1)
 
 class CommentModelTest(TestCase):
     """Test Comment model"""
@@ -362,6 +415,100 @@ class PostAPITest(APITestCase):
         self.assertEqual(len(response.data['results']), 1)
         self.assertEqual(response.data['results'][0]['title'], 'Django Tutorial')
 
+class PostListPayloadTest(APITestCase):
+    """Test that list endpoints return excerpts without loading content"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.post = Post.objects.create(title='Long Post', content='body ' * 1000, author=self.user)
+        self.client.force_authenticate(user=self.user)
+    
+    def test_list_returns_excerpt_only(self):
+        """Test that the list payload has the excerpt and no content"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('post-list-create'))
+        result = response.data['results'][0]
+        self.assertNotIn('content', result)
+        self.assertEqual(result['excerpt'], self.post.excerpt)
+        self.assertEqual(result['reading_time'], 5)
+        post_selects = [q['sql'] for q in ctx.captured_queries if q['sql'].startswith('SELECT "api_post"."id"')]
+        self.assertTrue(post_selects)
+        self.assertFalse(any('"api_post"."content"' in sql.split(' FROM ')[0] for sql in post_selects))
+    
+    def test_detail_returns_content(self):
+        """Test that the detail view still returns the full body"""
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.post.id}))
+        self.assertEqual(response.data['content'], self.post.content)
+
+class PostFragmentCacheTest(APITestCase):
+    """Test that list endpoints reuse cached post fragments"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.reader = User.objects.create_user(username='reader', password='testpass123')
+        self.tag = Tag.objects.create(name='Django')
+        self.posts = []
+        for i in range(3):
+            post = Post.objects.create(title=f'Post {i}', content='Content', author=self.user)
+            post.tags.add(self.tag)
+            self.posts.append(post)
+        self.url = reverse('post-list-create')
+        self.client.force_authenticate(user=self.reader)
+    
+    def get_results(self):
+        response = self.client.get(self.url)
+        body = json.loads(response.content)
+        self.assertEqual(body['results'], [dict(row) for row in response.data['results']])
+        return body['results']
+    
+    def test_warm_page_skips_serializer(self):
+        """Test that a warm page costs the same queries however many posts it has"""
+        cold = self.get_results()
+        with CaptureQueriesContext(connection) as small:
+            warm = self.get_results()
+        self.assertEqual(cold, warm)
+        
+        for i in range(5):
+            Post.objects.create(title=f'More {i}', content='Content', author=self.user)
+        self.get_results()
+        with CaptureQueriesContext(connection) as large:
+            self.get_results()
+        self.assertEqual(len(large.captured_queries), len(small.captured_queries))
+    
+    def test_counters_and_user_flags_are_live(self):
+        """Test that likes rotate the fragment and is_liked stays per user"""
+        self.get_results()
+        Like.objects.create(post=self.posts[0], user=self.reader)
+        Post.objects.filter(pk=self.posts[1].pk).update(views_count=7)
+        
+        results = {row['id']: row for row in self.get_results()}
+        self.assertEqual(results[self.posts[0].id]['likes_count'], 1)
+        self.assertTrue(results[self.posts[0].id]['is_liked'])
+        self.assertEqual(results[self.posts[1].id]['views_count'], 7)
+        
+        self.client.force_authenticate(user=self.user)
+        results = {row['id']: row for row in self.get_results()}
+        self.assertFalse(results[self.posts[0].id]['is_liked'])
+    
+    def test_tag_rename_invalidates(self):
+        """Test that renaming a tag is reflected in cached fragments"""
+        self.get_results()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.tag.name = 'Flask'
+            self.tag.save()
+        self.assertEqual(self.get_results()[0]['tags'][0]['name'], 'Flask')
+    
+    def test_text_cannot_forge_placeholder(self):
+        """Test that strings shaped like the old placeholder are rendered as plain text"""
+        from .fragments import PostFragment, PostFragmentJSONRenderer
+        fragment = PostFragment(b'{"id":1}', {'is_liked': False})
+        data = {'note': '\x005\x00', 'other': '\x000\x00', 'results': [fragment]}
+        body = json.loads(PostFragmentJSONRenderer().render(data))
+        self.assertEqual(body['note'], '\x005\x00')
+        self.assertEqual(body['other'], '\x000\x00')
+        self.assertEqual(body['results'], [{'id': 1, 'is_liked': False}])
+
 class CommentAPITest(APITestCase):
     """Test Comment APIs"""
     
@@ -512,4 +659,1993 @@ class BookmarkAPITest(APITestCase):
         url = reverse('my-bookmarks')
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data['results']), 1)
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 1)
+
+class FollowGraphTest(TestCase):
+    """Test the in-memory follow graph"""
+    
+    def test_csr_build_and_overlay(self):
+        """Test adjacency lookups and incremental updates"""
+        graph = FollowGraph()
+        graph.load_edges([(1, 2), (1, 3), (2, 3), (2, 4), (3, 4)])
+        self.assertEqual(graph.following(1), {2, 3})
+        self.assertEqual(graph.following(4), set())
+        
+        graph.add_edge(4, 1)
+        graph.remove_edge(1, 3)
+        self.assertEqual(graph.following(4), {1})
+        self.assertEqual(graph.following(1), {2})
+    
+    def test_mutual_counts(self):
+        """Test friends-of-friends ranking input"""
+        graph = FollowGraph()
+        graph.load_edges([(1, 2), (1, 3), (2, 4), (3, 4), (3, 5)])
+        self.assertEqual(graph.mutual_counts(1), {4: 2, 5: 1})
+    
+    def test_memory_is_bounded(self):
+        """Test that edges are stored as 4-byte indices"""
+        graph = FollowGraph()
+        graph.load_edges((i % 1000, (i // 1000 + i) % 1000) for i in range(100000))
+        self.assertEqual(graph.edge_count(), 100000)
+        self.assertLess(graph.memory_bytes(), 100000 * 4 + 1000 * 12 + 64)
+    
+    def test_changes_during_rebuild_are_replayed(self):
+        """Test that follows made while a rebuild reads the DB survive the swap"""
+        graph = FollowGraph()
+        graph.load_edges([(1, 2)])
+        graph._building = True
+        graph.add_edge(1, 3)
+        graph.remove_edge(1, 2)
+        graph.load_edges([(1, 2)])
+        self.assertEqual(graph.following(1), {3})
+
+class UserSuggestionsAPITest(APITestCase):
+    """Test Who-to-follow suggestions API"""
+    
+    def setUp(self):
+        follow_graph.reset()
+        suggestions_cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.friend = User.objects.create_user(username='friend', password='testpass123')
+        self.other_friend = User.objects.create_user(username='otherfriend', password='testpass123')
+        self.popular = User.objects.create_user(username='popular', password='testpass123')
+        self.quiet = User.objects.create_user(username='quiet', password='testpass123')
+        
+        Follow.objects.create(follower=self.user, following=self.friend)
+        Follow.objects.create(follower=self.user, following=self.other_friend)
+        Follow.objects.create(follower=self.friend, following=self.popular)
+        Follow.objects.create(follower=self.other_friend, following=self.popular)
+        Follow.objects.create(follower=self.friend, following=self.quiet)
+        
+        self.client.force_authenticate(user=self.user)
+    
+    def test_suggestions_ranked_by_mutuals(self):
+        """Test that candidates followed by more followees rank first"""
+        response = self.client.get(reverse('user-suggestions'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        usernames = [u['username'] for u in response.data['results']]
+        self.assertEqual(usernames, ['popular', 'quiet'])
+        self.assertEqual(response.data['results'][0]['mutual_count'], 2)
+    
+    def test_follow_updates_graph(self):
+        """Test that following a suggested user removes it from suggestions"""
+        self.client.get(reverse('user-suggestions'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('follow-toggle', kwargs={'user_id': self.popular.id}))
+        
+        response = self.client.get(reverse('user-suggestions'))
+        usernames = [u['username'] for u in response.data['results']]
+        self.assertEqual(usernames, ['quiet'])
+    
+    def test_short_suggestion_list_is_cached(self):
+        """Test that users with few candidates are served from the cache"""
+        self.client.get(reverse('user-suggestions'))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user-suggestions'), {'limit': 30})
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertFalse([q for q in queries if 'api_post' in q['sql']])
+    
+    def test_small_limit_does_not_truncate_cache(self):
+        """Test that a list cached for a small limit still holds every candidate it claims"""
+        for i in range(7):
+            candidate = User.objects.create_user(username=f'candidate{i}', password='testpass123')
+            Follow.objects.create(follower=self.friend, following=candidate)
+        follow_graph.reset()
+        self.client.get(reverse('user-suggestions'), {'limit': 1})
+        response = self.client.get(reverse('user-suggestions'), {'limit': 10})
+        self.assertEqual(len(response.data['results']), 9)
+
+class CachedJWTAuthenticationTest(APITestCase):
+    """Test cached, versioned JWT authentication"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        response = self.client.post(reverse('login'), {
+            'username': 'testuser',
+            'password': 'testpass123'
+        }, format='json')
+        self.refresh = response.data['refresh']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.missing_post_url = reverse('like-toggle', kwargs={'post_id': 999})
+    
+    def test_cached_user_skips_user_query(self):
+        """Test that a warm cache authenticates without touching auth_user"""
+        self.client.post(self.missing_post_url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.missing_post_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse([q for q in queries if 'auth_user' in q['sql']])
+    
+    def test_logout_revokes_tokens(self):
+        """Test that logout invalidates access and refresh tokens"""
+        response = self.client.post(reverse('logout'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        response = self.client.post(self.missing_post_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_password_change_revokes_tokens(self):
+        """Test that changing the password invalidates existing tokens"""
+        self.client.post(self.missing_post_url)
+        self.user.set_password('newpass456')
+        self.user.save()
+        response = self.client.post(self.missing_post_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_deactivation_revokes_tokens(self):
+        """Test that deactivated users are rejected"""
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(self.missing_post_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_refresh_keeps_version(self):
+        """Test that refreshed access tokens still authenticate"""
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.refresh}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        response = self.client.post(self.missing_post_url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+HASHING_TEST_SETTINGS = {'EXECUTOR': 'thread', 'WORKERS': 1, 'MAX_PENDING': 4, 'REHASH_ALGORITHM': None}
+
+@override_settings(PASSWORD_HASHING=HASHING_TEST_SETTINGS)
+class AsyncAuthAPITest(APITestCase):
+    """Test async login/register with pooled password hashing"""
+    
+    def setUp(self):
+        hashing_pool.shutdown()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+    
+    def tearDown(self):
+        hashing_pool.shutdown()
+    
+    def test_async_login(self):
+        """Test login through the hashing pool"""
+        response = self.client.post(reverse('async-login'), {
+            'username': 'testuser', 'password': 'testpass123'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('access', response.json())
+        self.assertEqual(response.json()['user']['username'], 'testuser')
+    
+    def test_async_login_invalid(self):
+        """Test wrong password and unknown user"""
+        response = self.client.post(reverse('async-login'), {
+            'username': 'testuser', 'password': 'wrong'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(reverse('async-login'), {
+            'username': 'nobody', 'password': 'wrong'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    @override_settings(PASSWORD_HASHING={**HASHING_TEST_SETTINGS, 'MAX_PENDING': 0})
+    def test_queue_full_returns_429(self):
+        """Test early rejection when the hashing queue is full"""
+        response = self.client.post(reverse('async-login'), {
+            'username': 'testuser', 'password': 'testpass123'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+    
+    @override_settings(PASSWORD_HASHING={**HASHING_TEST_SETTINGS, 'REHASH_ALGORITHM': 'pbkdf2_sha1'})
+    def test_rehash_on_login(self):
+        """Test opt-in transparent rehash to the configured algorithm"""
+        response = self.client.post(reverse('async-login'), {
+            'username': 'testuser', 'password': 'testpass123'
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha1$'))
+        self.assertTrue(self.user.check_password('testpass123'))
+    
+    def test_async_register(self):
+        """Test registration with the password hashed in the pool"""
+        response = self.client.post(reverse('async-register'), {
+            'username': 'newuser',
+            'email': 'newuser@example.com',
+            'password': 'newpass123',
+            'password2': 'newpass123',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user = User.objects.get(username='newuser')
+        self.assertTrue(user.check_password('newpass123'))
+        run_pending_jobs()
+        self.assertTrue(UserProfile.objects.filter(user=user).exists())
+
+class AutocompleteAPITest(APITestCase):
+    """Test prefix autocomplete API"""
+    
+    def setUp(self):
+        autocomplete_index.reset()
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='pythonista', password='testpass123')
+        User.objects.create_user(username='pyro', password='testpass123')
+        self.python = Tag.objects.create(name='Python')
+        self.pytest = Tag.objects.create(name='pytest')
+        Tag.objects.create(name='Django')
+        Category.objects.create(name='Programming')
+        
+        for i in range(3):
+            post = Post.objects.create(title=f'Post {i}', content='Content', author=self.author, status='published')
+            post.tags.add(self.pytest)
+        self.url = reverse('autocomplete')
+    
+    def test_prefix_ranked_by_popularity(self):
+        """Test that prefix matches are case-insensitive and ranked by published posts"""
+        response = self.client.get(self.url, {'q': 'PY', 'types': 'tag,user'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([t['name'] for t in response.data['results']['tag']], ['pytest', 'Python'])
+        self.assertEqual(response.data['results']['tag'][0]['posts_count'], 3)
+        self.assertEqual([u['username'] for u in response.data['results']['user']], ['pythonista', 'pyro'])
+        self.assertNotIn('category', response.data['results'])
+    
+    def test_lookup_does_not_query_database(self):
+        """Test that keystrokes are served from memory once the index is built"""
+        self.client.get(self.url, {'q': 'p'})
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'q': 'pro'})
+        self.assertEqual(response.data['results']['category'][0]['name'], 'Programming')
+    
+    def test_signals_update_index(self):
+        """Test that saved, renamed and deleted terms are reflected immediately"""
+        self.client.get(self.url, {'q': 'p'})
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tag.objects.create(name='Pandas')
+        response = self.client.get(self.url, {'q': 'pan', 'types': 'tag'})
+        self.assertEqual(response.data['results']['tag'][0]['id'], tag.id)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.python.name = 'Rust'
+            self.python.save()
+            tag.delete()
+        names = [t['name'] for t in self.client.get(self.url, {'q': 'p', 'types': 'tag'}).data['results']['tag']]
+        self.assertEqual(names, ['pytest'])
+    
+    def test_changes_during_rebuild_survive(self):
+        """Test that terms saved while the index is read from the DB are kept after the swap"""
+        load = autocomplete_index._load
+        
+        def load_then_upsert():
+            indexes = load()
+            autocomplete_index.upsert('tag', 999, 'Pyramid', 'pyramid')
+            return indexes
+        
+        with mock.patch.object(autocomplete_index, '_load', load_then_upsert):
+            autocomplete_index.build_from_db()
+        results = autocomplete_index.search('pyr', types=['tag'])
+        self.assertEqual([t['name'] for t in results['tag']], ['Pyramid'])
+    
+    def test_built_on_startup(self):
+        """Test that a booting server process builds the index unless turned off"""
+        # Inline: a test transaction is not visible to other threads
+        with mock.patch('api.utils.run_in_background', lambda target, name: target()):
+            with self.settings(AUTOCOMPLETE={'BUILD_ON_STARTUP': False}):
+                build_on_startup()
+            self.assertIsNone(autocomplete_index.built_at)
+            build_on_startup()
+        self.assertEqual(len(autocomplete_index.indexes['tag']), 3)
+    
+    def test_invalid_types(self):
+        """Test that unknown types are rejected"""
+        response = self.client.get(self.url, {'q': 'py', 'types': 'posts'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+class TwoTierCacheTest(TestCase):
+    """Test the two-tier cache backend"""
+    
+    def make_cache(self, **options):
+        options.setdefault('SHARED', {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': f'two-tier-test-{self._testMethodName}',
+        })
+        cache = TwoTierCache('test', {'TIMEOUT': 60, 'OPTIONS': options})
+        cache.clear()
+        cache.reset_stats()
+        return cache
+    
+    def test_local_then_shared_tier(self):
+        """Test reads come from the local tier, then fall back to the shared tier"""
+        cache = self.make_cache()
+        cache.set('post:1', {'title': 'Hello'})
+        self.assertEqual(cache.get('post:1'), {'title': 'Hello'})
+        
+        cache.local.clear()  # as seen from another worker
+        self.assertEqual(cache.get_many(['post:1', 'post:2']), {'post:1': {'title': 'Hello'}})
+        self.assertEqual(cache.get('post:1'), {'title': 'Hello'})
+        self.assertIsNone(cache.get('post:2'))
+        
+        stats = cache.read_stats()
+        self.assertEqual(stats['local_hits'], 2)
+        self.assertEqual(stats['shared_hits'], 1)
+        self.assertEqual(stats['misses'], 2)
+        
+        cache.delete('post:1')
+        self.assertIsNone(cache.get('post:1'))
+    
+    def test_local_tier_is_size_bounded(self):
+        """Test the local LRU evicts by total size"""
+        cache = self.make_cache(LOCAL_MAX_BYTES=8 * 1024)
+        for i in range(20):
+            cache.set(f'blob:{i}', b'x' * 512)
+        self.assertLessEqual(cache.local.size, 8 * 1024)
+        self.assertLess(len(cache.local), 20)
+        # Evicted locally, still served by the shared tier
+        self.assertEqual(cache.get('blob:0'), b'x' * 512)
+        self.assertGreater(cache.read_stats()['evictions'], 0)
+    
+    def test_negative_caching(self):
+        """Test that negative entries are returned as NEGATIVE"""
+        cache = self.make_cache()
+        cache.set_negative('user:missing')
+        self.assertIs(cache.get('user:missing'), NEGATIVE)
+        cache.local.clear()
+        self.assertIs(cache.get('user:missing'), NEGATIVE)
+        self.assertEqual(cache.read_stats()['negative_hits'], 2)
+    
+    def test_ttl_jitter(self):
+        """Test that timeouts are shortened by at most the jitter fraction"""
+        cache = self.make_cache(TTL_JITTER=0.5)
+        ttls = {cache._ttl(100) for _ in range(50)}
+        self.assertTrue(all(50 <= ttl <= 100 for ttl in ttls))
+        self.assertGreater(len(ttls), 1)
+        self.assertIsNone(cache._ttl(None))
+    
+    def test_cache_stats_command(self):
+        """Test the cache_stats command reports hit rates"""
+        out = StringIO()
+        call_command('cache_stats', reset=True, stdout=out)
+        self.assertIn('hit rate', out.getvalue())
+
+class SingleFlightTest(APITestCase):
+    """Test single-flight cache fills and stale-while-revalidate"""
+    
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+    
+    def slow_compute(self, value='fresh', error=None):
+        def compute():
+            self.calls += 1
+            time.sleep(0.1)
+            if error:
+                raise error
+            return value
+        return compute
+    
+    def run_concurrently(self, fn, n=5):
+        results, errors = [], []
+        barrier = threading.Barrier(n)
+        
+        def worker():
+            barrier.wait()
+            try:
+                results.append(fn())
+            except Exception as e:
+                errors.append(e)
+        threads = [threading.Thread(target=worker) for _ in range(n)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+    
+    def test_concurrent_calls_coalesce(self):
+        """Test that concurrent misses on one key compute once and share the result"""
+        flight = SingleFlight()
+        results, errors = self.run_concurrently(lambda: flight.do('key', self.slow_compute()))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['fresh'] * 5)
+        self.assertEqual(errors, [])
+    
+    def test_errors_are_shared(self):
+        """Test that a failing fill is not retried by every waiter"""
+        flight = SingleFlight()
+        compute = self.slow_compute(error=ValueError('db down'))
+        results, errors = self.run_concurrently(lambda: flight.do('key', compute))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(errors), 5)
+    
+    def test_stale_while_revalidate(self):
+        """Test that stale values are served while another caller refreshes"""
+        cache.set('swr', ('old', time.time() - 1), 60)
+        cache.add('swr:filling', 1, 30)  # another worker is refreshing
+        self.assertEqual(cached_call('swr', self.slow_compute()), 'old')
+        self.assertEqual(self.calls, 0)
+        
+        cache.delete('swr:filling')
+        self.assertEqual(cached_call('swr', self.slow_compute()), 'fresh')
+        self.assertEqual(cached_call('swr', self.slow_compute('newer')), 'fresh')
+        self.assertEqual(self.calls, 1)
+    
+    def test_failed_refresh_serves_stale(self):
+        """Test that an error during refresh falls back to the stale value"""
+        cache.set('swr', ('old', time.time() - 1), 60)
+        with self.assertLogs('api.singleflight', level='ERROR'):
+            self.assertEqual(cached_call('swr', self.slow_compute(error=ValueError('db down'))), 'old')
+        self.assertIsNone(cache.get('swr:filling'))
+    
+    def test_background_refresh(self):
+        """Test that a background refresh returns the stale value at once and fills the cache"""
+        cache.set('swr', ('old', time.time() - 1), 60)
+        self.assertEqual(cached_call('swr', self.slow_compute(), background=True), 'old')
+        deadline = time.monotonic() + 2
+        while cache.get('swr')[0] != 'fresh' and time.monotonic() < deadline:
+            time.sleep(0.02)
+        self.assertEqual(cache.get('swr')[0], 'fresh')
+        self.assertIsNone(cache.get('swr:filling'))
+    
+    @override_settings(JOBS={'DEFER_SIDE_EFFECTS': True})
+    def test_anonymous_post_detail_cached(self):
+        """Test that anonymous detail hits skip serialization but still count views"""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        post = Post.objects.create(title='Viral', content='Content', author=user)
+        url = reverse('post-detail', kwargs={'pk': post.id})
+        
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.data['title'], 'Viral')
+        self.assertEqual(len(ctx.captured_queries), 1)  # the increment_views job INSERT
+        run_pending_jobs()
+        post.refresh_from_db()
+        self.assertEqual(post.views_count, 2)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(post=post, author=user, content='First!')
+        self.assertIsNone(cache.get(response_cache_key('post-detail', post.id)))
+        self.assertEqual(len(self.client.get(url).data['comments']), 1)
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(post=post, user=user)
+        self.assertEqual(self.client.get(url).data['likes_count'], 1)
+    
+    def test_stale_post_detail_counts_one_view(self):
+        """Test that a stale anonymous hit counts one view and the refresh counts none"""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        post = Post.objects.create(title='Viral', content='Content', author=user)
+        url = reverse('post-detail', kwargs={'pk': post.id})
+        key = response_cache_key('post-detail', post.id)
+        cache.set(key, ({'title': 'Old'}, time.time() - 1), 60)
+        
+        # Run the refresh inline: a test transaction is not visible to other threads
+        with mock.patch('api.singleflight.run_in_background', lambda target, name: target()):
+            response = self.client.get(url)
+        self.assertEqual(response.data['title'], 'Old')
+        self.assertEqual(cache.get(key)[0]['title'], 'Viral')
+        post.refresh_from_db()
+        self.assertEqual(post.views_count, 1)
+
+class JobQueueTest(TestCase):
+    """Test the database-backed job queue"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.user)
+        self.calls = []
+        job('test_record')(lambda payload: self.calls.append(payload['n']))
+        
+        def flaky(payload):
+            raise RuntimeError('try again')
+        job('test_flaky')(flaky)
+    
+    def tearDown(self):
+        HANDLERS.pop('test_record', None)
+        HANDLERS.pop('test_flaky', None)
+    
+    def test_priority_order(self):
+        """Test that higher priority jobs run first"""
+        enqueue('test_record', {'n': 1})
+        enqueue('test_record', {'n': 2}, priority=10)
+        enqueue('test_record', {'n': 3}, delay=60)
+        self.assertEqual(run_pending_jobs(), 2)
+        self.assertEqual(self.calls, [2, 1])
+        self.assertEqual(Job.objects.filter(status='done').count(), 2)
+        self.assertEqual(Job.objects.get(payload={'n': 3}).status, 'queued')
+    
+    def test_side_effects_inline_by_default(self):
+        """Test that without DEFER_SIDE_EFFECTS view counts apply at once and queue nothing"""
+        self.client.force_login(self.user)
+        self.client.get(reverse('post-detail', kwargs={'pk': self.post.id}))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 1)
+        self.assertFalse(Job.objects.filter(kind='increment_views').exists())
+    
+    def test_idempotency_key(self):
+        """Test that a repeated idempotency key does not queue twice"""
+        self.assertIsNotNone(enqueue('test_record', {'n': 1}, idempotency_key='once'))
+        self.assertIsNone(enqueue('test_record', {'n': 1}, idempotency_key='once'))
+        self.assertEqual(Job.objects.count(), 1)
+    
+    @override_settings(JOBS={'DEFER_SIDE_EFFECTS': True})
+    def test_batched_view_counts(self):
+        """Test that queued view counts collapse into one update per post"""
+        url = reverse('post-detail', kwargs={'pk': self.post.id})
+        self.client.force_login(self.user)
+        for _ in range(3):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(Job.objects.filter(kind='increment_views').count(), 3)
+        
+        with CaptureQueriesContext(connection) as ctx:
+            run_pending_jobs()
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "api_post"')]
+        self.assertEqual(len(updates), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 3)
+    
+    def test_retry_with_backoff(self):
+        """Test that failures are retried later and fail after max_attempts"""
+        queued = enqueue('test_flaky', max_attempts=2)
+        with self.assertLogs('api.jobs', level='WARNING'):
+            run_pending_jobs()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'queued')
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.run_after, timezone.now())
+        self.assertIn('try again', queued.last_error)
+        
+        Job.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+        with self.assertLogs('api.jobs', level='WARNING'):
+            run_pending_jobs()
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, 'failed')
+    
+    def test_stale_claims_are_requeued(self):
+        """Test that jobs held by a crashed worker go back to the queue"""
+        enqueue('test_record', {'n': 1})
+        self.assertEqual(len(claim_jobs('crashed', 10)), 1)
+        self.assertEqual(claim_jobs('other', 10), [])
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale(), 1)
+        [claimed] = claim_jobs('other', 10)
+        self.assertEqual(claimed.attempts, 1)
+    
+    def test_stale_claims_use_up_attempts(self):
+        """Test that a job whose claim keeps timing out is marked failed"""
+        queued = enqueue('test_record', {'n': 1}, max_attempts=2)
+        for expected in ('queued', 'failed'):
+            claim_jobs('crashed', 10)
+            Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+            requeue_stale()
+            queued.refresh_from_db()
+            self.assertEqual(queued.status, expected)
+        self.assertEqual(queued.attempts, 2)
+        self.assertIsNotNone(queued.finished_at)
+    
+    def test_run_workers_once(self):
+        """Test the run_workers command drains the queue"""
+        enqueue('test_record', {'n': 1})
+        out = StringIO()
+        call_command('run_workers', once=True, stdout=out)
+        self.assertIn('Ran 1 job(s)', out.getvalue())
+        self.assertEqual(self.calls, [1])
+
+class PostEventsTest(TestCase):
+    """Test Server-Sent Events for post activity"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.post = Post.objects.create(title='Live Post', content='Content', author=self.user)
+    
+    def test_signals_publish_deltas(self):
+        """Test that comments and likes publish delta events to subscribers"""
+        loop = asyncio.new_event_loop()
+        
+        async def subscribe():
+            return broadcaster.subscribe(self.post.id)
+        sub = loop.run_until_complete(subscribe())
+        try:
+            with self.captureOnCommitCallbacks(execute=True):
+                comment = Comment.objects.create(post=self.post, author=self.user, content='Hello')
+            with self.captureOnCommitCallbacks(execute=True):
+                Like.objects.create(post=self.post, user=self.user)
+            
+            created = loop.run_until_complete(sub.queue.get())
+            self.assertEqual(created['type'], 'comment.created')
+            self.assertEqual(created['data']['comment']['id'], comment.id)
+            self.assertEqual(created['data']['comments_count'], 1)
+            likes = loop.run_until_complete(sub.queue.get())
+            self.assertEqual(likes['type'], 'likes')
+            self.assertEqual(likes['data']['likes_count'], 1)
+        finally:
+            broadcaster.unsubscribe(sub)
+            loop.close()
+    
+    def test_slow_subscriber_gets_resync(self):
+        """Test that a full queue is replaced by a single resync event"""
+        loop = asyncio.new_event_loop()
+        
+        async def scenario():
+            sub = broadcaster.subscribe(self.post.id)
+            for i in range(100):
+                sub.offer({'type': 'likes', 'data': {'likes_count': i}})
+            events = []
+            while not sub.queue.empty():
+                events.append(sub.queue.get_nowait())
+            broadcaster.unsubscribe(sub)
+            return events
+        events = loop.run_until_complete(scenario())
+        loop.close()
+        self.assertLessEqual(len(events), 32)
+        self.assertEqual(events[-1]['type'], 'resync')
+    
+    async def test_event_stream(self):
+        """Test the SSE endpoint streams published events"""
+        response = await self.async_client.get(reverse('post-events', kwargs={'post_id': self.post.id}))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content.__aiter__()
+        self.assertTrue((await stream.__anext__()).startswith(b'retry:'))
+        
+        broadcaster.deliver(self.post.id, {'type': 'likes', 'post_id': self.post.id, 'data': {'likes_count': 5}})
+        chunk = await asyncio.wait_for(stream.__anext__(), 2)
+        self.assertIn(b'event: likes', chunk)
+        self.assertIn(b'"likes_count":5', chunk)
+        
+        # Client disconnect: the ASGI handler cancels the pending read
+        pending = asyncio.ensure_future(stream.__anext__())
+        await asyncio.sleep(0.05)
+        pending.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await pending
+        self.assertFalse(broadcaster.has_subscribers(self.post.id))
+    
+    async def test_event_stream_unknown_post(self):
+        """Test that streams for missing posts return 404"""
+        response = await self.async_client.get(reverse('post-events', kwargs={'post_id': 999999}))
+        self.assertEqual(response.status_code, 404)
+    
+    def test_event_stream_needs_asgi(self):
+        """Test that WSGI refuses streams and post detail does not advertise them"""
+        response = self.client.get(reverse('post-events', kwargs={'post_id': self.post.id}))
+        self.assertEqual(response.status_code, 501)
+        self.assertFalse(broadcaster.has_subscribers(self.post.id))
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.post.id}))
+        self.assertNotIn('Live-Events', response)
+    
+    async def test_post_detail_advertises_events_under_asgi(self):
+        """Test that ASGI post detail responses carry the Live-Events header"""
+        response = await self.async_client.get(reverse('post-detail', kwargs={'pk': self.post.id}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Live-Events'], '1')
+
+class CommentThreadTest(APITestCase):
+    """Test bounded comment threads in post detail and the replies endpoint"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.post = Post.objects.create(title='Busy Post', content='Content', author=self.user, status='published')
+        self.comments = [
+            Comment.objects.create(post=self.post, author=self.user, content=f'Comment {i}')
+            for i in range(15)
+        ]
+        self.thread = self.comments[-1]
+        self.replies = [
+            Comment.objects.create(post=self.post, author=self.user, content=f'Reply {i}', parent=self.thread)
+            for i in range(25)
+        ]
+    
+    def test_post_detail_embeds_first_page(self):
+        """Test that post detail embeds one page of top-level comments with reply previews"""
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.post.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        comments = response.data['comments']
+        self.assertEqual(len(comments), 10)
+        self.assertTrue(all(c['parent'] is None for c in comments))
+        self.assertIn('page=2', response.data['comments_next'])
+        
+        first = comments[0]
+        self.assertEqual(first['id'], self.thread.id)
+        self.assertEqual(first['reply_count'], 25)
+        self.assertEqual([r['id'] for r in first['replies']], [r.id for r in self.replies[::-1][:3]])
+        self.assertEqual(comments[1]['reply_count'], 0)
+    
+    def test_post_detail_query_count_is_bounded(self):
+        """Test that the number of queries does not grow with the number of comments"""
+        url = reverse('post-detail', kwargs={'pk': self.post.id})
+        self.client.get(url)
+        cache.clear()
+        with CaptureQueriesContext(connection) as before:
+            self.client.get(url)
+        for comment in self.comments[:5]:
+            Comment.objects.create(post=self.post, author=self.user, content='More', parent=comment)
+        cache.clear()
+        with CaptureQueriesContext(connection) as after:
+            self.client.get(url)
+        self.assertEqual(len(before), len(after))
+    
+    def test_replies_cursor_pagination(self):
+        """Test paging through a thread with the replies endpoint"""
+        url = reverse('comment-replies', kwargs={'pk': self.thread.id})
+        seen = []
+        while url:
+            response = self.client.get(url, {'page_size': 10} if not seen else None)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen.extend(r['id'] for r in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, [r.id for r in self.replies[::-1]])
+    
+    def test_replies_unknown_comment(self):
+        """Test that replies of a missing comment return 404"""
+        response = self.client.get(reverse('comment-replies', kwargs={'pk': 99999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    
+class NormalizedFormatTest(APITestCase):
+    """Test the side-loaded ?format=normalized response mode"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.category = Category.objects.create(name='Tech', slug='tech')
+        self.tag = Tag.objects.create(name='Python', slug='python')
+        for i in range(6):
+            post = Post.objects.create(
+                title=f'Post {i}', content='Content', author=self.user if i % 2 else self.other,
+                category=self.category, status='published'
+            )
+            post.tags.add(self.tag)
+    
+    def test_posts_reference_included_objects(self):
+        """Test that posts carry ids and each related object is included once"""
+        response = self.client.get(reverse('post-list-create'), {'format': 'normalized'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.content)
+        self.assertEqual(len(data['results']), 6)
+        for row in data['results']:
+            self.assertIn(row['author'], (self.user.id, self.other.id))
+            self.assertEqual(row['category'], self.category.id)
+            self.assertEqual(row['tags'], [self.tag.id])
+        included = data['included']
+        self.assertEqual(set(included['users']), {str(self.user.id), str(self.other.id)})
+        self.assertEqual(included['users'][str(self.user.id)]['username'], 'testuser')
+        self.assertEqual(list(included['categories']), [str(self.category.id)])
+        self.assertEqual(included['tags'][str(self.tag.id)]['name'], 'Python')
+    
+    def test_default_format_unchanged(self):
+        """Test that responses stay nested without the format parameter"""
+        response = self.client.get(reverse('post-list-create'))
+        data = json.loads(response.content)
+        self.assertNotIn('included', data)
+        self.assertEqual(data['results'][0]['category']['slug'], 'tech')
+    
+    def test_follows_normalized(self):
+        """Test that follow rows reference both users by id"""
+        Follow.objects.create(follower=self.user, following=self.other)
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(reverse('my-following'), {'format': 'normalized'})
+        data = json.loads(response.content)
+        self.assertEqual(data['results'][0]['follower'], self.user.id)
+        self.assertEqual(data['results'][0]['following'], self.other.id)
+        self.assertEqual(set(data['included']['users']), {str(self.user.id), str(self.other.id)})
+    
+    
+class DeltaSyncTest(APITestCase):
+    """Test the changes-since sync endpoints"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.author = User.objects.create_user(username='author', password='testpass123')
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', content='Content', author=self.author, status='published')
+            for i in range(3)
+        ]
+    
+    def sync(self, name, token=None):
+        response = self.client.get(reverse(name), {'since': token} if token else None)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+    
+    def age_rows(self):
+        # Move existing rows out of the overlap window
+        old = timezone.now() - timedelta(minutes=5)
+        Post.objects.update(updated_at=old)
+        Bookmark.objects.update(created_at=old)
+        Follow.objects.update(created_at=old)
+        Tombstone.objects.update(deleted_at=old)
+    
+    def test_first_sync_requires_full_load(self):
+        """Test that a missing or tampered token answers full_resync"""
+        data = self.sync('sync-posts')
+        self.assertTrue(data['full_resync'])
+        self.assertTrue(self.sync('sync-posts', data['sync_token'] + 'x')['full_resync'])
+        self.client.force_authenticate(user=self.user)
+        # Tokens are bound to their feed
+        self.assertTrue(self.sync('sync-bookmarks', data['sync_token'])['full_resync'])
+    
+    def test_posts_changes_since(self):
+        """Test that only updated, unpublished and deleted posts are returned"""
+        token = self.sync('sync-posts')['sync_token']
+        self.age_rows()
+        self.assertEqual(self.sync('sync-posts', token)['posts'], [])
+        
+        edited, unpublished, deleted = self.posts
+        edited.title = 'Edited'
+        edited.save()
+        unpublished.status = 'draft'
+        unpublished.save()
+        deleted_id = deleted.id
+        deleted.delete()
+        
+        data = self.sync('sync-posts', token)
+        self.assertFalse(data['full_resync'])
+        self.assertEqual([p['id'] for p in data['posts']], [edited.id])
+        self.assertEqual(data['posts'][0]['title'], 'Edited')
+        self.assertEqual(data['deleted'], sorted([unpublished.id, deleted_id]))
+    
+    def test_bookmarks_changes_since(self):
+        """Test that new bookmarks and unbookmarks show up as changes and tombstones"""
+        self.client.force_authenticate(user=self.user)
+        Bookmark.objects.create(user=self.user, post=self.posts[0])
+        Bookmark.objects.create(user=self.user, post=self.posts[1])
+        token = self.sync('sync-bookmarks')['sync_token']
+        self.age_rows()
+        
+        Bookmark.objects.filter(user=self.user, post=self.posts[0]).delete()
+        Bookmark.objects.create(user=self.user, post=self.posts[2])
+        data = self.sync('sync-bookmarks', token)
+        self.assertEqual([p['id'] for p in data['posts']], [self.posts[2].id])
+        self.assertEqual(data['deleted'], [self.posts[0].id])
+    
+    def test_timeline_follow_change_forces_resync(self):
+        """Test that following someone new makes the timeline reload"""
+        self.client.force_authenticate(user=self.user)
+        Follow.objects.create(follower=self.user, following=self.author)
+        token = self.sync('sync-timeline')['sync_token']
+        self.age_rows()
+        self.assertFalse(self.sync('sync-timeline', token)['full_resync'])
+        
+        other = User.objects.create_user(username='other', password='testpass123')
+        Follow.objects.create(follower=self.user, following=other)
+        self.assertTrue(self.sync('sync-timeline', token)['full_resync'])
+    
+    def test_timeline_ignores_strangers_deletes(self):
+        """Test that the timeline only lists deleted posts by followed authors"""
+        self.client.force_authenticate(user=self.user)
+        Follow.objects.create(follower=self.user, following=self.author)
+        stranger = User.objects.create_user(username='stranger', password='testpass123')
+        strangers_post = Post.objects.create(title='Elsewhere', content='Content', author=stranger, status='published')
+        token = self.sync('sync-timeline')['sync_token']
+        self.age_rows()
+        
+        followed_id = self.posts[0].id
+        self.posts[0].delete()
+        strangers_post.delete()
+        data = self.sync('sync-timeline', token)
+        self.assertFalse(data['full_resync'])
+        self.assertEqual(data['deleted'], [followed_id])
+    
+    
+class IdempotentRelationTest(APITestCase):
+    """Test idempotent PUT/DELETE for likes, bookmarks and follows"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.other)
+        self.client.force_authenticate(user=self.user)
+    
+    def test_like_put_and_delete_are_idempotent(self):
+        """Test that repeated PUT/DELETE leave one or zero rows without errors"""
+        url = reverse('like-toggle', kwargs={'post_id': self.post.id})
+        self.assertEqual(self.client.put(url).status_code, status.HTTP_201_CREATED)
+        response = self.client.put(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['liked'])
+        self.assertEqual(Like.objects.filter(post=self.post).count(), 1)
+        
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_200_OK)
+        response = self.client.delete(url)
+        self.assertFalse(response.data['liked'])
+        self.assertFalse(Like.objects.exists())
+    
+    def test_put_is_a_single_insert(self):
+        """Test that liking runs one INSERT and no get-or-create or archived-post SELECT"""
+        url = reverse('like-toggle', kwargs={'post_id': self.post.id})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(url)
+        writes = [q['sql'] for q in queries if 'api_like' in q['sql']]
+        self.assertEqual(len(writes), 1)
+        self.assertIn('ON CONFLICT DO NOTHING', writes[0])
+        self.assertFalse([q for q in queries if q['sql'].startswith('SELECT') and 'archived' in q['sql']])
+    
+    def test_toggle_inserts_first(self):
+        """Test that POST likes with one INSERT and unlikes only an existing row"""
+        url = reverse('like-toggle', kwargs={'post_id': self.post.id})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertFalse([q for q in queries if q['sql'].startswith('DELETE')])
+        
+        response = self.client.post(url)
+        self.assertFalse(response.data['liked'])
+        self.assertFalse(Like.objects.exists())
+        response = self.client.post(reverse('like-toggle', kwargs={'post_id': 99999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_missing_targets(self):
+        """Test that PUT on a missing post or user returns 404"""
+        response = self.client.put(reverse('bookmark-toggle', kwargs={'post_id': 99999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.put(reverse('follow-toggle', kwargs={'user_id': 99999}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Bookmark.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+    
+    def test_signals_still_fire(self):
+        """Test that raw writes keep tombstones and the toggle POST working"""
+        url = reverse('bookmark-toggle', kwargs={'post_id': self.post.id})
+        self.client.put(url)
+        self.client.delete(url)
+        self.assertTrue(Tombstone.objects.filter(kind='bookmark', object_id=self.post.id, user_id=self.user.id).exists())
+        
+        follow_url = reverse('follow-toggle', kwargs={'user_id': self.other.id})
+        self.assertTrue(self.client.post(follow_url).data['following'])
+        self.assertFalse(self.client.post(follow_url).data['following'])
+        self.assertEqual(
+            self.client.put(reverse('follow-toggle', kwargs={'user_id': self.user.id})).status_code,
+            status.HTTP_400_BAD_REQUEST
+        )
+    
+    
+class PostTagNamesTest(APITestCase):
+    """Test creating posts with tags given by name"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.existing = Tag.objects.create(name='Django', slug='django')
+    
+    def create(self, **data):
+        return self.client.post(reverse('post-list-create'), {'title': 'Tagged', 'content': 'Content', **data}, format='json')
+    
+    def test_resolves_and_creates_tags(self):
+        """Test that existing tags are reused and missing ones created"""
+        response = self.create(tag_names=['django', 'REST API', 'rest api', ' Python '])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        post = Post.objects.get(title='Tagged')
+        self.assertEqual(sorted(post.tags.values_list('slug', flat=True)), ['django', 'python', 'rest-api'])
+        self.assertEqual(Tag.objects.count(), 3)
+        self.assertEqual(Tag.objects.get(slug='rest-api').name, 'REST API')
+    
+    def test_query_count_does_not_grow_with_tags(self):
+        """Test that the create runs a fixed number of queries"""
+        with CaptureQueriesContext(connection) as few:
+            self.create(tag_names=['one', 'two'])
+        with CaptureQueriesContext(connection) as many:
+            self.create(tag_names=[f'tag {i}' for i in range(15)])
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(Post.objects.order_by('-id').first().tags.count(), 15)
+    
+    def test_unknown_tag_ids_rejected(self):
+        """Test that tag_ids are validated instead of failing in the database"""
+        response = self.create(tag_ids=[self.existing.id, 99999])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('tag_ids', response.data)
+        response = self.create(tag_names=['!!!'])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Post.objects.exists())
+    
+    def test_name_matches_tag_with_other_slug(self):
+        """Test that a tag is found by name when its slug was saved differently"""
+        legacy = Tag.objects.create(name='REST API', slug='restapi')
+        response = self.create(tag_names=['REST API'])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(list(Post.objects.get(title='Tagged').tags.all()), [legacy])
+        self.assertEqual(Tag.objects.count(), 2)
+    
+    def test_unicode_tag_names(self):
+        """Test that names with no ASCII letters get a unicode slug"""
+        response = self.create(tag_names=['বাংলা', 'Django'])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        tag = Post.objects.get(title='Tagged').tags.exclude(pk=self.existing.pk).get()
+        self.assertEqual((tag.name, tag.slug), ('বাংলা', slugify('বাংলা', allow_unicode=True)))
+        self.assertEqual(self.create(tag_names=['বাংলা']).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Tag.objects.count(), 2)
+    
+    def test_tag_limit_counts_ids_and_names(self):
+        """Test that MAX_POST_TAGS applies to tag_ids and tag_names together"""
+        response = self.create(tag_ids=[self.existing.id], tag_names=[f'tag {i}' for i in range(20)])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Post.objects.exists())
+    
+    
+class PostBulkAPITest(APITestCase):
+    """Test bulk post create/update"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.category = Category.objects.create(name='Tech', slug='tech')
+        self.tag = Tag.objects.create(name='Django', slug='django')
+        self.url = reverse('post-bulk')
+    
+    def test_bulk_create_with_per_item_errors(self):
+        """Test that valid items are created and invalid ones reported by index"""
+        payload = [
+            {'title': 'First', 'content': 'Body one', 'category_id': self.category.id, 'tag_ids': [self.tag.id]},
+            {'content': 'No title'},
+            {'title': 'Third', 'content': 'Body three', 'tag_names': ['New Tag']},
+            {'title': 'Fourth', 'content': 'Body four', 'tag_ids': [99999]},
+        ]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual((response.data['succeeded'], response.data['failed']), (2, 2))
+        results = response.data['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'error', 'created', 'error'])
+        self.assertIn('title', results[1]['errors'])
+        self.assertIn('tag_ids', results[3]['errors'])
+        
+        first = Post.objects.get(pk=results[0]['id'])
+        self.assertEqual(first.author, self.user)
+        self.assertEqual(first.excerpt, 'Body one')
+        self.assertEqual(list(first.tags.values_list('slug', flat=True)), ['django'])
+        third = Post.objects.get(pk=results[2]['id'])
+        self.assertEqual(list(third.tags.values_list('slug', flat=True)), ['new-tag'])
+    
+    def test_bulk_accepts_string_ids(self):
+        """Test that numeric strings are accepted as in the single-post endpoint"""
+        payload = [{'title': 'Strings', 'content': 'Body', 'category_id': str(self.category.id), 'tag_ids': [str(self.tag.id)]}]
+        response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        post = Post.objects.get(title='Strings')
+        self.assertEqual(post.category, self.category)
+        self.assertEqual(list(post.tags.all()), [self.tag])
+    
+    def test_bulk_create_query_count_is_fixed(self):
+        """Test that a larger batch does not issue more queries"""
+        def batch(n):
+            return [{'title': f'Post {i}', 'content': 'Body', 'tag_ids': [self.tag.id], 'tag_names': ['bulk']} for i in range(n)]
+        
+        Tag.objects.create(name='bulk', slug='bulk')
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(self.url, batch(2), format='json')
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.post(self.url, batch(50), format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(Post.objects.count(), 52)
+    
+    def test_bulk_update(self):
+        """Test that PATCH updates the caller's posts and rejects others"""
+        mine = Post.objects.create(title='Mine', content='Old', author=self.user)
+        theirs = Post.objects.create(title='Theirs', content='Old', author=self.other)
+        mine.tags.add(self.tag)
+        updated_at = mine.updated_at
+        response = self.client.patch(self.url, [
+            {'id': mine.id, 'content': 'New body', 'tag_names': ['Fresh']},
+            {'id': theirs.id, 'title': 'Hijacked'},
+            {'title': 'No id'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in response.data['results']], ['updated', 'error', 'error'])
+        
+        mine.refresh_from_db()
+        self.assertEqual(mine.title, 'Mine')
+        self.assertEqual(mine.excerpt, 'New body')
+        self.assertGreater(mine.updated_at, updated_at)
+        self.assertEqual(list(mine.tags.values_list('slug', flat=True)), ['fresh'])
+        theirs.refresh_from_db()
+        self.assertEqual(theirs.title, 'Theirs')
+    
+    def test_bulk_update_rejects_repeated_ids(self):
+        """Test that a post sent twice in one PATCH is reported as an item error"""
+        mine = Post.objects.create(title='Mine', content='Old', author=self.user)
+        response = self.client.patch(self.url, [
+            {'id': mine.id, 'tag_ids': [self.tag.id]},
+            {'id': mine.id, 'tag_ids': [self.tag.id], 'title': 'Again'},
+        ], format='json')
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual([r['status'] for r in response.data['results']], ['updated', 'error'])
+        mine.refresh_from_db()
+        self.assertEqual(mine.title, 'Mine')
+        self.assertEqual(list(mine.tags.all()), [self.tag])
+    
+    def test_batch_limits(self):
+        """Test that non-list and oversized payloads are rejected as a whole"""
+        self.assertEqual(self.client.post(self.url, {'title': 'x'}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        payload = [{'title': 'x', 'content': 'y'}] * 201
+        self.assertEqual(self.client.post(self.url, payload, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Post.objects.exists())
+    
+    
+class EngagementAnalyticsTest(APITestCase):
+    """Test daily engagement rollups and the author analytics endpoint"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='author', password='testpass123')
+        self.reader = User.objects.create_user(username='reader', password='testpass123')
+        self.post = Post.objects.create(title='Post', content='Content', author=self.author)
+        self.url = reverse('analytics-me')
+    
+    @override_settings(JOBS={'DEFER_SIDE_EFFECTS': True})
+    def test_events_compact_into_daily_rows(self):
+        """Test that likes, comments, bookmarks and views fold into one row per post and day"""
+        like = Like.objects.create(user=self.reader, post=self.post)
+        Comment.objects.create(post=self.post, author=self.reader, content='Nice')
+        Bookmark.objects.create(user=self.reader, post=self.post)
+        like.delete()
+        Like.objects.create(user=self.author, post=self.post)
+        self.client.force_authenticate(user=self.reader)
+        for _ in range(3):
+            self.client.get(reverse('post-detail', kwargs={'pk': self.post.id}))
+        run_pending_jobs(kinds=['increment_views'])
+        self.assertEqual(EngagementEvent.objects.filter(metric='views').get().delta, 3)
+        
+        self.assertEqual(compact_engagement(), 6)
+        self.assertFalse(EngagementEvent.objects.exists())
+        row = DailyPostStats.objects.get()
+        self.assertEqual((row.author_id, row.day), (self.author.id, timezone.localdate()))
+        self.assertEqual((row.views, row.likes, row.comments, row.bookmarks), (3, 1, 1, 1))
+        
+        # A second pass adds to the existing row
+        Comment.objects.create(post=self.post, author=self.author, content='Thanks')
+        self.assertEqual(compact_engagement(), 1)
+        self.assertEqual(DailyPostStats.objects.get().comments, 2)
+    
+    @override_settings(ANALYTICS={'COMPACT_DELAY': 3600})
+    def test_compaction_is_queued(self):
+        """Test that recording an event schedules the compaction job"""
+        analytics._scheduled_bucket = None
+        with self.captureOnCommitCallbacks(execute=True):
+            Like.objects.create(user=self.reader, post=self.post)
+            Bookmark.objects.create(user=self.reader, post=self.post)
+        queued = Job.objects.get(kind='compact_engagement')
+        self.assertGreater(queued.run_after, timezone.now())
+        
+        Job.objects.update(run_after=timezone.now())
+        run_pending_jobs(kinds=['compact_engagement'])
+        self.assertFalse(EngagementEvent.objects.exists())
+        self.assertEqual(DailyPostStats.objects.get().bookmarks, 1)
+    
+    def test_workers_compact_on_schedule(self):
+        """Test that a worker queues and runs compaction even when no job was queued"""
+        Like.objects.create(user=self.reader, post=self.post)
+        Job.objects.all().delete()
+        Worker(name='test').run(once=True)
+        self.assertFalse(EngagementEvent.objects.exists())
+        self.assertEqual(DailyPostStats.objects.get().likes, 1)
+        # Once per interval, however often the worker polls
+        Worker(name='test').run(once=True)
+        self.assertEqual(Job.objects.filter(kind='compact_engagement').count(), 1)
+    
+    def test_deleted_post_events_are_dropped(self):
+        """Test that a deleted post leaves no rollups behind"""
+        Like.objects.create(user=self.reader, post=self.post)
+        self.post.delete()
+        self.assertEqual(EngagementEvent.objects.count(), 1)
+        self.assertEqual(compact_engagement(), 1)
+        self.assertFalse(DailyPostStats.objects.exists())
+    
+    def test_analytics_series(self):
+        """Test the endpoint buckets rollups plus pending events by granularity"""
+        other = Post.objects.create(title='Other', content='Content', author=self.reader)
+        today = timezone.localdate()
+        DailyPostStats.objects.create(post=self.post, author=self.author, day=today - timedelta(days=2), views=5, likes=2)
+        DailyPostStats.objects.create(post=self.post, author=self.author, day=today - timedelta(days=60), views=100)
+        DailyPostStats.objects.create(post=other, author=self.reader, day=today, views=50)
+        Like.objects.create(user=self.reader, post=self.post)  # not compacted yet
+        
+        self.client.force_authenticate(user=self.author)
+        response = self.client.get(self.url, {'from': (today - timedelta(days=6)).isoformat(), 'to': today.isoformat()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['series']), 7)
+        self.assertEqual(response.data['totals'], {'views': 5, 'likes': 3, 'comments': 0, 'bookmarks': 0})
+        self.assertEqual(response.data['series'][4], {'period': today - timedelta(days=2), 'views': 5, 'likes': 2, 'comments': 0, 'bookmarks': 0})
+        self.assertEqual(response.data['series'][-1]['likes'], 1)
+        
+        response = self.client.get(self.url, {'from': (today - timedelta(days=90)).isoformat(), 'granularity': 'month'})
+        self.assertEqual(response.data['totals']['views'], 105)
+        self.assertTrue(all(row['period'].day == 1 for row in response.data['series']))
+    
+    def test_analytics_validation(self):
+        """Test bad parameters and anonymous access"""
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.force_authenticate(user=self.author)
+        for params in ({'granularity': 'hour'}, {'from': 'yesterday'}, {'from': '2026-02-01', 'to': '2026-01-01'},
+                       {'from': '2020-01-01', 'to': '2026-01-01'}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_analytics_cost_follows_range(self):
+        """Test that the rollup read is one range query on (author, day)"""
+        self.client.force_authenticate(user=self.author)
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {'granularity': 'week'})
+        rollup_reads = [q for q in ctx.captured_queries if 'api_dailypoststats' in q['sql']]
+        self.assertEqual(len(rollup_reads), 1)
+        self.assertIn('"day" >=', rollup_reads[0]['sql'])
+    
+    
+class PostArchiveTest(APITestCase):
+    """Test moving old posts to the archive tables"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(username='author', password='testpass123')
+        self.reader = User.objects.create_user(username='reader', password='testpass123')
+        self.old = Post.objects.create(title='Old', content='Old body text', author=self.author)
+        Post.objects.filter(pk=self.old.pk).update(created_at=timezone.now() - timedelta(days=800))
+        self.recent = Post.objects.create(title='Recent', content='Recent body', author=self.author)
+        top = Comment.objects.create(post=self.old, author=self.reader, content='First!')
+        Comment.objects.create(post=self.old, author=self.author, content='Thanks', parent=top)
+        Like.objects.create(post=self.old, user=self.reader)
+        Comment.objects.create(post=self.recent, author=self.reader, content='Fresh')
+        Bookmark.objects.create(user=self.reader, post=self.old)
+    
+    def archive(self, *args):
+        out = StringIO()
+        before = (timezone.localdate() - timedelta(days=365)).isoformat()
+        call_command('archive_before', before, *args, stdout=out)
+        return out.getvalue()
+    
+    def test_archive_moves_rows_and_leaves_stub(self):
+        """Test that content, comments and likes move and the post row stays as a stub"""
+        self.assertIn('Would archive 1 posts, 2 comments and 1 likes', self.archive('--dry-run'))
+        self.assertFalse(ArchivedPost.objects.exists())
+        events = EngagementEvent.objects.count()
+        
+        self.assertIn('Archived 1 posts, 2 comments and 1 likes', self.archive('--batch-size', '1'))
+        self.old.refresh_from_db()
+        self.assertEqual((self.old.status, self.old.content, self.old.excerpt), ('archived', '', 'Old body text'))
+        self.assertEqual(ArchivedPost.objects.get().content, 'Old body text')
+        self.assertEqual(ArchivedComment.objects.count(), 2)
+        self.assertEqual(ArchivedLike.objects.get().user_id, self.reader.id)
+        self.assertFalse(Comment.objects.filter(post=self.old).exists())
+        self.assertFalse(Like.objects.exists())
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertTrue(Bookmark.objects.filter(post=self.old).exists())
+        # Archiving is not an unlike / comment delete
+        self.assertEqual(EngagementEvent.objects.count(), events)
+        
+        self.assertIn('Archived 0 posts', self.archive())
+        response = self.client.get(reverse('post-list-create'))
+        self.assertEqual([p['id'] for p in response.data['results']], [self.recent.id])
+    
+    def test_detail_falls_back_to_archive(self):
+        """Test that the detail view serves archived content and thread"""
+        self.archive()
+        self.client.force_authenticate(user=self.reader)
+        response = self.client.get(reverse('post-detail', kwargs={'pk': self.old.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], 'archived')
+        self.assertEqual(response.data['content'], 'Old body text')
+        self.assertEqual((response.data['likes_count'], response.data['comments_count']), (1, 2))
+        self.assertTrue(response.data['is_liked'])
+        self.assertTrue(response.data['is_bookmarked'])
+        self.assertIsNone(response.data['comments_next'])
+        [top] = response.data['comments']
+        self.assertEqual((top['content'], top['author']['username'], top['reply_count']), ('First!', 'reader', 1))
+        self.assertEqual(top['replies'][0]['content'], 'Thanks')
+    
+    def test_archived_post_is_read_only(self):
+        """Test that stubs reject comments and edits but can be deleted"""
+        self.archive()
+        self.client.force_authenticate(user=self.author)
+        response = self.client.post(reverse('comment-list-create', kwargs={'post_id': self.old.id}), {'content': 'Late'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        like_url = reverse('like-toggle', kwargs={'post_id': self.old.id})
+        for method in (self.client.post, self.client.put, self.client.delete):
+            self.assertEqual(method(like_url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(Like.objects.exists())
+        url = reverse('post-detail', kwargs={'pk': self.old.id})
+        self.assertEqual(self.client.patch(url, {'title': 'Edited'}).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.patch(reverse('post-detail', kwargs={'pk': self.recent.id}), {'status': 'archived'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(ArchivedPost.objects.exists())
+        self.assertFalse(ArchivedComment.objects.exists())
+        self.assertFalse(ArchivedLike.objects.exists())
+    
+    def test_drafts_are_not_archived(self):
+        """Test that old drafts stay private instead of becoming public stubs"""
+        Post.objects.filter(pk=self.old.pk).update(status='draft')
+        self.assertIn('Archived 0 posts', self.archive())
+        self.old.refresh_from_db()
+        self.assertEqual((self.old.status, self.old.content), ('draft', 'Old body text'))
+    
+    def test_restore_moves_rows_back(self):
+        """Test that restore_archived brings back content, thread, likes and status"""
+        created = Comment.objects.get(content='Thanks').created_at
+        self.archive()
+        out = StringIO()
+        call_command('restore_archived', str(self.old.id), str(self.recent.id), stdout=out)
+        self.assertIn('Restored 1 posts, 2 comments and 1 likes', out.getvalue())
+        
+        self.old.refresh_from_db()
+        self.assertEqual((self.old.status, self.old.content), ('published', 'Old body text'))
+        reply = Comment.objects.get(content='Thanks')
+        self.assertEqual((reply.parent.content, reply.created_at), ('First!', created))
+        self.assertTrue(Like.objects.filter(post=self.old, user=self.reader).exists())
+        self.assertFalse(ArchivedPost.objects.exists())
+        self.assertFalse(ArchivedComment.objects.exists())
+        self.assertFalse(ArchivedLike.objects.exists())
+    
+    
+class ChunkedUploadTest(APITestCase):
+    """Test chunked, resumable image uploads"""
+    
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        temp_dir = os.path.join(self.media.name, '.uploads')
+        overrides = override_settings(MEDIA_ROOT=self.media.name, UPLOADS={'TEMP_DIR': temp_dir, 'CHUNK_SIZE': 1024})
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(user=self.user)
+        self.post = Post.objects.create(title='Post', content='Content', author=self.user)
+        from PIL import Image
+        buffer = BytesIO()
+        Image.effect_noise((64, 64), 50).convert('RGB').save(buffer, format='PNG')
+        self.image = buffer.getvalue()
+    
+    def start(self, data=None):
+        response = self.client.post(reverse('upload-create'), {'filename': 'photo.png', 'size': len(data or self.image)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data['id']
+    
+    def send(self, upload_id, offset, chunk):
+        return self.client.patch(
+            reverse('upload-detail', kwargs={'pk': upload_id}), chunk,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset),
+        )
+    
+    def test_chunked_upload_attaches_to_post(self):
+        """Test that chunks are appended in order and the file lands on the post"""
+        upload_id = self.start()
+        offset = 0
+        while offset < len(self.image):
+            response = self.send(upload_id, offset, self.image[offset:offset + 1024])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            offset = response.data['offset']
+            self.assertEqual(response['Upload-Offset'], str(offset))
+        self.assertTrue(response.data['complete'])
+        self.assertEqual(response.data['content_type'], 'image/png')
+        self.assertEqual(response.data['sha256'], hashlib.sha256(self.image).hexdigest())
+        
+        url = reverse('upload-complete', kwargs={'pk': upload_id})
+        response = self.client.post(url, {'target': 'post', 'post_id': self.post.id, 'sha256': 'bad'}, format='json')
+        self.assertEqual(response.status_code, 422)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'target': 'post', 'post_id': self.post.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.post.refresh_from_db()
+        self.assertTrue(self.post.image.name.endswith('.png'))
+        with self.post.image.open('rb') as f:
+            self.assertEqual(f.read(), self.image)
+        self.assertFalse(Upload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media.name, '.uploads')), [])
+    
+    def test_resume_after_dropped_connection(self):
+        """Test that bytes received before a drop are kept and the client resumes from them"""
+        upload_id = self.start()
+        upload = Upload.objects.get(pk=upload_id)
+        
+        class DroppingStream:
+            def __init__(self, data):
+                self.data = BytesIO(data)
+            
+            def read(self, size):
+                block = self.data.read(min(size, 300))
+                if not block:
+                    raise UnreadablePostError('connection reset')
+                return block
+        
+        self.assertEqual(write_chunk(upload, DroppingStream(self.image[:600]), 0, 1000), 600)
+        response = self.client.get(reverse('upload-detail', kwargs={'pk': upload_id}))
+        self.assertEqual(response.data['offset'], 600)
+        
+        response = self.send(upload_id, 0, self.image[:1024])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 600)
+        offset = 600
+        while offset < len(self.image):
+            offset = self.send(upload_id, offset, self.image[offset:offset + 1024]).data['offset']
+        # The hash spans the dropped request and the resumed ones
+        self.assertEqual(Upload.objects.get(pk=upload_id).sha256, hashlib.sha256(self.image).hexdigest())
+        response = self.client.post(reverse('upload-complete', kwargs={'pk': upload_id}), {'target': 'avatar'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['avatar'])
+    
+    def test_rejects_non_images_from_first_bytes(self):
+        """Test that the type is sniffed from the first chunk"""
+        data = b'<?php echo "hi"; ?>' * 10
+        upload_id = self.start(data)
+        response = self.send(upload_id, 0, data[:100])
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+        self.assertFalse(Upload.objects.exists())
+    
+    def test_limits(self):
+        """Test size, chunk and ownership limits"""
+        response = self.client.post(reverse('upload-create'), {'filename': 'big.png', 'size': 10 ** 9}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        upload_id = self.start()
+        self.assertEqual(self.send(upload_id, 0, self.image[:2048]).status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        response = self.client.post(reverse('upload-complete', kwargs={'pk': upload_id}), {'target': 'avatar'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        
+        other = User.objects.create_user(username='other', password='testpass123')
+        self.client.force_authenticate(user=other)
+        self.assertEqual(self.client.get(reverse('upload-detail', kwargs={'pk': upload_id})).status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_open_uploads_are_capped_and_expire(self):
+        """Test the per-user open upload cap and that expired uploads take no chunks"""
+        temp_dir = os.path.join(self.media.name, '.uploads')
+        with self.settings(UPLOADS={'TEMP_DIR': temp_dir, 'CHUNK_SIZE': 1024, 'MAX_OPEN': 2}):
+            first = self.start()
+            self.start()
+            response = self.client.post(reverse('upload-create'), {'filename': 'third.png', 'size': 100}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+            
+            Upload.objects.filter(pk=first).update(expires_at=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(self.send(first, 0, self.image[:1024]).status_code, status.HTTP_410_GONE)
+            # An expired upload no longer counts toward the cap
+            self.start()
+        with self.settings(UPLOADS={'TEMP_DIR': temp_dir, 'MAX_OPEN_BYTES': len(self.image) * 3}):
+            response = self.client.post(reverse('upload-create'), {'filename': 'big.png', 'size': len(self.image) + 1}, format='json')
+            self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+    
+    def test_concurrent_chunk_leaves_file_alone(self):
+        """Test that a PATCH for an offset another request is writing is refused before writing"""
+        upload_id = self.start()
+        self.assertEqual(self.send(upload_id, 0, self.image[:1024]).status_code, status.HTTP_200_OK)
+        Upload.objects.filter(pk=upload_id).update(writing_until=timezone.now() + timedelta(seconds=60))
+        response = self.send(upload_id, 1024, b'x' * 10)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        with open(temp_path(Upload.objects.get(pk=upload_id)), 'rb') as f:
+            self.assertEqual(f.read(), self.image[:1024])
+        
+        # An expired lease is taken over
+        Upload.objects.filter(pk=upload_id).update(writing_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.send(upload_id, 1024, self.image[1024:2048]).data['offset'], 2048)
+        self.assertIsNone(Upload.objects.get(pk=upload_id).writing_until)
+    
+    
+class ContentAddressedMediaTest(APITestCase):
+    """Test content-addressed storage, blob reference counts and media serving"""
+    
+    def setUp(self):
+        self.media = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media.cleanup)
+        overrides = override_settings(MEDIA_ROOT=self.media.name)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.data = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 4
+        self.sha256 = hashlib.sha256(self.data).hexdigest()
+    
+    def make_post(self, data=None, name='photo.png'):
+        return Post.objects.create(
+            title='Post', content='Content', author=self.user,
+            image=SimpleUploadedFile(name, data or self.data, content_type='image/png'),
+        )
+    
+    def test_identical_uploads_share_one_blob(self):
+        """Test that the same bytes are stored once under their hash and counted"""
+        first = self.make_post()
+        second = self.make_post(name='copy.PNG')
+        self.assertEqual(first.image.name, f'cas/{self.sha256[:2]}/{self.sha256[2:4]}/{self.sha256}.png')
+        self.assertEqual(first.image.name, second.image.name)
+        files = [f for _, _, names in os.walk(os.path.join(self.media.name, 'cas')) for f in names]
+        self.assertEqual(files, [f'{self.sha256}.png'])
+        self.assertEqual(MediaBlob.objects.get().refcount, 2)
+        
+        profile = UserProfile.objects.get_or_create(user=self.user)[0]
+        profile.avatar = first.image.name
+        profile.save()
+        self.assertEqual(MediaBlob.objects.get().refcount, 3)
+        first.delete()
+        second.image = SimpleUploadedFile('other.png', self.data + b'!')
+        second.save()
+        blob = MediaBlob.objects.get(sha256=self.sha256)
+        self.assertEqual(blob.refcount, 1)
+        self.assertEqual(MediaBlob.objects.exclude(pk=blob.pk).get().refcount, 1)
+    
+    def test_garbage_collection(self):
+        """Test that only blobs unreferenced past the grace period are deleted"""
+        post = self.make_post()
+        path = post.image.path
+        post.delete()
+        self.assertEqual(collect_garbage(), (0, 0))  # still inside the grace period
+        MediaBlob.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        
+        out = StringIO()
+        call_command('gc_media', '--dry-run', stdout=out)
+        self.assertIn(f'Would delete 1 blobs ({len(self.data)} bytes)', out.getvalue())
+        self.assertTrue(os.path.exists(path))
+        call_command('gc_media', stdout=StringIO())
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(MediaBlob.objects.exists())
+    
+    def test_recount_repairs_drift(self):
+        """Test that --recount restores counts changed behind the signals' back"""
+        post = self.make_post()
+        MediaBlob.objects.update(refcount=0, updated_at=timezone.now() - timedelta(days=1))
+        call_command('gc_media', '--recount', stdout=StringIO())
+        self.assertEqual(MediaBlob.objects.get().refcount, 1)
+        self.assertTrue(os.path.exists(post.image.path))
+    
+    def test_serving_headers_and_ranges(self):
+        """Test ETag, immutable caching, conditional and Range requests"""
+        url = '/media/' + self.make_post().image.name
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.data)
+        self.assertEqual(response['ETag'], f'"{self.sha256}"')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        response = self.client.get(url, HTTP_RANGE='bytes=8-15')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 8-15/{len(self.data)}')
+        self.assertEqual(b''.join(response.streaming_content), self.data[8:16])
+        response = self.client.get(url, HTTP_RANGE='bytes=-4')
+        self.assertEqual(b''.join(response.streaming_content), self.data[-4:])
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=99999-').status_code, 416)
+        # A stale If-Range gets the whole file
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"old"').status_code, 200)
+        self.assertEqual(self.client.get('/media/../settings.py').status_code, 404)
+        self.assertEqual(self.client.post(url).status_code, 405)
+    
+    def test_private_files_are_not_served(self):
+        """Test that upload parts and half-written blobs under MEDIA_ROOT answer 404"""
+        for name in ('.uploads/abc.part', 'cas/tmpx1y2.tmp', 'cas/.hidden.png'):
+            path = os.path.join(self.media.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(self.data)
+            self.assertEqual(self.client.get('/media/' + name).status_code, 404)
+    
+    def test_reused_blob_is_touched(self):
+        """Test that saving known bytes again refreshes the blob so gc keeps it"""
+        post = self.make_post()
+        post.delete()
+        MediaBlob.objects.update(updated_at=timezone.now() - timedelta(days=1))
+        register_blob(post.image.name, self.sha256, len(self.data))
+        self.assertEqual(collect_garbage(), (0, 0))
+        self.assertTrue(os.path.exists(post.image.path))
+    
+    def test_offload_headers(self):
+        """Test that offloading hands the path to the web server"""
+        name = self.make_post().image.name
+        with override_settings(MEDIA_FILES={'OFFLOAD': 'x-accel-redirect'}):
+            response = self.client.get('/media/' + name)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/' + name)
+        self.assertEqual(response.content, b'')
+        with override_settings(MEDIA_FILES={'OFFLOAD': 'x-sendfile'}):
+            response = self.client.get('/media/' + name)
+        self.assertEqual(response['X-Sendfile'], os.path.join(self.media.name, name))
+        self.assertIn('immutable', response['Cache-Control'])
+    
+    
+class BatchAPITest(APITestCase):
+    """Test the batch endpoint under WSGI"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user(username='batcher', password='testpass123')
+        self.post = Post.objects.create(title='Batched', content='Body', author=self.user, status='published')
+        response = self.client.post(reverse('login'), {'username': 'batcher', 'password': 'testpass123'}, format='json')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.url = reverse('batch')
+    
+    def batch(self, urls):
+        return self.client.post(self.url, {'requests': urls}, format='json')
+    
+    def test_batch_runs_get_requests(self):
+        """Test that sub-responses come back in order with status and body"""
+        response = self.batch([f'posts/{self.post.id}/', '/api/profile/', 'posts/999999/', 'posts/?search=Batched'])
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['responses']
+        self.assertEqual([r['status'] for r in results], [200, 200, 404, 200])
+        self.assertEqual(results[0]['body']['title'], 'Batched')
+        self.assertEqual(results[1]['body']['username'], 'batcher')
+        self.assertEqual(results[2]['url'], 'posts/999999/')
+    
+    def test_repeated_urls_run_once(self):
+        """Test that a URL listed several times counts one view but answers every slot"""
+        url = f'posts/{self.post.id}/'
+        results = self.batch([url] * 19 + ['profile/']).json()['responses']
+        self.assertEqual(len(results), 20)
+        self.assertEqual([r['url'] for r in results], [url] * 19 + ['profile/'])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 1)
+    
+    def test_batch_authenticates_once(self):
+        """Test that the token is validated once for the whole batch"""
+        with mock.patch.object(
+            CachedJWTAuthentication, 'get_validated_token', autospec=True,
+            side_effect=CachedJWTAuthentication.get_validated_token,
+        ) as validate:
+            response = self.batch(['profile/', 'posts/my/', 'bookmarks/'])
+        self.assertEqual([r['status'] for r in response.json()['responses']], [200, 200, 200])
+        self.assertEqual(validate.call_count, 1)
+    
+    def test_batch_anonymous(self):
+        """Test that protected sub-requests fail for anonymous callers"""
+        self.client.credentials()
+        results = self.batch(['posts/', 'profile/']).json()['responses']
+        self.assertEqual([r['status'] for r in results], [200, 401])
+        
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(self.batch(['posts/']).status_code, 401)
+    
+    def test_batch_rejects_excluded_urls(self):
+        """Test that streams, exports, the batch itself and non-API paths are refused"""
+        urls = [f'posts/{self.post.id}/events/', 'export/me/', 'batch/', '/admin/', '/media/x.png']
+        results = self.batch(urls).json()['responses']
+        self.assertEqual([r['status'] for r in results], [400, 400, 400, 400, 400])
+    
+    def test_batch_limits(self):
+        """Test body validation and the per-batch request limit"""
+        self.assertEqual(self.client.post(self.url, {'requests': []}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'requests': [1]}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, 'nope', content_type='application/json').status_code, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        with override_settings(BATCH={'MAX_REQUESTS': 2}):
+            self.assertEqual(self.batch(['posts/'] * 3).status_code, 413)
+            self.assertEqual(self.batch(['posts/'] * 2).status_code, 200)
+
+
+class BatchConcurrencyTest(TransactionTestCase):
+    """Test concurrent batch sub-requests under ASGI"""
+    
+    async def test_batch_runs_concurrently_under_asgi(self):
+        """Test that ASGI batches run sub-requests side by side on worker threads"""
+        await sync_to_async(Post.objects.create)(
+            title='Async', content='Body', status='published',
+            author=await sync_to_async(User.objects.create_user)(username='asyncbatch', password='x'),
+        )
+        threads = set()
+        original = batch_module.run_subrequest
+        
+        def tracking(*args):
+            threads.add(threading.get_ident())
+            time.sleep(0.05)
+            return original(*args)
+        
+        with mock.patch.object(batch_module, 'run_subrequest', tracking):
+            response = await self.async_client.post(
+                reverse('batch'), {'requests': ['posts/', 'categories/', 'tags/', 'posts/']}, content_type='application/json'
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([r['status'] for r in response.json()['responses']], [200, 200, 200, 200])
+        self.assertGreater(len(threads), 1)
+    
+    @override_settings(BATCH={'CONCURRENCY': 1, 'TIMEOUT': 0.05})
+    async def test_timed_out_thread_keeps_its_slot(self):
+        """Test that a sub-request past its timeout still holds the semaphore until it returns"""
+        running, overlaps = [], []
+        original = batch_module.run_subrequest
+        
+        def slow(*args):
+            running.append(1)
+            overlaps.append(len(running))
+            time.sleep(0.2)
+            running.pop()
+            return original(*args)
+        
+        with mock.patch.object(batch_module, 'run_subrequest', slow):
+            response = await self.async_client.post(
+                reverse('batch'), {'requests': ['categories/', 'tags/']}, content_type='application/json'
+            )
+            await asyncio.sleep(0.3)
+        self.assertEqual([r['status'] for r in response.json()['responses']], [504, 504])
+        self.assertEqual(max(overlaps), 1)
+
+
+class AdminPerformanceModeTest(TestCase):
+    """Test admin changelists in performance mode"""
+    
+    def setUp(self):
+        self.admin = User.objects.create_superuser(username='admin', password='adminpass123')
+        self.client.force_login(self.admin)
+        self.posts = [
+            Post.objects.create(title=f'Post {i}', content='Content', author=self.admin, status='draft')
+            for i in range(5)
+        ]
+        for post in self.posts:
+            Comment.objects.create(post=post, author=self.admin, content='Comment')
+            Like.objects.create(post=post, user=self.admin)
+    
+    def test_changelists_render(self):
+        """Test that every changelist renders with estimated counts"""
+        for model in ['post', 'comment', 'like', 'bookmark', 'follow', 'userprofile']:
+            response = self.client.get(reverse(f'admin:api_{model}_changelist'))
+            self.assertEqual(response.status_code, 200, model)
+    
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=2)
+    def test_keyset_pagination(self):
+        """Test next-page links use a pk cursor instead of OFFSET"""
+        url = reverse('admin:api_comment_changelist')
+        with self.settings(ADMIN_PERFORMANCE_MODE=True):
+            from .admin import CommentAdmin
+            CommentAdmin.list_per_page = 2
+            try:
+                response = self.client.get(url)
+                cl = response.context['cl']
+                self.assertEqual(len(cl.result_list), 2)
+                self.assertIsNotNone(cl.next_cursor)
+                
+                response = self.client.get(url, {'after': cl.next_cursor})
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.context['cl'].result_list), 2)
+                self.assertLess(response.context['cl'].result_list[0].pk, cl.next_cursor)
+            finally:
+                CommentAdmin.list_per_page = 100
+    
+    def test_comment_changelist_query_count(self):
+        """Test that the comment changelist does not run per-row queries"""
+        url = reverse('admin:api_comment_changelist')
+        self.client.get(url)
+        Comment.objects.create(post=self.posts[0], author=self.admin, content='One more')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        before = len(ctx.captured_queries)
+        for post in self.posts:
+            Comment.objects.create(post=post, author=self.admin, content='Another')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(url)
+        self.assertEqual(len(ctx.captured_queries), before)
+    
+    def test_bulk_publish_action(self):
+        """Test the publish action runs as a single UPDATE"""
+        url = reverse('admin:api_post_changelist')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.post(url, {
+                'action': 'make_published',
+                '_selected_action': [post.pk for post in self.posts],
+            })
+        updates = [q for q in ctx.captured_queries if q['sql'].startswith('UPDATE "api_post"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Post.objects.filter(status='published').count(), 5)
+    
+    def test_bulk_actions_skip_archived_and_need_permission(self):
+        """Test that stubs stay archived and view-only staff cannot run bulk actions"""
+        Post.objects.filter(pk=self.posts[0].pk).update(status='archived')
+        url = reverse('admin:api_post_changelist')
+        self.client.post(url, {'action': 'make_published', '_selected_action': [post.pk for post in self.posts]})
+        self.assertEqual(Post.objects.get(pk=self.posts[0].pk).status, 'archived')
+        
+        from django.contrib.auth.models import Permission
+        viewer = User.objects.create_user(username='viewer', password='viewpass123', is_staff=True)
+        viewer.user_permissions.add(Permission.objects.get(codename='view_post'))
+        self.client.force_login(viewer)
+        response = self.client.get(url)
+        self.assertIsNone(response.context['action_form'])
+        self.client.post(url, {'action': 'make_draft', '_selected_action': [post.pk for post in self.posts]})
+        self.client.post(url, {'action': 'delete_selected', '_selected_action': [post.pk for post in self.posts],
+                               'post': 'yes'})
+        self.assertEqual(Post.objects.filter(status='published').count(), 4)
+
+class ExportAPITest(APITestCase):
+    """Test streaming export endpoints"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.other = User.objects.create_user(username='other', password='testpass123')
+        self.tag = Tag.objects.create(name='Django')
+        self.post = Post.objects.create(title='Mine', content='Content', author=self.user)
+        self.post.tags.add(self.tag)
+        Post.objects.create(title='Theirs', content='Content', author=self.other)
+        Like.objects.create(user=self.user, post=self.post)
+        self.client.force_authenticate(user=self.user)
+    
+    def read_lines(self, response):
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+    
+    def test_export_my_data_ndjson(self):
+        """Test that only the user's own rows are exported"""
+        response = self.client.get(reverse('export-me'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn(f'{self.user.username}-export', response['Content-Disposition'])
+        rows = self.read_lines(response)
+        posts = [row for row in rows if row['type'] == 'post']
+        self.assertEqual([p['title'] for p in posts], ['Mine'])
+        self.assertEqual(posts[0]['tags'], ['Django'])
+        self.assertEqual(len([row for row in rows if row['type'] == 'like']), 1)
+    
+    def test_export_csv_gzip(self):
+        """Test gzip-compressed CSV export"""
+        response = self.client.get(reverse('export-me'), {'fmt': 'csv', 'dataset': 'posts', 'gzip': '1'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        body = gzip.decompress(b''.join(response.streaming_content)).decode()
+        rows = list(csv.DictReader(body.splitlines()))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['title'], 'Mine')
+    
+    def test_csv_requires_single_dataset(self):
+        """Test CSV export with several datasets is rejected"""
+        response = self.client.get(reverse('export-me'), {'fmt': 'csv'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_site_export_admin_only(self):
+        """Test that the site dump needs an admin user"""
+        response = self.client.get(reverse('export-site'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+# ==================== Management Command Tests ====================
+
+class ImportBlogCommandTest(TestCase):
+    """Test the import_blog bulk import command"""
+    
+    def setUp(self):
+        rows = [
+            {'type': 'post', 'id': 'p1', 'title': 'First', 'content': 'Hello', 'author': 'alice',
+             'category': 'Tech', 'tags': ['django', 'python'], 'created_at': '2020-01-01T10:00:00Z'},
+            {'type': 'post', 'id': 'p2', 'title': 'Second', 'content': 'World', 'author': 'bob',
+             'tags': ['django']},
+            {'type': 'comment', 'id': 'c1', 'post': 'p1', 'author': 'bob', 'content': 'Nice'},
+            {'type': 'comment', 'id': 'c2', 'post': 'p1', 'author': 'alice', 'content': 'Thanks', 'parent': 'c1'},
+            {'type': 'like', 'post': 'p1', 'user': 'bob'},
+            {'type': 'like', 'post': 'p1', 'user': 'bob'},
+            {'type': 'bookmark', 'post': 'p2', 'user': 'alice'},
+            {'type': 'follow', 'follower': 'bob', 'following': 'alice'},
+        ]
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'export.jsonl')
+        with open(self.path, 'w') as f:
+            for row in rows:
+                f.write(json.dumps(row) + '\n')
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_import(self):
+        """Test that all row types are imported in batches"""
+        call_command('import_blog', self.path, batch_size=3, stdout=StringIO())
+        
+        self.assertEqual(Post.objects.count(), 2)
+        first = Post.objects.get(title='First')
+        self.assertEqual(first.author.username, 'alice')
+        self.assertEqual(first.category.name, 'Tech')
+        self.assertEqual(first.tags.count(), 2)
+        self.assertEqual(first.created_at.year, 2020)
+        self.assertEqual(first.excerpt, 'Hello')
+        self.assertEqual(Comment.objects.get(content='Thanks').parent.content, 'Nice')
+        self.assertEqual(Like.objects.count(), 1)
+        self.assertEqual(Bookmark.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+    
+    def test_resume_from_checkpoint(self):
+        """Test that re-running after completion does not duplicate rows"""
+        call_command('import_blog', self.path, batch_size=3, stdout=StringIO())
+        call_command('import_blog', self.path, batch_size=3, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Comment.objects.count(), 2)
+        
+        # Reading the file again from the start skips what was already imported
+        call_command('import_blog', self.path, batch_size=3, restart=True, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(Comment.objects.count(), 2)
+        self.assertEqual(ImportedObject.objects.count(), 4)
+    
+    def test_failed_batch_keeps_checkpoint(self):
+        """Test that a crash inside a batch rolls back its rows and its checkpoint together"""
+        with mock.patch(
+            'api.management.commands.import_blog.Command.write_engagement', side_effect=RuntimeError('crash')
+        ):
+            with self.assertRaises(RuntimeError):
+                call_command('import_blog', self.path, batch_size=3, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 0)
+        self.assertFalse(ImportCheckpoint.objects.exists())
+        
+        call_command('import_blog', self.path, batch_size=3, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 2)
+    
+    def test_colliding_tag_slugs(self):
+        """Test that tag names sharing a slug resolve to one tag instead of being dropped"""
+        Tag.objects.create(name='REST API', slug='rest-api')
+        with open(self.path, 'a') as f:
+            f.write(json.dumps({'type': 'post', 'id': 'p3', 'title': 'Third', 'author': 'alice',
+                                'tags': ['rest api', 'Rest-API!', 'Django']}) + '\n')
+        call_command('import_blog', self.path, stdout=StringIO())
+        third = Post.objects.get(title='Third')
+        self.assertEqual(sorted(third.tags.values_list('slug', flat=True)), ['django', 'rest-api'])
+        self.assertEqual(Tag.objects.filter(slug='rest-api').count(), 1)
+    
+    def test_bad_rows_are_skipped(self):
+        """Test that unknown statuses and out-of-range dates are counted as skipped lines"""
+        with open(self.path, 'a') as f:
+            for row in (
+                {'type': 'post', 'id': 'p3', 'title': 'Stub', 'author': 'alice', 'status': 'archived'},
+                {'type': 'post', 'id': 'p4', 'title': 'Odd', 'author': 'alice', 'status': 'pending'},
+                {'type': 'post', 'id': 'p5', 'title': 'Late', 'author': 'alice', 'created_at': '2023-13-45T10:00:00Z'},
+                {'type': 'post', 'id': 'p6', 'title': 'Draft', 'author': 'alice', 'status': 'draft'},
+            ):
+                f.write(json.dumps(row) + '\n')
+        out = StringIO()
+        call_command('import_blog', self.path, stdout=out)
+        self.assertIn('skipped 3 line(s)', out.getvalue())
+        self.assertEqual(sorted(Post.objects.values_list('title', flat=True)), ['Draft', 'First', 'Second'])
+
+
+class BackfillExcerptsCommandTest(TestCase):
+    """Test the backfill_excerpts command"""
+    
+    def test_backfill(self):
+        """Test that posts without an excerpt are filled in"""
+        user = User.objects.create_user(username='testuser', password='testpass123')
+        post = Post.objects.create(title='Old Post', content='Old content', author=user)
+        Post.objects.filter(pk=post.pk).update(excerpt='', reading_time=0)
+        updated_at = Post.objects.get(pk=post.pk).updated_at
+        
+        call_command('backfill_excerpts', batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.excerpt, 'Old content')
+        self.assertEqual(post.reading_time, 1)
+        self.assertEqual(post.updated_at, updated_at)
+
+
+class LoadTestCommandTest(TransactionTestCase):
+    """Test the loadtest command"""
+    
+    def test_wsgi_run_writes_results(self):
+        """Test that a short WSGI run seeds data and writes comparable JSON results"""
+        cache.clear()
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'results.json')
+            call_command(
+                'loadtest', requests=40, concurrency=2, users=3, posts=5, seed=1,
+                host='testserver', output=output, stdout=StringIO()
+            )
+            with open(output) as f:
+                results = json.load(f)
+            out = StringIO()
+            call_command(
+                'loadtest', requests=10, concurrency=2, users=3, posts=5,
+                host='testserver', baseline=output, stdout=out
+            )
+        self.assertEqual(results['interface'], 'wsgi')
+        self.assertEqual(results['requests'], 40)
+        self.assertEqual(results['errors'], 0)
+        self.assertEqual(results['lock_errors'], 0)
+        self.assertIn('p95', results['scenarios']['feed']['latency_ms'])
+        self.assertEqual(User.objects.filter(username__startswith='loadtest_').count(), 3)
+        self.assertIn('Compared with baseline', out.getvalue())
@@ -0,0 +1,273 @@
+# backend/api/uploads.py
+# Chunked, resumable upload - বড় ছবি ছোট ছোট অংশে, memory তে না রেখে
+#
+# POST /api/uploads/ opens an Upload of a declared size; each PATCH streams
+# its raw body (at most CHUNK_SIZE bytes) straight into a temp file at the
+# Upload-Offset the client sends, 64KB at a time, feeding a SHA-256 as it
+# goes. The image type is sniffed from the first bytes, so a non-image is
+# rejected before the rest is sent. A dropped connection keeps every byte
+# that arrived: GET returns the offset to resume from. A PATCH claims the
+# upload (a short writing_until lease) before touching the temp file, so two
+# requests for the same offset never write at once. complete/ checks the
+# size and hash and copies the file into Post.image or UserProfile.avatar.
+# Chunks are short requests, so a slow mobile client never holds a worker
+# for the whole file. Each user may hold MAX_OPEN unexpired uploads (and
+# MAX_OPEN_BYTES declared); expired ones take no more chunks and are purged
+# by the purge_uploads job.
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db.models import Count, Q, Sum
+from django.http import UnreadablePostError
+from django.utils import timezone
+
+from .models import Upload
+
+UPLOAD_DEFAULTS = {
+    'TEMP_DIR': os.path.join(settings.MEDIA_ROOT, '.uploads'),
+    'MAX_SIZE': 20 * 1024 * 1024,   # bytes per file
+    'CHUNK_SIZE': 2 * 1024 * 1024,  # largest PATCH body
+    'EXPIRY': 24 * 3600,            # seconds an unfinished upload is kept
+    'MAX_OPEN': 5,                  # unfinished uploads per user
+    'MAX_OPEN_BYTES': 50 * 1024 * 1024,  # declared size of a user's unfinished uploads
+    'PURGE_INTERVAL': 3600,         # seconds between purge_uploads jobs on the workers
+    'WRITE_LEASE': 300,             # seconds a PATCH may hold the upload while writing
+    'HASHERS': 256,                 # in-progress SHA-256 states kept per process
+}
+
+READ_SIZE = 64 * 1024
+SNIFF_BYTES = 12
+
+# Magic numbers of the formats in ALLOWED_IMAGE_TYPES (WebP is RIFF....WEBP)
+SIGNATURES = (
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+)
+EXTENSIONS = {'image/jpeg': '.jpg', 'image/png': '.png', 'image/gif': '.gif', 'image/webp': '.webp'}
+
+
+def upload_setting(name):
+    return getattr(settings, 'UPLOADS', {}).get(name, UPLOAD_DEFAULTS[name])
+
+
+def allowed_types():
+    return getattr(settings, 'ALLOWED_IMAGE_TYPES', ['image/jpeg', 'image/png', 'image/gif', 'image/webp'])
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+
+def sniff_image_type(head):
+    """Return the content type the first bytes of an image declare, or None."""
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    if len(head) >= 12 and head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def temp_path(upload):
+    return os.path.join(upload_setting('TEMP_DIR'), f'{upload.pk.hex}.part')
+
+
+def new_upload(user, filename, size):
+    if size <= 0:
+        raise UploadError('size must be a positive number of bytes')
+    if size > upload_setting('MAX_SIZE'):
+        raise UploadError(f'File is larger than {upload_setting("MAX_SIZE")} bytes', status=413)
+    # Each open upload holds a temp file until it finishes or expires
+    open_uploads = Upload.objects.filter(user=user, expires_at__gt=timezone.now()).aggregate(
+        count=Count('pk'), size=Sum('size')
+    )
+    if open_uploads['count'] >= upload_setting('MAX_OPEN'):
+        raise UploadError(f'At most {upload_setting("MAX_OPEN")} uploads can be open at once', status=429)
+    if (open_uploads['size'] or 0) + size > upload_setting('MAX_OPEN_BYTES'):
+        raise UploadError(f'Open uploads are limited to {upload_setting("MAX_OPEN_BYTES")} bytes in total', status=429)
+    upload = Upload.objects.create(
+        user=user,
+        filename=os.path.basename(filename)[:255] or 'upload',
+        size=size,
+        expires_at=timezone.now() + timedelta(seconds=upload_setting('EXPIRY')),
+    )
+    os.makedirs(upload_setting('TEMP_DIR'), exist_ok=True)
+    open(temp_path(upload), 'wb').close()
+    return upload
+
+
+# ==================== Incremental Hashing ====================
+# The running SHA-256 of the bytes received so far, kept in this process; a
+# chunk that lands on another worker rebuilds it from the temp file once.
+
+_hashers = OrderedDict()
+_hashers_lock = threading.Lock()
+
+
+def _take_hasher(upload):
+    with _hashers_lock:
+        entry = _hashers.pop(upload.pk, None)
+    if entry is not None and entry[0] == upload.offset:
+        return entry[1]
+    hasher = hashlib.sha256()
+    remaining = upload.offset
+    with open(temp_path(upload), 'rb') as f:
+        while remaining:
+            block = f.read(min(READ_SIZE, remaining))
+            if not block:
+                break
+            hasher.update(block)
+            remaining -= len(block)
+    return hasher
+
+
+def _keep_hasher(upload, offset, hasher):
+    with _hashers_lock:
+        _hashers[upload.pk] = (offset, hasher)
+        while len(_hashers) > upload_setting('HASHERS'):
+            _hashers.popitem(last=False)
+
+
+def forget_hasher(upload_id):
+    with _hashers_lock:
+        _hashers.pop(upload_id, None)
+
+
+# ==================== Writing ====================
+
+def check_not_expired(upload):
+    # purge_uploads may delete the temp file at any moment after this
+    if upload.expires_at <= timezone.now():
+        raise UploadError('Upload has expired, start a new one', status=410)
+
+
+def write_chunk(upload, stream, offset, length):
+    """Append up to ``length`` bytes from ``stream`` at ``offset``; returns the new offset."""
+    check_not_expired(upload)
+    if upload.is_complete:
+        raise UploadError('Upload is already complete', status=409, offset=upload.offset)
+    if offset != upload.offset:
+        raise UploadError('Upload-Offset does not match the received size', status=409, offset=upload.offset)
+    if length > upload_setting('CHUNK_SIZE'):
+        raise UploadError(f'Chunks are limited to {upload_setting("CHUNK_SIZE")} bytes', status=413)
+    if offset + length > upload.size:
+        raise UploadError('Chunk runs past the declared size', status=413, offset=upload.offset)
+
+    # Only the request holding the lease touches the temp file
+    _claim(upload, offset)
+    try:
+        hasher = _take_hasher(upload)
+        written = 0
+        head = b''
+        with open(temp_path(upload), 'r+b') as f:
+            f.seek(offset)
+            try:
+                while written < length:
+                    block = stream.read(min(READ_SIZE, length - written))
+                    if not block:
+                        break  # client went away; keep what arrived
+                    if offset == 0 and len(head) < SNIFF_BYTES:
+                        head += block[:SNIFF_BYTES - len(head)]
+                        if len(head) >= min(SNIFF_BYTES, upload.size) and not _accept_type(upload, head):
+                            raise UploadError(
+                                f'Only {", ".join(allowed_types())} uploads are accepted', status=415
+                            )
+                    f.write(block)
+                    hasher.update(block)
+                    written += len(block)
+            except UnreadablePostError:
+                pass  # dropped connection mid-read
+            finally:
+                f.truncate(offset + written)
+
+        if offset == 0 and not upload.content_type and written:
+            # First chunk was too short to identify
+            raise UploadError('The first chunk must carry at least 12 bytes', status=400, offset=0)
+    except BaseException:
+        Upload.objects.filter(pk=upload.pk).update(writing_until=None)
+        raise
+
+    new_offset = offset + written
+    sha256 = hasher.hexdigest() if new_offset == upload.size else ''
+    # Still conditional: the lease may have run out and been taken over
+    updated = Upload.objects.filter(pk=upload.pk, offset=offset).update(
+        offset=new_offset, content_type=upload.content_type, sha256=sha256, writing_until=None
+    )
+    if not updated:
+        upload.refresh_from_db()
+        raise UploadError('Upload was advanced by another request', status=409, offset=upload.offset)
+    upload.offset, upload.sha256 = new_offset, sha256
+    if sha256:
+        forget_hasher(upload.pk)
+    else:
+        _keep_hasher(upload, new_offset, hasher)
+    return new_offset
+
+
+def _claim(upload, offset):
+    # Conditional update: a concurrent PATCH for the same offset loses before writing
+    now = timezone.now()
+    claimed = Upload.objects.filter(pk=upload.pk, offset=offset).filter(
+        Q(writing_until__isnull=True) | Q(writing_until__lte=now)
+    ).update(writing_until=now + timedelta(seconds=upload_setting('WRITE_LEASE')))
+    if not claimed:
+        upload.refresh_from_db()
+        raise UploadError('Another request is writing to this upload', status=409, offset=upload.offset)
+
+
+def _accept_type(upload, head):
+    content_type = sniff_image_type(head)
+    if content_type not in allowed_types():
+        return False
+    upload.content_type = content_type
+    return True
+
+
+# ==================== Finishing ====================
+
+def finished_file(upload, checksum=None):
+    """Return an open File of a complete upload, named with the sniffed extension."""
+    check_not_expired(upload)
+    if not upload.is_complete:
+        raise UploadError('Upload is not complete', status=409, offset=upload.offset)
+    if checksum and checksum.lower() != upload.sha256:
+        raise UploadError('sha256 does not match the uploaded bytes', status=422)
+    stem = os.path.splitext(upload.filename)[0] or 'upload'
+    file = File(open(temp_path(upload), 'rb'), name=f'{stem}{EXTENSIONS[upload.content_type]}')
+    # Lets content-addressed storage skip re-hashing (and copying a known blob)
+    file.sha256 = upload.sha256
+    return file
+
+
+def attach(upload, instance, field_name, checksum=None):
+    """Copy a complete upload into ``instance.<field_name>`` and delete the upload."""
+    with finished_file(upload, checksum) as f:
+        getattr(instance, field_name).save(f.name, f, save=False)
+    instance.save(update_fields=[field_name])
+    upload.delete()
+
+
+def discard(upload_id):
+    forget_hasher(upload_id)
+    try:
+        os.remove(os.path.join(upload_setting('TEMP_DIR'), f'{upload_id.hex}.part'))
+    except FileNotFoundError:
+        pass
+
+
+def purge_expired():
+    expired = list(Upload.objects.filter(expires_at__lt=timezone.now()))
+    for upload in expired:
+        upload.delete()
+    return len(expired)
@@ -4,19 +4,20 @@
 
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from .async_views import async_login, async_register, batch, post_events
 from .views import (
     # Authentication
-    RegisterView, LoginView, UserProfileView, UpdateUserProfileView,
+    RegisterView, LoginView, LogoutView, UserProfileView, UpdateUserProfileView,
     
     # Categories & Tags
     CategoryListView, CategoryDetailView,
     TagListView, TagDetailView,
     
     # Posts
-    PostListCreateView, PostDetailView, MyPostsView,
+    PostListCreateView, PostDetailView, MyPostsView, PostBulkView,
     
     # Comments
-    CommentListCreateView, CommentDetailView,
+    CommentListCreateView, CommentDetailView, CommentRepliesView,
     
     # Likes
     LikeToggleView, PostLikesView,
@@ -25,16 +26,31 @@ from .views import (
     BookmarkToggleView, MyBookmarksView,
     
     # Follow
-    FollowToggleView, MyFollowingView, MyFollowersView,
+    FollowToggleView, MyFollowingView, MyFollowersView, UserSuggestionsView,
     
     # Timeline & Search
-    TimelineView, GlobalSearchView,
+    TimelineView, GlobalSearchView, AutocompleteView,
+    
+    # Delta sync
+    PostSyncView, TimelineSyncView, BookmarkSyncView,
+    
+    # Analytics
+    MyAnalyticsView,
+    
+    # Chunked uploads
+    UploadCreateView, UploadDetailView, UploadCompleteView,
+    
+    # Export
+    MyDataExportView, SiteExportView,
 )
 
 urlpatterns = [
     # ==================== Authentication URLs ====================
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
+    path('logout/', LogoutView.as_view(), name='logout'),
+    path('async/login/', async_login, name='async-login'),
+    path('async/register/', async_register, name='async-register'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('profile/', UserProfileView.as_view(), name='profile'),
     path('profile/update/', UpdateUserProfileView.as_view(), name='profile-update'),
@@ -51,10 +67,13 @@ urlpatterns = [
     path('posts/', PostListCreateView.as_view(), name='post-list-create'),
     path('posts/<int:pk>/', PostDetailView.as_view(), name='post-detail'),
     path('posts/my/', MyPostsView.as_view(), name='my-posts'),
+    path('posts/bulk/', PostBulkView.as_view(), name='post-bulk'),
+    path('posts/<int:post_id>/events/', post_events, name='post-events'),
     
     # ==================== Comment URLs ====================
     path('posts/<int:post_id>/comments/', CommentListCreateView.as_view(), name='comment-list-create'),
     path('comments/<int:pk>/', CommentDetailView.as_view(), name='comment-detail'),
+    path('comments/<int:pk>/replies/', CommentRepliesView.as_view(), name='comment-replies'),
     
     # ==================== Like URLs ====================
     path('posts/<int:post_id>/like/', LikeToggleView.as_view(), name='like-toggle'),
@@ -68,8 +87,30 @@ urlpatterns = [
     path('users/<int:user_id>/follow/', FollowToggleView.as_view(), name='follow-toggle'),
     path('following/', MyFollowingView.as_view(), name='my-following'),
     path('followers/', MyFollowersView.as_view(), name='my-followers'),
+    path('users/suggestions/', UserSuggestionsView.as_view(), name='user-suggestions'),
     
     # ==================== Timeline & Search URLs ====================
     path('timeline/', TimelineView.as_view(), name='timeline'),
     path('search/', GlobalSearchView.as_view(), name='global-search'),
+    path('autocomplete/', AutocompleteView.as_view(), name='autocomplete'),
+    
+    # ==================== Delta Sync URLs ====================
+    path('sync/posts/', PostSyncView.as_view(), name='sync-posts'),
+    path('sync/timeline/', TimelineSyncView.as_view(), name='sync-timeline'),
+    path('sync/bookmarks/', BookmarkSyncView.as_view(), name='sync-bookmarks'),
+    
+    # ==================== Chunked Upload URLs ====================
+    path('uploads/', UploadCreateView.as_view(), name='upload-create'),
+    path('uploads/<uuid:pk>/', UploadDetailView.as_view(), name='upload-detail'),
+    path('uploads/<uuid:pk>/complete/', UploadCompleteView.as_view(), name='upload-complete'),
+    
+    # ==================== Analytics URLs ====================
+    path('analytics/me/', MyAnalyticsView.as_view(), name='analytics-me'),
+    
+    # ==================== Export URLs ====================
+    path('export/me/', MyDataExportView.as_view(), name='export-me'),
+    path('export/site/', SiteExportView.as_view(), name='export-site'),
+    
+    # ==================== Batch URLs ====================
+    path('batch/', batch, name='batch'),
 ]
\ No newline at end of file
@@ -0,0 +1,162 @@
+# backend/api/utils.py
+# Small shared helpers
+
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+# TTL Cache (bounded, per process)
+class TTLCache:
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Background refresh (in-memory indexes rebuilt off the request path)
+def run_in_background(target, name):
+    """Run ``target()`` on a daemon thread that closes its DB connections when done."""
+    def run():
+        try:
+            target()
+        except Exception:
+            logger.exception('Background task %s failed', name)
+        finally:
+            connections.close_all()
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
+
+
+class RebuiltIndex:
+    """
+    Base for in-memory structures loaded from the database and rebuilt when stale.
+
+    Subclasses implement ``_load()`` (reads the database with no lock held and
+    returns the new state), ``_install(state)`` (swaps it in under ``_lock``)
+    and ``_is_stale()``. Changes that arrive while a rebuild runs are kept with
+    ``_record()`` and replayed onto the new state as it is installed.
+    """
+
+    rebuild_name = 'index-rebuild'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._reset_state()
+
+    def _reset_state(self):
+        self.built_at = None
+        self._building = False
+        self._replay = []
+
+    def _record(self, change, *args):
+        # Caller holds _lock
+        if self._building:
+            self._replay.append((change, args))
+
+    def install(self, state):
+        with self._lock:
+            self._install(state)
+            self.built_at = time.monotonic()
+            replay, self._replay = self._replay, []
+            for change, args in replay:
+                change(*args)
+
+    def build_from_db(self):
+        with self._build_lock:
+            self._build_from_db()
+
+    def _build_from_db(self):
+        with self._lock:
+            self._building = True
+            self._replay = []
+        try:
+            self.install(self._load())
+        finally:
+            with self._lock:
+                self._building = False
+                self._replay = []
+
+    def build_in_background(self):
+        """Start the first build off the calling thread (e.g. while a worker boots)."""
+        return run_in_background(self.ensure_built, self.rebuild_name)
+
+    def ensure_built(self):
+        """Build on first use; afterwards refresh a stale index in the background."""
+        with self._lock:
+            built = self.built_at is not None
+            stale = built and not self._building and self._is_stale()
+            if stale:
+                self._building = True
+        if stale:
+            run_in_background(self.build_from_db, self.rebuild_name)
+        elif not built:
+            # Nothing to answer from yet; one thread builds, the rest wait for it
+            with self._build_lock:
+                if self.built_at is None:
+                    self._build_from_db()
+
+
+# Post summaries (stored on Post so list pages never load the body)
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+_whitespace = re.compile(r'\s+')
+
+
+def make_excerpt(text, length=EXCERPT_LENGTH):
+    text = _whitespace.sub(' ', text or '').strip()
+    if len(text) <= length:
+        return text
+    cut = text[:length + 1]
+    if ' ' in cut:
+        cut = cut.rsplit(' ', 1)[0]  # end on a word boundary
+    return cut[:length].rstrip(' .,;:') + '…'
+
+
+def reading_time_minutes(text):
+    return max(1, math.ceil(len((text or '').split()) / WORDS_PER_MINUTE))
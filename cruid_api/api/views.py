@@ -6,21 +6,40 @@ from rest_framework import generics, status, permissions, filters
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.pagination import PageNumberPagination
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 
 from .models import (
     Post, Comment, Like, Bookmark, Follow,
-    UserProfile, Category, Tag
+    UserProfile, Category, Tag, ArchivedPost, Upload
 )
 from .serializers import (
     UserRegistrationSerializer, UserSerializer, UserProfileSerializer,
-    PostListSerializer, PostDetailSerializer, PostWriteSerializer,
+    PostListSerializer, PostDetailSerializer, ArchivedPostDetailSerializer, PostWriteSerializer,
     CommentSerializer, LikeSerializer, BookmarkSerializer, FollowSerializer,
-    CategorySerializer, TagSerializer
+    CategorySerializer, TagSerializer, SuggestedUserSerializer, UploadSerializer
+)
+from .graph import get_suggestions
+from .fragments import PostFragmentMixin, load_post_counts
+from .normalized import NormalizedResponseMixin
+from .comments import CommentThreadMixin, ReplyCursorPagination, thread_queryset
+from .singleflight import SingleFlightCacheMixin, response_cache_key
+from .jobs import run_or_enqueue
+from .relations import ensure, remove, toggle, CREATED, MISSING, REFUSED, REMOVED
+from .analytics import author_stats, parse_range
+from .archive import ARCHIVED
+from .events import LIVE_EVENTS_HEADER, streams_supported
+from .uploads import UploadError, attach, new_upload, write_chunk
+from .sync import make_sync_token, read_sync_token, sync_since, sync_setting, tombstones_since
+from .autocomplete import autocomplete_index, autocomplete_setting, AUTOCOMPLETE_TYPES
+from .authentication import VersionedRefreshToken, bump_token_version
+from .exports import (
+    EXPORT_FORMATS, USER_DATASETS, SITE_DATASETS,
+    iter_export, parse_datasets, export_filename, content_type_for
 )
 
 # Pagination
@@ -36,6 +55,14 @@ class RegisterView(generics.CreateAPIView):
     permission_classes = [permissions.AllowAny]
     serializer_class = UserRegistrationSerializer
 
+def login_response_data(user):
+    refresh = VersionedRefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+        'user': UserSerializer(user).data
+    }
+
 class LoginView(APIView):
     permission_classes = [permissions.AllowAny]
     
@@ -46,18 +73,21 @@ class LoginView(APIView):
         user = authenticate(username=username, password=password)
         
         if user:
-            refresh = RefreshToken.for_user(user)
-            return Response({
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-                'user': UserSerializer(user).data
-            })
+            return Response(login_response_data(user))
         else:
             return Response(
                 {'error': 'Invalid credentials'}, 
                 status=status.HTTP_401_UNAUTHORIZED
             )
 
+class LogoutView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        # Revokes every access/refresh token issued to this user
+        bump_token_version(request.user.id)
+        return Response({'message': 'Logged out'}, status=status.HTTP_200_OK)
+
 class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -103,7 +133,7 @@ class TagDetailView(generics.RetrieveUpdateDestroyAPIView):
 
 # ==================== Post Views ====================
 
-class PostListCreateView(generics.ListCreateAPIView):
+class PostListCreateView(SingleFlightCacheMixin, PostFragmentMixin, NormalizedResponseMixin, generics.ListCreateAPIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -120,7 +150,8 @@ class PostListCreateView(generics.ListCreateAPIView):
         if tag_slug:
             queryset = queryset.filter(tags__slug=tag_slug)
         
-        return queryset.select_related('author', 'category').prefetch_related('tags', 'likes', 'comments')
+        # Counters and is_liked/is_bookmarked come from grouped queries in PostFragmentMixin
+        return queryset.defer('content').select_related('author__profile', 'category').prefetch_related('tags')
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
@@ -129,8 +160,11 @@ class PostListCreateView(generics.ListCreateAPIView):
     
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
+    
+    def get_response_cache_key(self, request, *args, **kwargs):
+        return response_cache_key('post-list', request.get_full_path())
 
-class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
+class PostDetailView(SingleFlightCacheMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Post.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     
@@ -142,47 +176,117 @@ class PostDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_queryset(self):
         # For update/delete, only owner can access
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
-            return Post.objects.filter(author=self.request.user)
+            posts = Post.objects.filter(author=self.request.user)
+            # Archive stubs are read-only but can be deleted
+            return posts if self.request.method == 'DELETE' else posts.exclude(status=ARCHIVED)
         return Post.objects.all()
     
+    def detail_data(self, instance):
+        if instance.status == ARCHIVED:
+            # Stub: content and thread come from the archive tables
+            instance.archive = (
+                ArchivedPost.objects.filter(post_id=instance.pk).first()
+                or ArchivedPost(post_id=instance.pk, content='')
+            )
+            return ArchivedPostDetailSerializer(instance, context=self.get_serializer_context()).data
+        return self.get_serializer(instance).data
+    
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        # Increment view count
-        instance.increment_views()
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        # View count: inline, or a batched job when JOBS['DEFER_SIDE_EFFECTS'] is on
+        run_or_enqueue('increment_views', {'post_id': instance.pk})
+        instance.views_count += 1
+        return Response(self.detail_data(instance))
+    
+    def get_response_cache_key(self, request, *args, **kwargs):
+        # Invalidated by post/comment signals
+        return response_cache_key('post-detail', kwargs['pk'])
+    
+    def get_cached_data(self, request, *args, **kwargs):
+        # No view count here: the fill may be a background refresh
+        return self.detail_data(self.get_object())
+    
+    def served_from_cache(self, request, *args, **kwargs):
+        run_or_enqueue('increment_views', {'post_id': kwargs['pk']})
+    
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        # Tells the client whether subscribing to /events/ will work here
+        if request.method == 'GET' and streams_supported(request):
+            response[LIVE_EVENTS_HEADER] = '1'
+        return response
+
+class PostBulkView(APIView):
+    # POST creates, PATCH updates (items carry "id"); one result per item, 207 if any failed
+    permission_classes = [permissions.IsAuthenticated]
+    max_items = 200
+    
+    def get_serializer(self, *args, **kwargs):
+        return PostWriteSerializer(*args, many=True, max_length=self.max_items, context={'request': self.request}, **kwargs)
+    
+    def post(self, request):
+        return self.save(self.get_serializer(data=request.data), 'created', status.HTTP_201_CREATED)
+    
+    def patch(self, request):
+        ids = []
+        if isinstance(request.data, list):
+            ids = [item.get('id') for item in request.data[:self.max_items + 1] if isinstance(item, dict)]
+        # Only the caller's own, unarchived posts can be updated; others report "Post not found"
+        posts = Post.objects.filter(author=request.user, id__in=[i for i in ids if isinstance(i, int)]).exclude(status=ARCHIVED).in_bulk()
+        return self.save(self.get_serializer(posts, data=request.data, partial=True), 'updated', status.HTTP_200_OK)
+    
+    def save(self, serializer, action, success_status):
+        serializer.is_valid(raise_exception=True)
+        items = [(data['_index'], data) for data in serializer.validated_data]
+        posts = serializer.save() if items else []
+        results = [
+            {'index': index, 'status': 'error', 'errors': errors}
+            for index, errors in serializer.item_errors.items()
+        ] + [
+            {'index': index, 'status': action, 'id': post.pk}
+            for (index, _), post in zip(items, posts)
+        ]
+        results.sort(key=lambda result: result['index'])
+        failed = len(serializer.item_errors)
+        return Response(
+            {'succeeded': len(posts), 'failed': failed, 'results': results},
+            status=status.HTTP_207_MULTI_STATUS if failed else success_status
+        )
 
-class MyPostsView(generics.ListAPIView):
+class MyPostsView(PostFragmentMixin, NormalizedResponseMixin, generics.ListAPIView):
     serializer_class = PostListSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     
     def get_queryset(self):
-        return Post.objects.filter(author=self.request.user).select_related('author', 'category').prefetch_related('tags')
+        return Post.objects.filter(author=self.request.user).defer('content').select_related('author__profile', 'category').prefetch_related('tags')
 
 
 
 # ==================== Comment Views (FIXED) ====================
 
-class CommentListCreateView(generics.ListCreateAPIView):
+class CommentListCreateView(CommentThreadMixin, generics.ListCreateAPIView):
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
     
     def get_queryset(self):
         post_id = self.kwargs.get('post_id')
-        return Comment.objects.filter(post_id=post_id, parent=None).select_related('author').order_by('-created_at')
+        return thread_queryset().filter(post_id=post_id, parent=None).order_by('-created_at', '-id')
     
     def perform_create(self, serializer):
         post_id = self.kwargs.get('post_id')
         try:
             post = Post.objects.get(id=post_id)
-            serializer.save(author=self.request.user, post=post)
         except Post.DoesNotExist:
             from rest_framework.exceptions import NotFound
             raise NotFound('Post not found')
+        if post.status == ARCHIVED:
+            from rest_framework.exceptions import PermissionDenied
+            raise PermissionDenied('Archived posts are read-only')
+        serializer.save(author=self.request.user, post=post)
 
-class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CommentDetailView(CommentThreadMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
@@ -192,27 +296,55 @@ class CommentDetailView(generics.RetrieveUpdateDestroyAPIView):
         if self.request.method in ['PUT', 'PATCH', 'DELETE']:
             return Comment.objects.filter(author=self.request.user)
         return Comment.objects.all()
+
+class CommentRepliesView(CommentThreadMixin, generics.ListAPIView):
+    # Rest of a thread, newest first, cursor-paginated
+    serializer_class = CommentSerializer
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = ReplyCursorPagination
+    
+    def get_queryset(self):
+        parent = generics.get_object_or_404(Comment.objects.only('id'), pk=self.kwargs['pk'])
+        return thread_queryset().filter(parent=parent)
     
     
 # ==================== Like Views ====================
 
 class LikeToggleView(APIView):
+    # POST toggles in one transaction; PUT (like) and DELETE (unlike) are idempotent single-statement writes
     permission_classes = [permissions.IsAuthenticated]
+    # Stub likes live in ArchivedLike; a hot Like beside them would count twice
+    target_filter = ~Q(status=ARCHIVED)
+    
+    def archived(self):
+        return Response({'error': 'Archived posts are read-only'}, status=status.HTTP_403_FORBIDDEN)
     
     def post(self, request, post_id):
-        try:
-            post = Post.objects.get(id=post_id)
-        except Post.DoesNotExist:
+        result = toggle(Like, 'user', request.user.id, 'post', post_id, self.target_filter)
+        if result == MISSING:
             return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        like, created = Like.objects.get_or_create(user=request.user, post=post)
-        
-        if not created:
-            # Unlike
-            like.delete()
+        if result == REFUSED:
+            return self.archived()
+        if result == REMOVED:
             return Response({'message': 'Post unliked', 'liked': False}, status=status.HTTP_200_OK)
-        
         return Response({'message': 'Post liked', 'liked': True}, status=status.HTTP_201_CREATED)
+    
+    def put(self, request, post_id):
+        result = ensure(Like, 'user', request.user.id, 'post', post_id, self.target_filter)
+        if result == MISSING:
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+        if result == REFUSED:
+            return self.archived()
+        return Response(
+            {'message': 'Post liked', 'liked': True},
+            status=status.HTTP_201_CREATED if result == CREATED else status.HTTP_200_OK
+        )
+    
+    def delete(self, request, post_id):
+        # An archived post has no Like rows; it is only looked up when nothing was deleted
+        if not remove(Like, 'user', request.user.id, 'post', post_id) and Post.objects.filter(pk=post_id, status=ARCHIVED).exists():
+            return self.archived()
+        return Response({'message': 'Post unliked', 'liked': False}, status=status.HTTP_200_OK)
 
 class PostLikesView(generics.ListAPIView):
     serializer_class = LikeSerializer
@@ -226,76 +358,116 @@ class PostLikesView(generics.ListAPIView):
 # ==================== Bookmark Views ====================
 
 class BookmarkToggleView(APIView):
+    # POST toggles in one transaction; PUT (bookmark) and DELETE (remove) are idempotent single-statement writes
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, post_id):
-        try:
-            post = Post.objects.get(id=post_id)
-        except Post.DoesNotExist:
+        result = toggle(Bookmark, 'user', request.user.id, 'post', post_id)
+        if result == MISSING:
             return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        bookmark, created = Bookmark.objects.get_or_create(user=request.user, post=post)
-        
-        if not created:
-            # Remove bookmark
-            bookmark.delete()
+        if result == REMOVED:
             return Response({'message': 'Bookmark removed', 'bookmarked': False}, status=status.HTTP_200_OK)
-        
         return Response({'message': 'Post bookmarked', 'bookmarked': True}, status=status.HTTP_201_CREATED)
+    
+    def put(self, request, post_id):
+        result = ensure(Bookmark, 'user', request.user.id, 'post', post_id)
+        if result == MISSING:
+            return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(
+            {'message': 'Post bookmarked', 'bookmarked': True},
+            status=status.HTTP_201_CREATED if result == CREATED else status.HTTP_200_OK
+        )
+    
+    def delete(self, request, post_id):
+        remove(Bookmark, 'user', request.user.id, 'post', post_id)
+        return Response({'message': 'Bookmark removed', 'bookmarked': False}, status=status.HTTP_200_OK)
 
-class MyBookmarksView(generics.ListAPIView):
+class MyBookmarksView(PostFragmentMixin, NormalizedResponseMixin, generics.ListAPIView):
     serializer_class = BookmarkSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
+    fragment_post_field = 'post'
     
     def get_queryset(self):
-        return Bookmark.objects.filter(user=self.request.user).select_related('post__author')
+        return Bookmark.objects.filter(user=self.request.user).select_related(
+            'post__author__profile', 'post__category'
+        ).prefetch_related('post__tags').defer('post__content')
 
 # ==================== Follow Views ====================
 
 class FollowToggleView(APIView):
+    # POST toggles in one transaction; PUT (follow) and DELETE (unfollow) are idempotent single-statement writes
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, user_id):
         if request.user.id == user_id:
             return Response({'error': 'You cannot follow yourself'}, status=status.HTTP_400_BAD_REQUEST)
-        
-        try:
-            user_to_follow = User.objects.get(id=user_id)
-        except User.DoesNotExist:
+        result = toggle(Follow, 'follower', request.user.id, 'following', user_id)
+        if result == MISSING:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
-        
-        follow, created = Follow.objects.get_or_create(
-            follower=request.user,
-            following=user_to_follow
-        )
-        
-        if not created:
-            # Unfollow
-            follow.delete()
+        if result == REMOVED:
             return Response({'message': 'Unfollowed', 'following': False}, status=status.HTTP_200_OK)
-        
         return Response({'message': 'Followed', 'following': True}, status=status.HTTP_201_CREATED)
+    
+    def put(self, request, user_id):
+        if request.user.id == user_id:
+            return Response({'error': 'You cannot follow yourself'}, status=status.HTTP_400_BAD_REQUEST)
+        result = ensure(Follow, 'follower', request.user.id, 'following', user_id)
+        if result == MISSING:
+            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(
+            {'message': 'Followed', 'following': True},
+            status=status.HTTP_201_CREATED if result == CREATED else status.HTTP_200_OK
+        )
+    
+    def delete(self, request, user_id):
+        remove(Follow, 'follower', request.user.id, 'following', user_id)
+        return Response({'message': 'Unfollowed', 'following': False}, status=status.HTTP_200_OK)
 
-class MyFollowingView(generics.ListAPIView):
+class MyFollowingView(NormalizedResponseMixin, generics.ListAPIView):
     serializer_class = FollowSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     
     def get_queryset(self):
-        return Follow.objects.filter(follower=self.request.user).select_related('following')
+        return Follow.objects.filter(follower=self.request.user).select_related('follower__profile', 'following__profile')
 
-class MyFollowersView(generics.ListAPIView):
+class MyFollowersView(NormalizedResponseMixin, generics.ListAPIView):
     serializer_class = FollowSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
     
     def get_queryset(self):
-        return Follow.objects.filter(following=self.request.user).select_related('follower')
+        return Follow.objects.filter(following=self.request.user).select_related('follower__profile', 'following__profile')
+
+class UserSuggestionsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 10)), 50))
+        except ValueError:
+            limit = 10
+
+        suggestions = get_suggestions(request.user, limit=limit)
+        user_ids = [user_id for user_id, _, _ in suggestions]
+        users = User.objects.filter(id__in=user_ids, is_active=True).select_related('profile')
+        users_by_id = {user.id: user for user in users}
+
+        serializer = SuggestedUserSerializer(
+            [users_by_id[user_id] for user_id in user_ids if user_id in users_by_id],
+            many=True,
+            context={
+                'request': request,
+                'mutual_counts': {user_id: mutual for user_id, mutual, _ in suggestions},
+                'activity': {user_id: posts for user_id, _, posts in suggestions},
+            }
+        )
+        return Response({'results': serializer.data})
 
 # ==================== Timeline/Feed View ====================
 
-class TimelineView(generics.ListAPIView):
+class TimelineView(PostFragmentMixin, NormalizedResponseMixin, generics.ListAPIView):
     serializer_class = PostListSerializer
     permission_classes = [permissions.IsAuthenticated]
     pagination_class = StandardResultsSetPagination
@@ -307,11 +479,11 @@ class TimelineView(generics.ListAPIView):
         return Post.objects.filter(
             author__in=following_users,
             status='published'
-        ).select_related('author', 'category').prefetch_related('tags').order_by('-created_at')
+        ).defer('content').select_related('author__profile', 'category').prefetch_related('tags').order_by('-created_at')
 
 # ==================== Search View ====================
 
-class GlobalSearchView(generics.ListAPIView):
+class GlobalSearchView(PostFragmentMixin, NormalizedResponseMixin, generics.ListAPIView):
     serializer_class = PostListSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = StandardResultsSetPagination
@@ -324,5 +496,240 @@ class GlobalSearchView(generics.ListAPIView):
                 Q(content__icontains=query) |
                 Q(author__username__icontains=query) |
                 Q(tags__name__icontains=query)
-            ).distinct().filter(status='published')
-        return Post.objects.none()
\ No newline at end of file
+            ).distinct().filter(status='published').defer('content')
+        return Post.objects.none()
+
+# ==================== Delta Sync Views ====================
+
+class BaseSyncView(APIView):
+    # ?since=<sync_token from the previous response>; no token -> full_resync
+    feed_name = None
+    # Required: get_changes(request, since) -> (changed post queryset, ids
+    # removed from the feed), or None to force a resync
+    get_changes = None
+    
+    def get(self, request):
+        assert self.feed_name is not None, f'{self.__class__.__name__} must set feed_name'
+        assert self.get_changes is not None, f'{self.__class__.__name__} must define get_changes'
+        now = timezone.now()
+        token = make_sync_token(self.feed_name, now)
+        at = read_sync_token(request.query_params.get('since'), self.feed_name)
+        changes = None if at is None else self.get_changes(request, sync_since(at))
+        if changes is not None:
+            changed, removed = changes
+            limit = sync_setting('MAX_CHANGES')
+            posts = list(
+                changed.defer('content').select_related('author__profile', 'category')
+                .prefetch_related('tags').order_by('-updated_at')[:limit + 1]
+            )
+            if len(posts) + len(removed) <= limit:
+                context = {'request': request, **load_post_counts([p.pk for p in posts], request)}
+                removed -= {p.pk for p in posts}
+                return Response({
+                    'sync_token': token,
+                    'full_resync': False,
+                    'posts': PostListSerializer(posts, many=True, context=context).data,
+                    'deleted': sorted(removed),
+                })
+        return Response({'sync_token': token, 'full_resync': True, 'posts': [], 'deleted': []})
+
+class PostSyncView(BaseSyncView):
+    permission_classes = [permissions.AllowAny]
+    feed_name = 'posts'
+    
+    def get_changes(self, request, since):
+        updated = Post.objects.filter(updated_at__gt=since)
+        removed = tombstones_since('post', since)
+        removed |= set(updated.exclude(status='published').values_list('id', flat=True))
+        return updated.filter(status='published'), removed
+
+class TimelineSyncView(BaseSyncView):
+    permission_classes = [permissions.IsAuthenticated]
+    feed_name = 'timeline'
+    
+    def get_changes(self, request, since):
+        user = request.user
+        # A follow or unfollow reshapes the whole timeline
+        if tombstones_since('follow', since, user.id) or user.following.filter(created_at__gt=since).exists():
+            return None
+        followees = user.following.values('following')
+        updated = Post.objects.filter(updated_at__gt=since, author__in=followees)
+        # Only followees' deletes; the rest of the site's would crowd MAX_CHANGES
+        removed = tombstones_since('post', since, authors=followees)
+        removed |= set(updated.exclude(status='published').values_list('id', flat=True))
+        return updated.filter(status='published'), removed
+
+class BookmarkSyncView(BaseSyncView):
+    permission_classes = [permissions.IsAuthenticated]
+    feed_name = 'bookmarks'
+    
+    def get_changes(self, request, since):
+        user = request.user
+        # Newly bookmarked posts and edits to bookmarked posts (one join on the user's bookmarks)
+        changed = Post.objects.filter(
+            Q(bookmarked_by__user=user) & (Q(updated_at__gt=since) | Q(bookmarked_by__created_at__gt=since))
+        )
+        removed = tombstones_since('bookmark', since, user.id)
+        if removed:
+            removed -= set(Bookmark.objects.filter(user=user, post_id__in=removed).values_list('post_id', flat=True))
+        return changed, removed
+
+# ==================== Chunked Upload Views ====================
+
+def upload_error_response(error):
+    data = {'error': str(error)}
+    if error.offset is not None:
+        data['offset'] = error.offset
+    return Response(data, status=error.status)
+
+def upload_response(upload, status_code=status.HTTP_200_OK):
+    return Response(UploadSerializer(upload).data, status=status_code, headers={'Upload-Offset': str(upload.offset)})
+
+class UploadCreateView(APIView):
+    # {"filename", "size"} -> an upload id to PATCH chunks to
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request):
+        serializer = UploadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = new_upload(request.user, **serializer.validated_data)
+        except UploadError as e:
+            return upload_error_response(e)
+        return upload_response(upload, status.HTTP_201_CREATED)
+
+class UploadDetailView(APIView):
+    # GET: resume point; PATCH: raw chunk at the Upload-Offset header; DELETE: cancel
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get_object(self):
+        return generics.get_object_or_404(Upload, pk=self.kwargs['pk'], user=self.request.user)
+    
+    def get(self, request, pk):
+        return upload_response(self.get_object())
+    
+    def patch(self, request, pk):
+        upload = self.get_object()
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length') or 0)
+        except ValueError:
+            return Response({'error': 'Upload-Offset header is required'}, status=status.HTTP_400_BAD_REQUEST)
+        # request.data is never touched, so the body streams to disk unparsed
+        try:
+            write_chunk(upload, request.stream, offset, length)
+        except UploadError as e:
+            if e.status == status.HTTP_415_UNSUPPORTED_MEDIA_TYPE:
+                upload.delete()
+            return upload_error_response(e)
+        return upload_response(upload)
+    
+    def delete(self, request, pk):
+        self.get_object().delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class UploadCompleteView(APIView):
+    # {"target": "post", "post_id": 1} or {"target": "avatar"}, optional "sha256" to verify
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def post(self, request, pk):
+        upload = generics.get_object_or_404(Upload, pk=pk, user=request.user)
+        target = request.data.get('target')
+        if target == 'post':
+            post_id = str(request.data.get('post_id', ''))
+            posts = Post.objects.filter(author=request.user).exclude(status=ARCHIVED)
+            instance = posts.filter(pk=post_id).first() if post_id.isdigit() else None
+            if instance is None:
+                return Response({'error': 'Post not found'}, status=status.HTTP_404_NOT_FOUND)
+            field_name, serializer_class = 'image', PostDetailSerializer
+        elif target == 'avatar':
+            instance, _ = UserProfile.objects.get_or_create(user=request.user)
+            field_name, serializer_class = 'avatar', UserProfileSerializer
+        else:
+            return Response({'error': 'target must be "post" or "avatar"'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            attach(upload, instance, field_name, checksum=request.data.get('sha256'))
+        except UploadError as e:
+            return upload_error_response(e)
+        return Response(serializer_class(instance, context={'request': request}).data)
+
+# ==================== Analytics Views ====================
+
+class MyAnalyticsView(APIView):
+    # ?from=YYYY-MM-DD&to=YYYY-MM-DD&granularity=day|week|month, read from the daily rollups
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        try:
+            start, end, granularity = parse_range(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(author_stats(request.user.id, start, end, granularity))
+
+# ==================== Autocomplete View ====================
+
+class AutocompleteView(APIView):
+    # ?q=pyt&types=tag,category,user&limit=8 - served from memory, no queries per keystroke
+    permission_classes = [permissions.AllowAny]
+    
+    def get(self, request):
+        query = request.query_params.get('q', '')
+        types = [
+            t for t in request.query_params.get('types', ','.join(AUTOCOMPLETE_TYPES)).split(',')
+            if t in AUTOCOMPLETE_TYPES
+        ]
+        if not types:
+            return Response(
+                {'error': f'types must be one or more of: {", ".join(AUTOCOMPLETE_TYPES)}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', autocomplete_setting('LIMIT'))),
+                               autocomplete_setting('MAX_LIMIT')))
+        except ValueError:
+            limit = autocomplete_setting('LIMIT')
+        
+        autocomplete_index.ensure_built()
+        return Response({'query': query, 'results': autocomplete_index.search(query, types, limit)})
+
+# ==================== Export Views ====================
+
+class BaseExportView(APIView):
+    # ?fmt=ndjson|csv&dataset=posts,comments&gzip=1
+    # ("format" is reserved by DRF for renderer selection)
+    allowed_datasets = ()
+    # Download name without extension; {username} is the requesting user's
+    filename_base = None
+    
+    def get_export_user(self, request):
+        return None
+    
+    def get(self, request):
+        assert self.filename_base is not None, f'{self.__class__.__name__} must set filename_base'
+        fmt = request.query_params.get('fmt', 'ndjson')
+        compress = request.query_params.get('gzip') in ('1', 'true')
+        if fmt not in EXPORT_FORMATS:
+            return Response({'error': f'fmt must be one of {", ".join(EXPORT_FORMATS)}'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            datasets = parse_datasets(request.query_params.get('dataset'), self.allowed_datasets)
+            chunks = iter_export(datasets, fmt=fmt, user=self.get_export_user(request), compress=compress)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(chunks, content_type=content_type_for(fmt, compress))
+        filename = export_filename(self.filename_base.format(username=request.user.username), fmt, compress)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+class MyDataExportView(BaseExportView):
+    permission_classes = [permissions.IsAuthenticated]
+    allowed_datasets = USER_DATASETS
+    filename_base = '{username}-export'
+    
+    def get_export_user(self, request):
+        return request.user
+
+class SiteExportView(BaseExportView):
+    permission_classes = [permissions.IsAdminUser]
+    allowed_datasets = SITE_DATASETS
+    filename_base = 'site-export'
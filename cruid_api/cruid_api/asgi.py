@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cruid_api.settings')
 
 application = get_asgi_application()
+
+# Only serving processes load this module: build in-memory indexes while booting
+from api.autocomplete import build_on_startup  # noqa: E402
+
+build_on_startup()
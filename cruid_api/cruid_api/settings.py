@@ -2,6 +2,8 @@
 
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -124,7 +126,7 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # ==================== REST_FRAMEWORK Settings ====================
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -146,6 +148,13 @@ SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
+    'TOKEN_REFRESH_SERIALIZER': 'api.authentication.VersionedTokenRefreshSerializer',
+}
+
+# Per-process cache of authenticated users (see api/authentication.py)
+JWT_USER_CACHE = {
+    'TTL': 60,          # seconds; bounds how long another worker may miss a revocation
+    'MAX_SIZE': 10000,
 }
 
 # CORS Configuration
@@ -188,3 +197,194 @@ ALLOWED_IMAGE_TYPES = ['image/jpeg', 'image/png', 'image/gif', 'image/webp']
 
 
 
+
+# ==================== Follow Graph Settings ====================
+# In-memory follow graph for /api/users/suggestions/
+FOLLOW_GRAPH = {
+    'MAX_EDGES': 2000000,           # ~4 bytes per edge in memory
+    'REBUILD_INTERVAL': 600,        # seconds
+    'MAX_PENDING_CHANGES': 10000,
+    'SUGGESTIONS_CACHE_TTL': 300,   # seconds
+    'SUGGESTIONS_CACHE_SIZE': 10000,
+    'ACTIVITY_WINDOW_DAYS': 30,
+}
+
+# ==================== Export Settings ====================
+# Streaming exports (/api/export/..., manage.py export_blog)
+EXPORT = {
+    'DATABASE': 'default',   # point at a read replica alias in production
+    'CHUNK_SIZE': 2000,      # rows per keyset window
+}
+
+# ==================== Password Hashing Settings ====================
+# Pool used by /api/async/login/ and /api/async/register/ (see api/hashing.py)
+PASSWORD_HASHING = {
+    'EXECUTOR': 'process',      # 'process' or 'thread'
+    'WORKERS': 2,
+    'MAX_PENDING': 32,          # queued hashes before new requests get 429
+    'REHASH_ALGORITHM': None,   # e.g. 'argon2' to migrate hashes on successful login
+}
+
+# ==================== Admin Settings ====================
+# Estimated counts + keyset pagination on the big changelists (see api/admin.py)
+ADMIN_PERFORMANCE_MODE = True
+ADMIN_EXACT_COUNT_LIMIT = 1000   # filtered changelists count exactly up to this many rows
+
+# ==================== Autocomplete Settings ====================
+# In-memory prefix index for /api/autocomplete/ (see api/autocomplete.py)
+AUTOCOMPLETE = {
+    'LIMIT': 8,
+    'MAX_LIMIT': 25,
+    'REBUILD_INTERVAL': 900,   # seconds, refreshes post-count ranking
+    'BUILD_ON_STARTUP': True,  # gunicorn/uvicorn workers build the index while booting
+}
+
+# ==================== Post Fragment Cache Settings ====================
+# Rendered PostListSerializer rows reused across list pages (see api/fragments.py)
+POST_FRAGMENT_CACHE = {
+    'ENABLED': True,
+    'CACHE': 'default',   # CACHES alias; use a shared cache (Redis/Memcached) in production
+    'TIMEOUT': 300,       # seconds; nested author/tag post counts may lag this long
+}
+
+# ==================== Cache Settings ====================
+# Bounded per-worker LRU in front of a cache shared by all workers (see api/cache_backends.py).
+# The shared tier is Redis when REDIS_URL is set (docker-compose does). Without it the tier is a
+# per-process LocMemCache: fine for runserver, but with several workers their counters (incr)
+# and deletes are not seen by each other. Tests always get their own LocMemCache (TEST_RUNNER).
+REDIS_URL = os.environ.get('REDIS_URL', '')
+LOCAL_SHARED_CACHE = {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'shared-tier',
+    'OPTIONS': {'MAX_ENTRIES': 50000},
+}
+if REDIS_URL:
+    SHARED_CACHE = {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL}
+else:
+    SHARED_CACHE = LOCAL_SHARED_CACHE
+CACHES = {
+    'default': {
+        'BACKEND': 'api.cache_backends.TwoTierCache',
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'SHARED': SHARED_CACHE,
+            'LOCAL_MAX_BYTES': 32 * 1024 * 1024,   # per worker
+            'LOCAL_TTL': 30,                       # seconds another worker may serve a deleted key
+            'TTL_JITTER': 0.1,
+            'NEGATIVE_TTL': 60,
+        },
+    },
+}
+# `manage.py test` swaps the shared tier for LOCAL_SHARED_CACHE, so tests never touch Redis
+TEST_RUNNER = 'api.test_runner.LocalCacheTestRunner'
+
+# ==================== Single-Flight Settings ====================
+# Anonymous post list/detail responses, filled once per key (see api/singleflight.py)
+SINGLE_FLIGHT = {
+    'ENABLED': True,
+    'CACHE': 'default',
+    'FRESH_TIMEOUT': 30,    # seconds
+    'STALE_TIMEOUT': 300,   # served stale while one request refreshes
+    'WAIT_TIMEOUT': 5,      # waiters get 503 + Retry-After after this
+    'LOCK_TIMEOUT': 30,
+    'CROSS_PROCESS': True,  # lock key in the shared cache tier
+}
+
+# ==================== Background Job Settings ====================
+# Database job queue, run with `python manage.py run_workers` (see api/jobs.py)
+JOBS = {
+    'BATCH_SIZE': 100,
+    'POLL_INTERVAL': 1.0,       # seconds
+    'MAX_ATTEMPTS': 5,
+    'BACKOFF_BASE': 5,          # seconds, doubled per attempt
+    'LOCK_TIMEOUT': 300,        # requeue jobs of workers that died mid-run
+    'DEFER_SIDE_EFFECTS': False, # True: queue view counts / profile creation (needs run_workers)
+}
+
+# ==================== Post Events Settings ====================
+# Server-Sent Events at /api/posts/<id>/events/ (see api/events.py). Serve under ASGI.
+EVENTS = {
+    'BACKEND': 'api.events.LocalBackend',   # 'api.events.RedisBackend' with several workers
+    'REDIS_URL': 'redis://127.0.0.1:6379/0',
+    'QUEUE_SIZE': 32,         # pending events per connection before a resync
+    'HEARTBEAT': 20,          # seconds
+    'MAX_CONNECTIONS': 5000,  # per worker process
+}
+
+# ==================== Comment Thread Settings ====================
+# Post detail embeds one page of comments; the rest of a thread is paged via /api/comments/<id>/replies/
+COMMENTS = {
+    'PAGE_SIZE': 10,
+    'REPLY_PREVIEW': 3,
+    'REPLY_PAGE_SIZE': 20,
+    'REPLY_MAX_PAGE_SIZE': 100,
+}
+
+# ==================== Delta Sync Settings ====================
+# /api/sync/<feed>/?since=<token> (see api/sync.py)
+SYNC = {
+    'MAX_CHANGES': 200,           # larger deltas answer full_resync
+    'OVERLAP': 5,                 # seconds re-read on every sync
+    'RETENTION': 30 * 24 * 3600,  # tombstone lifetime (older tokens force a full reload)
+}
+
+# ==================== Analytics Settings ====================
+# Daily engagement rollups behind /api/analytics/me/ (see api/analytics.py)
+ANALYTICS = {
+    'COMPACT_BATCH': 2000,   # events folded into DailyPostStats per transaction
+    'COMPACT_DELAY': 60,     # seconds; compaction runs on the job queue (run_workers)
+    'DEFAULT_DAYS': 30,
+    'MAX_RANGE': 366,        # days per request
+}
+
+# ==================== Archive Settings ====================
+# Cold storage for old posts: python manage.py archive_before 2023-01-01 (see api/archive.py).
+# To keep the archive in its own SQLite file, add DATABASES['archive'] = {'ENGINE':
+# 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'archive.sqlite3'}, set 'DATABASE':
+# 'archive' and run `python manage.py migrate --database archive`.
+DATABASE_ROUTERS = ['api.archive.ArchiveRouter']
+ARCHIVE = {
+    'DATABASE': 'default',
+    'BATCH_SIZE': 500,   # posts per batch
+}
+
+# ==================== Chunked Upload Settings ====================
+# /api/uploads/ (see api/uploads.py); types are checked against ALLOWED_IMAGE_TYPES
+UPLOADS = {
+    'TEMP_DIR': os.path.join(MEDIA_ROOT, '.uploads'),
+    'MAX_SIZE': 20 * 1024 * 1024,   # bytes per file
+    'CHUNK_SIZE': 2 * 1024 * 1024,  # largest PATCH body
+    'EXPIRY': 24 * 3600,            # purge_uploads drops unfinished uploads after this
+    'MAX_OPEN': 5,                  # unfinished uploads per user
+    'MAX_OPEN_BYTES': 50 * 1024 * 1024,  # declared size of a user's unfinished uploads
+}
+# The browser client sends and reads the Upload-Offset header (and reads
+# Live-Events) cross-origin
+CORS_ALLOW_HEADERS = (*default_headers, 'upload-offset')
+CORS_EXPOSE_HEADERS = ['Upload-Offset', 'Live-Events']
+
+# ==================== Media Storage Settings ====================
+# Uploads are stored once per content as media/cas/ab/cd/<sha256>.<ext> (see api/media.py);
+# run `python manage.py gc_media` daily to delete blobs no post or avatar uses any more.
+STORAGES = {
+    'default': {'BACKEND': 'api.media.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+MEDIA_FILES = {
+    'GC_GRACE': 3600,      # seconds a blob stays unreferenced before it can be deleted
+    # 'x-accel-redirect' with an nginx `location /protected-media/ { internal; alias <MEDIA_ROOT>/; }`,
+    # or 'x-sendfile' for Apache mod_xsendfile; None streams from Django (sendfile under gunicorn)
+    'OFFLOAD': None,
+    'ACCEL_PREFIX': '/protected-media/',
+    'LEGACY_MAX_AGE': 3600,
+}
+
+# ==================== Batch Settings ====================
+# POST /api/batch/ runs up to MAX_REQUESTS GETs in one round trip (see api/batch.py);
+# under ASGI at most CONCURRENCY run at once, each cut off after TIMEOUT seconds.
+BATCH = {
+    'MAX_REQUESTS': 20,
+    'MAX_URL_LENGTH': 2000,
+    'CONCURRENCY': 8,
+    'TIMEOUT': 10,
+}
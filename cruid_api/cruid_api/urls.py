@@ -3,16 +3,19 @@
 # পুরো file এভাবে replace করুন
 
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 
+from api.media import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    # Media: ETag / Range / immutable caching; MEDIA_FILES['OFFLOAD'] hands the bytes to nginx or Apache
+    re_path(rf'^{settings.MEDIA_URL.strip("/")}/(?P<path>.+)$', serve_media, name='media'),
 ]
 
-# Media files serve করার জন্য (Development এ)
+# Static files serve করার জন্য (Development এ)
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'cruid_api.settings')
 
 application = get_wsgi_application()
+
+# Only serving processes load this module: build in-memory indexes while booting
+from api.autocomplete import build_on_startup  # noqa: E402
+
+build_on_startup()
@@ -12,6 +12,7 @@ const CreatePost = () => {
         tag_ids: [],
         status: 'published',
     });
+    const [newTags, setNewTags] = useState('');
     const [imagePreview, setImagePreview] = useState(null);
     const [categories, setCategories] = useState([]);
     const [tags, setTags] = useState([]);
@@ -74,7 +75,9 @@ const CreatePost = () => {
         setError('');
 
         try {
-            await postsAPI.createPost(formData);
+            // New tags are created server-side by name, no separate tag requests
+            const tag_names = newTags.split(',').map(name => name.trim()).filter(Boolean);
+            await postsAPI.createPost({ ...formData, tag_names });
             alert('Post created successfully!');
             navigate('/posts');
         } catch (error) {
@@ -153,6 +156,13 @@ const CreatePost = () => {
                                 </label>
                             ))}
                         </div>
+                        <input
+                            type="text"
+                            placeholder="New tags, comma separated"
+                            value={newTags}
+                            onChange={(e) => setNewTags(e.target.value)}
+                            className="mt-3 w-full px-4 py-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-green-500 focus:border-transparent"
+                        />
                     </div>
 
                     {/* Image Upload */}
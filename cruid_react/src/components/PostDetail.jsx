@@ -8,6 +8,7 @@ const PostDetail = () => {
     const [comments, setComments] = useState([]);
     const [newComment, setNewComment] = useState('');
     const [loading, setLoading] = useState(true);
+    const [liveEvents, setLiveEvents] = useState(false);
     const { id } = useParams();
     const navigate = useNavigate();
 
@@ -16,10 +17,89 @@ const PostDetail = () => {
         fetchComments();
     }, [id]);
 
+    // Live updates: the server pushes only what changed (ASGI deployments only)
+    useEffect(() => {
+        if (!liveEvents) {
+            return undefined;
+        }
+        const source = new EventSource(postsAPI.eventsURL(id));
+        const onEvent = (type, handler) =>
+            source.addEventListener(type, (e) => handler(JSON.parse(e.data)));
+
+        onEvent('comment.created', ({ comment, comments_count }) => {
+            setComments(prev => addComment(prev, comment));
+            setPost(prev => prev && { ...prev, comments_count });
+        });
+        onEvent('comment.updated', ({ comment }) => {
+            setComments(prev => updateComment(prev, comment));
+        });
+        onEvent('comment.deleted', ({ id: commentId, comments_count }) => {
+            setComments(prev => removeComment(prev, commentId));
+            setPost(prev => prev && { ...prev, comments_count });
+        });
+        onEvent('likes', ({ likes_count }) => {
+            setPost(prev => prev && { ...prev, likes_count });
+        });
+        // Missed events (slow connection): reload once
+        source.addEventListener('resync', () => {
+            fetchPost();
+            fetchComments();
+        });
+
+        return () => source.close();
+    }, [id, liveEvents]);
+
+    const addComment = (list, comment) => {
+        if (comment.parent) {
+            return list.map(c => c.id === comment.parent
+                ? {
+                    ...c,
+                    replies: [comment, ...(c.replies || []).filter(r => r.id !== comment.id)],
+                    reply_count: (c.reply_count || 0) + ((c.replies || []).some(r => r.id === comment.id) ? 0 : 1),
+                }
+                : c);
+        }
+        if (list.some(c => c.id === comment.id)) {
+            return list;
+        }
+        return [comment, ...list];
+    };
+
+    // Post detail embeds only the newest replies of each comment
+    const loadMoreReplies = async (comment) => {
+        try {
+            const response = await commentsAPI.getReplies(comment.id, comment.replies_next);
+            const fetched = response.data.results;
+            setComments(prev => prev.map(c => {
+                if (c.id !== comment.id) {
+                    return c;
+                }
+                const known = c.replies_next ? c.replies : [];
+                const seen = new Set(known.map(r => r.id));
+                return {
+                    ...c,
+                    replies: [...known, ...fetched.filter(r => !seen.has(r.id))],
+                    replies_next: response.data.next,
+                };
+            }));
+        } catch (error) {
+            console.error('Error fetching replies:', error);
+        }
+    };
+
+    const updateComment = (list, comment) => list.map(c => c.id === comment.id
+        ? { ...c, content: comment.content, updated_at: comment.updated_at }
+        : { ...c, replies: updateComment(c.replies || [], comment) });
+
+    const removeComment = (list, commentId) => list
+        .filter(c => c.id !== commentId)
+        .map(c => ({ ...c, replies: removeComment(c.replies || [], commentId) }));
+
     const fetchPost = async () => {
         try {
             const response = await postsAPI.getPost(id);
             setPost(response.data);
+            setLiveEvents(response.headers['live-events'] === '1');
         } catch (error) {
             console.error('Error:', error);
             alert('Post not found');
@@ -234,7 +314,10 @@ const fetchComments = async () => {
                     <div className="border-t pt-8">
                         <h3 className="text-2xl font-bold mb-6">Comments ({comments.length})</h3>
 
-                        {/* Add Comment Form */}
+                        {/* Add Comment Form - archived posts are read-only */}
+                        {post.status === 'archived' ? (
+                            <p className="mb-8 text-gray-500">This post is archived; comments are closed.</p>
+                        ) : (
                         <form onSubmit={handleCommentSubmit} className="mb-8">
                             <textarea
                                 value={newComment}
@@ -251,6 +334,7 @@ const fetchComments = async () => {
                                 Post Comment
                             </button>
                         </form>
+                        )}
 
                         {/* Comments List */}
                         {comments.length === 0 ? (
@@ -302,6 +386,14 @@ const fetchComments = async () => {
                                                         <p className="text-sm text-gray-700">{reply.content}</p>
                                                     </div>
                                                 ))}
+                                                {(comment.replies_next || (comment.replies_next === undefined && comment.reply_count > comment.replies.length)) && (
+                                                    <button
+                                                        onClick={() => loadMoreReplies(comment)}
+                                                        className="text-sm text-blue-600 hover:underline"
+                                                    >
+                                                        Show more replies ({comment.reply_count - comment.replies.length})
+                                                    </button>
+                                                )}
                                             </div>
                                         )}
                                     </div>
@@ -201,7 +201,7 @@ const PostList = () => {
 
                                     {/* Content Preview */}
                                     <p className="text-gray-600 mb-4 line-clamp-3">
-                                        {post.content.substring(0, 150)}...
+                                        {post.excerpt}
                                     </p>
 
                                     {/* Tags */}
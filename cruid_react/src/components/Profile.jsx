@@ -2,11 +2,12 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { useAuth } from '../context/AuthContext';
-import { authAPI, postsAPI } from '../services/api';
+import { authAPI, batchAPI } from '../services/api';
 
 const Profile = () => {
     const { user } = useAuth();
     const [myPosts, setMyPosts] = useState([]);
+    const [counts, setCounts] = useState(null);
     const [loading, setLoading] = useState(true);
     const [editMode, setEditMode] = useState(false);
     const [profileData, setProfileData] = useState({
@@ -32,8 +33,14 @@ const Profile = () => {
 
     const fetchMyPosts = async () => {
         try {
-            const response = await postsAPI.getMyPosts();
-            setMyPosts(response.data.results || response.data);
+            // Fresh profile counts and my posts in one round trip
+            const [profile, posts] = await batchAPI.get(['profile/', 'posts/my/']);
+            if (profile.status === 200) {
+                setCounts(profile.body);
+            }
+            if (posts.status === 200) {
+                setMyPosts(posts.body.results || posts.body);
+            }
         } catch (error) {
             console.error('Error:', error);
         } finally {
@@ -111,11 +118,11 @@ const Profile = () => {
                                 <p className="text-sm text-gray-600">Posts</p>
                             </div>
                             <div>
-                                <p className="text-2xl font-bold text-gray-900">{user?.followers_count || 0}</p>
+                                <p className="text-2xl font-bold text-gray-900">{(counts || user)?.followers_count || 0}</p>
                                 <p className="text-sm text-gray-600">Followers</p>
                             </div>
                             <div>
-                                <p className="text-2xl font-bold text-gray-900">{user?.following_count || 0}</p>
+                                <p className="text-2xl font-bold text-gray-900">{(counts || user)?.following_count || 0}</p>
                                 <p className="text-sm text-gray-600">Following</p>
                             </div>
                         </div>
@@ -284,7 +291,7 @@ const Profile = () => {
                                                         </h4>
                                                     </Link>
                                                     <p className="text-sm text-gray-600 mb-2 line-clamp-2">
-                                                        {post.content.substring(0, 150)}...
+                                                        {post.excerpt}
                                                     </p>
                                                     <div className="flex items-center gap-4 text-sm text-gray-500">
                                                         <span>👁️ {post.views_count} views</span>
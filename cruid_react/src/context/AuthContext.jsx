@@ -65,8 +65,13 @@ export const AuthProvider = ({ children }) => {
     };
 
     const logout = () => {
-        localStorage.removeItem('access_token');
-        localStorage.removeItem('refresh_token');
+        // Revoke tokens on the server, then clear them locally
+        authAPI.logout()
+            .catch(() => {})
+            .finally(() => {
+                localStorage.removeItem('access_token');
+                localStorage.removeItem('refresh_token');
+            });
         setUser(null);
     };
 
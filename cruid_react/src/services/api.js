@@ -61,6 +61,7 @@ api.interceptors.response.use(
 export const authAPI = {
     register: (userData) => api.post('register/', userData),
     login: (credentials) => api.post('login/', credentials),
+    logout: () => api.post('logout/'),
     getProfile: () => api.get('profile/'),
     updateProfile: (profileData) => {
         const formData = new FormData();
@@ -83,8 +84,8 @@ export const postsAPI = {
     createPost: (postData) => {
         const formData = new FormData();
         Object.keys(postData).forEach(key => {
-            if (key === 'tag_ids' && Array.isArray(postData[key])) {
-                postData[key].forEach(id => formData.append('tag_ids', id));
+            if ((key === 'tag_ids' || key === 'tag_names') && Array.isArray(postData[key])) {
+                postData[key].forEach(value => formData.append(key, value));
             } else if (postData[key] !== null && postData[key] !== undefined) {
                 formData.append(key, postData[key]);
             }
@@ -96,8 +97,8 @@ export const postsAPI = {
     updatePost: (id, postData) => {
         const formData = new FormData();
         Object.keys(postData).forEach(key => {
-            if (key === 'tag_ids' && Array.isArray(postData[key])) {
-                postData[key].forEach(id => formData.append('tag_ids', id));
+            if ((key === 'tag_ids' || key === 'tag_names') && Array.isArray(postData[key])) {
+                postData[key].forEach(value => formData.append(key, value));
             } else if (postData[key] !== null && postData[key] !== undefined) {
                 formData.append(key, postData[key]);
             }
@@ -108,6 +109,8 @@ export const postsAPI = {
     },
     deletePost: (id) => api.delete(`posts/${id}/`),
     searchPosts: (query) => api.get('search/', { params: { q: query } }),
+    // Server-Sent Events stream of comment / like deltas (use with EventSource)
+    eventsURL: (id) => `${API_URL}posts/${id}/events/`,
 };
 
 // ==================== Categories API ====================
@@ -137,30 +140,97 @@ export const commentsAPI = {
     },
     updateComment: (id, content) => api.put(`comments/${id}/`, { content }),
     deleteComment: (id) => api.delete(`comments/${id}/`),
+    // Newest first; pass the previous response's `next` URL to continue
+    getReplies: (commentId, next = null) => next ? api.get(next) : api.get(`comments/${commentId}/replies/`),
 };
 
 // ==================== Likes API ====================
 export const likesAPI = {
     toggleLike: (postId) => api.post(`posts/${postId}/like/`),
+    // Idempotent: safe to retry / double-tap
+    setLiked: (postId, liked) => liked ? api.put(`posts/${postId}/like/`) : api.delete(`posts/${postId}/like/`),
     getPostLikes: (postId) => api.get(`posts/${postId}/likes/`),
 };
 
 // ==================== Bookmarks API ====================
 export const bookmarksAPI = {
     toggleBookmark: (postId) => api.post(`posts/${postId}/bookmark/`),
+    setBookmarked: (postId, bookmarked) => bookmarked ? api.put(`posts/${postId}/bookmark/`) : api.delete(`posts/${postId}/bookmark/`),
     getMyBookmarks: () => api.get('bookmarks/'),
 };
 
 // ==================== Follow API ====================
 export const followAPI = {
     toggleFollow: (userId) => api.post(`users/${userId}/follow/`),
+    setFollowing: (userId, following) => following ? api.put(`users/${userId}/follow/`) : api.delete(`users/${userId}/follow/`),
     getMyFollowing: () => api.get('following/'),
     getMyFollowers: () => api.get('followers/'),
 };
 
+// ==================== Autocomplete API ====================
+export const autocompleteAPI = {
+    search: (q, types = 'tag,category,user', limit) =>
+        api.get('autocomplete/', { params: { q, types, limit } }),
+};
+
 // ==================== Timeline API ====================
 export const timelineAPI = {
     getFeed: () => api.get('timeline/'),
 };
 
+// ==================== Delta Sync API ====================
+// feed: 'posts' | 'timeline' | 'bookmarks'. Keep the returned sync_token and
+// pass it back; merge `posts` by id, drop `deleted`, reload on `full_resync`.
+export const syncAPI = {
+    changes: (feed, since = null) => api.get(`sync/${feed}/`, { params: since ? { since } : {} }),
+};
+
+// ==================== Analytics API ====================
+export const analyticsAPI = {
+    getMine: (params = {}) => api.get('analytics/me/', { params }),
+};
+
+// ==================== Chunked Upload API ====================
+// Sends a File in CHUNK_SIZE slices; after a dropped request it asks the
+// server for the received offset and continues from there.
+const UPLOAD_CHUNK_SIZE = 1024 * 1024;
+const UPLOAD_RETRIES = 5;
+
+export const uploadsAPI = {
+    create: (file) => api.post('uploads/', { filename: file.name, size: file.size }),
+    status: (id) => api.get(`uploads/${id}/`),
+    sendChunk: (id, offset, blob) => api.patch(`uploads/${id}/`, blob, {
+        headers: { 'Content-Type': 'application/offset+octet-stream', 'Upload-Offset': offset },
+    }),
+    complete: (id, data) => api.post(`uploads/${id}/complete/`, data),
+    cancel: (id) => api.delete(`uploads/${id}/`),
+
+    // target: 'post' (with postId) or 'avatar'
+    upload: async (file, target, { postId, onProgress } = {}) => {
+        const { data } = await uploadsAPI.create(file);
+        let offset = 0;
+        let retries = 0;
+        while (offset < file.size) {
+            try {
+                const response = await uploadsAPI.sendChunk(data.id, offset, file.slice(offset, offset + UPLOAD_CHUNK_SIZE));
+                offset = response.data.offset;
+                retries = 0;
+                onProgress?.(offset / file.size);
+            } catch (error) {
+                if (error.response && error.response.status !== 409) throw error;
+                if (++retries > UPLOAD_RETRIES) throw error;
+                offset = (await uploadsAPI.status(data.id)).data.offset;
+            }
+        }
+        return uploadsAPI.complete(data.id, { target, post_id: postId });
+    },
+};
+
+// ==================== Batch API ====================
+// Runs several GETs (relative to /api/) in one request; resolves to an array
+// of {url, status, body} in the same order. Failed items do not reject.
+export const batchAPI = {
+    get: async (urls) => (await api.post('batch/', { requests: urls })).data.responses,
+};
+
 export default api;
\ No newline at end of file